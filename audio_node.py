@@ -0,0 +1,547 @@
+"""
+Audio node that plays the bot's music over Discord voice.
+
+Speaks the bot's audio node protocol (one JSON object per line over a Unix
+or TCP socket). The bot joins voice channels through its gateway session and
+forwards the voice credentials; the node opens the voice connection itself
+with discord.py's voice client, which handles the voice websocket, UDP,
+transport encryption and DAVE. Every guild's track is streamed through
+ffmpeg as Opus, with volume changes and seeks applied while it plays, and
+positions and track ends are reported back to the bot.
+
+Usage: AUDIO_NODE_URL=unix:./cache/audio-node.sock python audio_node.py
+"""
+
+import asyncio
+import json
+import signal
+import sys
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, cast, override
+from urllib.parse import urlparse
+import aiohttp
+import discord
+from discord.types.voice import (
+    GuildVoiceState as GuildVoiceStatePayload,
+    VoiceServerUpdate as VoiceServerUpdatePayload,
+)
+from data.constants import AUDIO_NODE_STATE_INTERVAL, AUDIO_NODE_VOICE_TIMEOUT
+from utils.audio import FFmpegVolumeAudio, SeekableAudio
+from utils.config import AUDIO_NODE_URL, FFMPEG_OPTIONS
+
+
+Message = dict[str, Any]
+
+
+class VoiceSession:
+    """
+    The parts of a client's state that a discord.py voice client uses.
+
+    Only the bot is connected to the gateway, so the node has no Client or
+    ConnectionState. A voice client needs nothing more from them than the
+    event loop, the bot's user and an HTTP session for the voice websocket.
+    """
+
+    def __init__(self, user_id: int, http: aiohttp.ClientSession):
+        self.loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self.user: discord.Object = discord.Object(user_id)
+        self._http: aiohttp.ClientSession = http
+
+    @property
+    def _connection(self) -> "VoiceSession":
+        # VoiceClient takes its state from client._connection
+        return self
+
+    @property
+    def http(self) -> "VoiceSession":
+        # The voice websocket is opened with state.http.ws_connect
+        return self
+
+    async def ws_connect(
+        self, url: str, *, compress: int = 0
+    ) -> aiohttp.ClientWebSocketResponse:
+        """Open a voice websocket like discord.py's HTTPClient does."""
+
+        return await self._http.ws_connect(
+            url, compress=compress, max_msg_size=0, autoclose=False
+        )
+
+
+class VoiceGuild:
+    """
+    Guild of a node voice client.
+
+    discord.py joins and leaves voice by changing the guild's voice state
+    through the gateway. The bot has already done that, so the credentials
+    it forwarded are replayed to the voice client instead.
+    """
+
+    def __init__(self, guild_id: int, voice_client: "NodeVoiceClient"):
+        self.id: int = guild_id
+        # No member cache: discord.py falls back to its own mute/deaf flags
+        self.me: SimpleNamespace = SimpleNamespace(voice=None)
+        self._voice_client: NodeVoiceClient = voice_client
+
+    def get_channel(self, channel_id: int) -> "VoiceChannel":
+        """Return the voice channel with the given ID."""
+
+        return VoiceChannel(channel_id, self)
+
+    async def change_voice_state(
+        self,
+        *,
+        channel: discord.abc.Snowflake | None,
+        self_mute: bool = False,
+        self_deaf: bool = False,
+    ) -> None:
+        """Replay the voice state the bot already set."""
+
+        # The voice client records which events it waits for after this
+        # returns, so they are replayed later
+        asyncio.create_task(self._voice_client.replay(joined=channel is not None))
+
+
+class VoiceChannel:
+    """Voice channel of a node voice client."""
+
+    def __init__(self, channel_id: int, guild: VoiceGuild):
+        self.id: int = channel_id
+        self.guild: VoiceGuild = guild
+
+
+class NodeVoiceClient(discord.VoiceClient):
+    """Voice client that connects with credentials forwarded by the bot."""
+
+    def __init__(
+        self,
+        voice: Message,
+        http: aiohttp.ClientSession,
+        on_cleanup: Callable[["NodeVoiceClient"], None],
+    ):
+        self.credentials: Message = voice
+        self._on_cleanup: Callable[[NodeVoiceClient], None] = on_cleanup
+
+        guild = VoiceGuild(int(voice["guild_id"]), self)
+        super().__init__(
+            cast(discord.Client, VoiceSession(int(voice["user_id"]), http)),
+            cast(discord.abc.Connectable, guild.get_channel(int(voice["channel_id"]))),
+        )
+
+    async def update(self, voice: Message) -> None:
+        """
+        Apply credentials forwarded again, e.g. after a move.
+
+        Args:
+            voice: ``voice`` command from the bot
+        """
+
+        previous, self.credentials = self.credentials, voice
+
+        if (voice["channel_id"], voice["session_id"]) != (
+            previous["channel_id"],
+            previous["session_id"],
+        ):
+            await self.on_voice_state_update(self._voice_state(joined=True))
+
+        if (voice["token"], voice["endpoint"]) != (
+            previous["token"],
+            previous["endpoint"],
+        ):
+            await self.on_voice_server_update(self._voice_server())
+
+    async def replay(self, joined: bool) -> None:
+        """
+        Deliver the gateway events the bot received for a voice state change.
+
+        Args:
+            joined: Whether the change joined a channel rather than left it
+        """
+
+        # Let the voice client start waiting for the events first; it would
+        # miss them if they arrived in the same loop iteration
+        await asyncio.sleep(0)
+
+        await self.on_voice_state_update(self._voice_state(joined))
+        if joined:
+            await self.on_voice_server_update(self._voice_server())
+
+    @override
+    def cleanup(self) -> None:
+        # Never registered with a client state, so only its owner lets go
+        self._on_cleanup(self)
+
+    def _voice_state(self, joined: bool) -> GuildVoiceStatePayload:
+        voice = self.credentials
+
+        return cast(
+            GuildVoiceStatePayload,
+            {
+                "guild_id": str(voice["guild_id"]),
+                "user_id": str(voice["user_id"]),
+                "channel_id": str(voice["channel_id"]) if joined else None,
+                "session_id": voice["session_id"],
+            },
+        )
+
+    def _voice_server(self) -> VoiceServerUpdatePayload:
+        voice = self.credentials
+
+        return {
+            "guild_id": str(voice["guild_id"]),
+            "token": voice["token"],
+            "endpoint": voice["endpoint"],
+        }
+
+
+class GuildPlayer:
+    """Plays one guild's audio on the node."""
+
+    def __init__(
+        self,
+        guild_id: int,
+        send: Callable[[Message], None],
+        http: aiohttp.ClientSession,
+    ):
+        self.guild_id: int = guild_id
+        self.voice_client: NodeVoiceClient | None = None
+
+        self._send: Callable[[Message], None] = send
+        self._http: aiohttp.ClientSession = http
+        self._loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self._joining: asyncio.Task[None] | None = None
+        self._source: SeekableAudio | None = None
+        self._play_id: int = 0
+        self._url: str = ""
+        self._before_options: str = ""
+        self._volume: float = 0.5
+        self._position: float = 0.0
+
+        # Commands run in order, and joining voice in one guild does not
+        # hold up the commands of the others
+        self._commands: asyncio.Queue[Message] = asyncio.Queue()
+        self._worker: asyncio.Task[None] = asyncio.create_task(self._run())
+        self._reporter: asyncio.Task[None] = asyncio.create_task(self._report_loop())
+
+    @property
+    def position(self) -> float:
+        """Position in the current track, in seconds."""
+
+        return self._source.position if self._source else self._position
+
+    def submit(self, message: Message) -> None:
+        """Queue a command from the bot."""
+
+        self._commands.put_nowait(message)
+
+    async def set_voice(self, voice: Message) -> None:
+        """Join voice with forwarded credentials, or apply new ones."""
+
+        if self.voice_client is not None:
+            await self.voice_client.update(voice)
+            return
+
+        self.voice_client = NodeVoiceClient(voice, self._http, self._forget)
+        self._joining = asyncio.create_task(self._join(self.voice_client))
+
+    async def play(self, message: Message) -> None:
+        """Start a track, replacing the current one without an end event."""
+
+        self._discard()
+        self._play_id = message["play_id"]
+        self._url = message["url"]
+        self._before_options = message.get("before_options", "")
+        self._volume = message.get("volume", self._volume)
+        self._position = start = float(message.get("start", 0))
+
+        voice_client = await self._joined()
+        if voice_client is None:
+            self._end("failed", "The audio node is not connected to voice")
+            return
+
+        try:
+            source = SeekableAudio(self._open(start), start=start)
+        except discord.ClientException as error:
+            self._end("failed", str(error))
+            return
+
+        self._source = source
+        voice_client.play(source, after=partial(self._after, source))
+
+    async def seek(self, message: Message) -> None:
+        """Continue the current track from another position."""
+
+        source = self._source
+        if source is None:
+            return
+
+        self._url = message.get("url") or self._url
+        position = float(message["position"])
+
+        try:
+            replacement = self._open(position)
+        except discord.ClientException as error:
+            print(f"✗ Could not seek in guild {self.guild_id}: {error}")
+            return
+
+        previous = source.swap(replacement, start=position)
+
+        # Killing ffmpeg waits for the process to exit
+        await asyncio.to_thread(previous.cleanup)
+
+    def pause(self) -> None:
+        """Pause the current track."""
+
+        if self.voice_client and self.voice_client.is_playing():
+            self.voice_client.pause()
+        self._report()
+
+    def resume(self) -> None:
+        """Resume the current track."""
+
+        if self.voice_client and self.voice_client.is_paused():
+            self.voice_client.resume()
+        self._report()
+
+    def set_volume(self, volume: float) -> None:
+        """Change the volume of the running ffmpeg process."""
+
+        self._volume = volume
+
+        if self._source and isinstance(self._source.original, FFmpegVolumeAudio):
+            self._source.original.set_volume(volume)
+
+    def stop(self) -> None:
+        """Stop the current track and report its end."""
+
+        if self._discard():
+            self._end("stopped")
+
+    async def destroy(self) -> None:
+        """Stop playing and leave voice without reporting anything."""
+
+        self._reporter.cancel()
+        self._discard()
+
+        if self._joining:
+            self._joining.cancel()
+
+        if self.voice_client:
+            await self.voice_client.disconnect(force=True)
+
+    async def close(self) -> None:
+        """Drop pending commands, then stop playing and leave voice."""
+
+        self._worker.cancel()
+        await self.destroy()
+
+    async def _run(self) -> None:
+        while True:
+            message = await self._commands.get()
+            op = message["op"]
+
+            try:
+                if op == "voice":
+                    await self.set_voice(message)
+                elif op == "play":
+                    await self.play(message)
+                elif op == "seek":
+                    await self.seek(message)
+                elif op == "pause":
+                    self.pause()
+                elif op == "resume":
+                    self.resume()
+                elif op == "volume":
+                    self.set_volume(float(message["volume"]))
+                elif op == "stop":
+                    self.stop()
+                elif op == "destroy":
+                    await self.destroy()
+                    return
+            except Exception as error:
+                print(f"✗ {op} failed in guild {self.guild_id}: {error!r}")
+
+    async def _join(self, voice_client: NodeVoiceClient) -> None:
+        endpoint = voice_client.credentials["endpoint"]
+
+        try:
+            await voice_client.connect(reconnect=True, timeout=AUDIO_NODE_VOICE_TIMEOUT)
+        except Exception as error:
+            # discord.py has already disconnected and cleaned up
+            print(f"✗ Could not join voice in guild {self.guild_id}: {error!r}")
+            return
+
+        print(f"✓ Joined voice in guild {self.guild_id} at {endpoint}")
+
+    async def _joined(self) -> NodeVoiceClient | None:
+        """Wait for a pending join, then return the connected voice client."""
+
+        if self._joining:
+            # Shielded: a dropped bot connection must not cancel it from here
+            await asyncio.shield(self._joining)
+
+        voice_client = self.voice_client
+
+        return voice_client if voice_client and voice_client.is_connected() else None
+
+    def _forget(self, voice_client: NodeVoiceClient) -> None:
+        # Left voice, so the next credentials open a new connection
+        if self.voice_client is voice_client:
+            self.voice_client = None
+
+    def _open(self, start: float) -> FFmpegVolumeAudio:
+        before_options = self._before_options
+        if start > 0:
+            before_options = f"{before_options} -ss {start:.2f}"
+
+        return FFmpegVolumeAudio(
+            self._url,
+            volume=self._volume,
+            before_options=before_options,
+            options=FFMPEG_OPTIONS.get("options"),
+        )
+
+    def _discard(self) -> SeekableAudio | None:
+        """Stop the current source without reporting its end."""
+
+        source, self._source = self._source, None
+        if source is None:
+            return None
+
+        self._position = source.position
+        if self.voice_client:
+            # The player's after callback sees that its source was discarded
+            self.voice_client.stop()
+
+        return source
+
+    def _after(self, source: SeekableAudio, error: Exception | None) -> None:
+        # Called on discord.py's player thread
+        self._loop.call_soon_threadsafe(self._finished, source, error)
+
+    def _finished(self, source: SeekableAudio, error: Exception | None) -> None:
+        if source is not self._source:
+            # Replaced or stopped, so the end is not reported
+            return
+
+        self._source = None
+        self._position = source.position
+
+        if error is None:
+            self._end("finished")
+        else:
+            self._end("failed", str(error))
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(AUDIO_NODE_STATE_INTERVAL)
+
+            if self._source and self.voice_client and self.voice_client.is_playing():
+                self._report()
+
+    def _report(self) -> None:
+        self._send(
+            {
+                "op": "state",
+                "guild_id": self.guild_id,
+                "play_id": self._play_id,
+                "position": self.position,
+                "paused": bool(self.voice_client and self.voice_client.is_paused()),
+            }
+        )
+
+    def _end(self, reason: str, error: str | None = None) -> None:
+        self._send(
+            {
+                "op": "end",
+                "guild_id": self.guild_id,
+                "play_id": self._play_id,
+                "reason": reason,
+                "position": self.position,
+                "error": error,
+            }
+        )
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    http: aiohttp.ClientSession,
+) -> None:
+    """Serve one bot connection; its guilds leave voice when it closes."""
+
+    players: dict[int, GuildPlayer] = {}
+
+    def send(message: Message) -> None:
+        if not writer.is_closing():
+            writer.write(json.dumps(message).encode() + b"\n")
+
+    print("✓ Bot connected")
+
+    try:
+        while line := await reader.readline():
+            try:
+                message = json.loads(line)
+                guild_id = int(message["guild_id"])
+                op = message["op"]
+            except (ValueError, KeyError) as error:
+                print(f"✗ Bad command: {error}")
+                continue
+
+            if op == "hello":
+                # Voice needs PyNaCl for transport encryption and davey for DAVE
+                voice = not (
+                    discord.VoiceClient.warn_nacl or discord.VoiceClient.warn_dave
+                )
+                send({"op": "ready", "guild_id": 0, "voice": voice})
+                continue
+
+            player = players.get(guild_id)
+            if player is None:
+                player = players[guild_id] = GuildPlayer(guild_id, send, http)
+
+            if op == "destroy":
+                del players[guild_id]
+
+            player.submit(message)
+    except ConnectionError:
+        pass
+    finally:
+        for player in players.values():
+            await player.close()
+        writer.close()
+        print("✗ Bot disconnected")
+
+
+async def main() -> None:
+    """Run the node until interrupted."""
+
+    url = urlparse(AUDIO_NODE_URL or "unix:./cache/audio-node.sock")
+
+    async with aiohttp.ClientSession() as http:
+        serve = partial(handle_connection, http=http)
+
+        if url.scheme == "unix":
+            Path(url.path).parent.mkdir(parents=True, exist_ok=True)
+            Path(url.path).unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(serve, path=url.path)
+        elif url.scheme == "tcp" and url.hostname and url.port:
+            server = await asyncio.start_server(serve, url.hostname, url.port)
+        else:
+            print(f"❌ ERROR: Unsupported AUDIO_NODE_URL: {url.geturl()}")
+            sys.exit(1)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+        print(f"Audio node listening on {url.geturl()}")
+
+        async with server:
+            await stop.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import traceback
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from benchmarks import extraction, memory, playback, queue_ops
+from benchmarks.harness import BenchConfig
+
+
+SUITES: dict[str, Callable[[BenchConfig], Awaitable[dict[str, Any]]]] = {
+    "queue": queue_ops.run,
+    "extraction": extraction.run,
+    "playback": playback.run,
+    "memory": memory.run,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=(
+            "Run the offline benchmarks and write the results as JSON. "
+            "yt-dlp is stubbed with recorded info dicts and audio is served "
+            "from generated test tones, so no network access is needed; "
+            "ffmpeg must be installed."
+        ),
+    )
+    parser.add_argument(
+        "suites",
+        nargs="*",
+        metavar="suite",
+        help=f"Suites to run: {', '.join(SUITES)} (default: all)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Where to write the results (default: cache/benchmarks/<commit>.json)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=7, help="Timed runs per measurement"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Smaller workloads, for a quick check"
+    )
+    parser.add_argument(
+        "--extract-latency",
+        type=float,
+        default=0.05,
+        help="Seconds each stubbed extraction takes",
+    )
+    parser.add_argument(
+        "--media-dir",
+        type=Path,
+        default=Path("cache/benchmarks/media"),
+        help="Where to keep the generated test tones",
+    )
+
+    args = parser.parse_args()
+    unknown = set(args.suites) - SUITES.keys()
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    return args
+
+
+def describe_environment() -> dict[str, Any]:
+    """Record what the results depend on, so runs can be compared."""
+
+    def run(*command: str) -> str | None:
+        try:
+            result = subprocess.run(
+                command, capture_output=True, text=True, check=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+        return result.stdout.strip()
+
+    ffmpeg = run("ffmpeg", "-version")
+
+    return {
+        "commit": run("git", "rev-parse", "HEAD"),
+        "dirty": bool(run("git", "status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": ffmpeg.splitlines()[0] if ffmpeg else None,
+        "timestamp": time.time(),
+    }
+
+
+async def main() -> int:
+    """Run the selected suites and write their results."""
+
+    args = parse_args()
+    config = BenchConfig(
+        repeat=max(1, args.repeat),
+        quick=args.quick,
+        extract_latency=args.extract_latency,
+        media_dir=args.media_dir,
+    )
+    environment = describe_environment()
+
+    report: dict[str, Any] = {
+        "environment": environment,
+        "config": {**asdict(config), "media_dir": str(config.media_dir)},
+        "units": {"time": "seconds", "memory": "bytes"},
+        "results": {},
+    }
+    failed = False
+
+    for name in args.suites or SUITES:
+        print(f"Running {name}...")
+        started = time.perf_counter()
+        try:
+            report["results"][name] = await SUITES[name](config)
+            print(f"✓ {name} ({time.perf_counter() - started:.1f}s)")
+        except Exception as exception:
+            report["results"][name] = {"error": repr(exception)}
+            print(f"✗ {name} failed: {exception}")
+            traceback.print_exc()
+            failed = True
+
+    output = args.output or Path(
+        f"cache/benchmarks/{(environment['commit'] or 'unknown')[:12]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {output}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compare",
+        description="Compare two benchmark result files and report regressions.",
+    )
+    parser.add_argument("base", type=Path, help="Results of the baseline commit")
+    parser.add_argument("head", type=Path, help="Results of the commit to check")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change that counts as a regression (default: 0.1)",
+    )
+
+    return parser.parse_args()
+
+
+def metrics(results: dict[str, Any], path: str = "") -> Iterator[tuple[str, float]]:
+    """
+    Yield the comparable numbers of a results tree.
+
+    Medians of timings, throughputs and memory sizes are compared; the other
+    statistics are too noisy to judge a change by.
+
+    Args:
+        results: Results, or a part of them
+        path: Dotted path of ``results``
+
+    Yields:
+        ``(dotted path, value)`` pairs
+    """
+
+    for key, value in results.items():
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, dict):
+            yield from metrics(value, name)
+        elif isinstance(value, (int, float)) and (
+            key in ("median", "requests_per_second") or key.endswith("_bytes")
+        ):
+            yield name, float(value)
+
+
+def higher_is_better(name: str) -> bool:
+    """Check if a metric improves when it grows."""
+
+    return name.endswith("per_second")
+
+
+def main() -> int:
+    """Print metrics that changed beyond the threshold."""
+
+    args = parse_args()
+    base = dict(metrics(json.loads(args.base.read_text())["results"]))
+    head = dict(metrics(json.loads(args.head.read_text())["results"]))
+
+    regressions = 0
+    for name in sorted(base.keys() & head.keys()):
+        before, after = base[name], head[name]
+        if before == 0:
+            continue
+
+        change = (after - before) / before
+        if abs(change) < args.threshold:
+            continue
+
+        if (change < 0) == higher_is_better(name):
+            regressions += 1
+            marker = "✗"
+        else:
+            marker = "✓"
+        print(f"{marker} {name}: {before:.4g} → {after:.4g} ({change:+.0%})")
+
+    for name in sorted(base.keys() - head.keys()):
+        print(f"- {name}: missing from {args.head}")
+
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, cast
+import discord
+from benchmarks.harness import (
+    BenchConfig,
+    FakeYoutubeDL,
+    install_fake_ytdl,
+    load_recordings,
+    summarize,
+)
+from data.constants import STREAM_URL_TTL, TRACK_CACHE_SIZE, TRACK_CACHE_TTL
+from utils.audio import YTDLSource
+from utils.cache import TrackCache
+from utils.config import EXTRACTION_MAX_IN_FLIGHT, EXTRACTION_WORKERS
+
+
+CONCURRENCY = (1, 4, 16, 64)
+QUICK_CONCURRENCY = (1, 16)
+REQUESTS = 256
+QUICK_REQUESTS = 64
+
+
+def _member(guild_id: int) -> discord.Member:
+    """Stand-in for the member a request comes from; only IDs and names are read."""
+
+    member = SimpleNamespace(
+        id=guild_id, name=f"user{guild_id}", guild=SimpleNamespace(id=guild_id)
+    )
+    return cast(discord.Member, member)
+
+
+async def _throughput(urls: list[str], concurrency: int) -> dict[str, Any]:
+    """
+    Resolve URLs with ``concurrency`` users, each in its own guild.
+
+    Each user sends its requests one after the other, like someone queueing
+    songs, so no guild exceeds its limit of pending extractions.
+    """
+
+    latencies: list[float] = []
+
+    async def user(index: int) -> None:
+        requester = _member(index + 1)
+        for url in urls[index::concurrency]:
+            started = time.perf_counter()
+            await YTDLSource.from_url(url, requester)
+            latencies.append(time.perf_counter() - started)
+
+    calls = FakeYoutubeDL.calls
+    started = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(urls),
+        "extractions": FakeYoutubeDL.calls - calls,
+        "seconds": elapsed,
+        "requests_per_second": len(urls) / elapsed,
+        "latency": summarize(latencies),
+    }
+
+
+async def run(config: BenchConfig) -> dict[str, Any]:
+    """
+    Measure ``YTDLSource.from_url`` throughput under concurrency.
+
+    yt-dlp is replaced by FakeYoutubeDL, so every extraction costs the
+    configured latency on an extraction worker plus the real work around it:
+    pool scheduling, single-flight, caching and building the track.
+
+    Returns:
+        Cold (every request extracts) and warm (every request hits the
+        cache) throughput, by number of concurrent users
+    """
+
+    install_fake_ytdl(load_recordings("http://127.0.0.1"), config.extract_latency)
+    count = QUICK_REQUESTS if config.quick else REQUESTS
+    results: dict[str, Any] = {}
+
+    try:
+        for concurrency in QUICK_CONCURRENCY if config.quick else CONCURRENCY:
+            YTDLSource.cache = TrackCache(
+                max_size=TRACK_CACHE_SIZE,
+                ttl=TRACK_CACHE_TTL,
+                stream_ttl=STREAM_URL_TTL,
+            )
+            urls = [
+                f"https://www.youtube.com/watch?v=c{concurrency:03d}{index:07d}"
+                for index in range(count)
+            ]
+
+            results[str(concurrency)] = {
+                "cold": await _throughput(urls, concurrency),
+                "warm": await _throughput(urls, concurrency),
+            }
+    finally:
+        YTDLSource.extractor.shutdown()
+
+    results["config"] = {
+        "extract_latency": config.extract_latency,
+        "workers": EXTRACTION_WORKERS,
+        "max_in_flight": EXTRACTION_MAX_IN_FLIGHT,
+    }
+
+    return results
@@ -0,0 +1,286 @@
+import copy
+import functools
+import http.server
+import json
+import re
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, TypeVar
+import yt_dlp
+from utils.validators import Validators
+
+
+T = TypeVar("T")
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Test tones generated with ffmpeg, by file name, with their encoder options
+MEDIA_FILES: dict[str, list[str]] = {
+    "tone-opus.webm": ["-c:a", "libopus", "-b:a", "128k"],
+    "tone-aac.m4a": ["-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart"],
+}
+MEDIA_SECONDS = 30
+MEDIA_URL_PLACEHOLDER = "{media}"
+
+
+@dataclass(slots=True)
+class BenchConfig:
+    """Settings shared by every benchmark suite."""
+
+    repeat: int  # timed runs per measurement
+    quick: bool  # smaller workloads, for a fast sanity check
+    extract_latency: float  # seconds each stubbed extraction blocks its worker
+    media_dir: Path  # where the generated test tones are kept
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """
+    Reduce repeated measurements to summary statistics.
+
+    Args:
+        samples: Measurements, e.g. seconds per call
+
+    Returns:
+        Run count, min, median, mean, p95 and max
+    """
+
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "max": ordered[-1],
+    }
+
+
+def time_per_call(
+    setup: Callable[[], T],
+    operation: Callable[[T, int], Any],
+    number: int,
+    repeat: int,
+) -> dict[str, float]:
+    """
+    Time an operation, with a fresh subject for every run.
+
+    Args:
+        setup: Builds the subject; not timed
+        operation: Called with the subject and the call index
+        number: Calls per run
+        repeat: Number of runs
+
+    Returns:
+        Summary of the seconds per call of each run
+    """
+
+    samples: list[float] = []
+    for _ in range(repeat):
+        subject = setup()
+        started = time.perf_counter()
+        for index in range(number):
+            operation(subject, index)
+        samples.append((time.perf_counter() - started) / number)
+
+    return summarize(samples)
+
+
+def load_recordings(media_url: str) -> list[dict[str, Any]]:
+    """
+    Load the recorded yt-dlp info dicts, pointed at the local media server.
+
+    Args:
+        media_url: Base URL the test tones are served from
+
+    Returns:
+        Info dicts as returned by ``YoutubeDL.extract_info``
+    """
+
+    text = (FIXTURES_DIR / "info.json").read_text(encoding="utf-8")
+    return json.loads(text.replace(MEDIA_URL_PLACEHOLDER, media_url))
+
+
+class FakeYoutubeDL:
+    """
+    Stands in for ``yt_dlp.YoutubeDL``, answering from recorded info dicts.
+
+    Each video ID maps to one recording, picked by a stable hash, with the ID
+    and URLs rewritten so every video is distinct to the caches. Extractions
+    block their worker thread for ``latency`` seconds, like the network
+    round trips of a real one.
+    """
+
+    recordings: list[dict[str, Any]] = []
+    latency: float = 0.0
+    calls: int = 0
+
+    def __init__(self, params: dict[str, Any] | None = None):
+        self.params: dict[str, Any] = dict(params or {})
+
+    def extract_info(self, url: str, download: bool = False, **kwargs: Any) -> Any:
+        time.sleep(self.latency)
+        FakeYoutubeDL.calls += 1
+
+        if url.startswith("ytsearch"):
+            query = url.partition(":")[2]
+            return {"entries": [self._recording(f"search-{query}")]}
+
+        video_id = Validators.extract_youtube_id(url) or url
+        return self._recording(video_id)
+
+    def _recording(self, video_id: str) -> dict[str, Any]:
+        index = zlib.crc32(video_id.encode()) % len(self.recordings)
+        info = copy.deepcopy(self.recordings[index])
+        info["id"] = video_id
+        info["webpage_url"] = f"https://www.youtube.com/watch?v={video_id}"
+
+        return info
+
+
+def install_fake_ytdl(recordings: list[dict[str, Any]], latency: float) -> None:
+    """
+    Replace yt-dlp with FakeYoutubeDL for the rest of the process.
+
+    Args:
+        recordings: Info dicts to answer with
+        latency: Seconds each extraction blocks its worker
+    """
+
+    FakeYoutubeDL.recordings = recordings
+    FakeYoutubeDL.latency = latency
+    FakeYoutubeDL.calls = 0
+    yt_dlp.YoutubeDL = FakeYoutubeDL  # type: ignore[misc, assignment]
+
+
+def ensure_media(media_dir: Path) -> dict[str, Path]:
+    """
+    Generate the test tones if they are missing.
+
+    Args:
+        media_dir: Directory to keep them in
+
+    Returns:
+        Paths of the generated files, by name
+
+    Raises:
+        RuntimeError: If ffmpeg is not installed
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is required to generate test media")
+
+    media_dir.mkdir(parents=True, exist_ok=True)
+    paths: dict[str, Path] = {}
+
+    for name, codec_options in MEDIA_FILES.items():
+        path = media_dir / name
+        if not path.exists():
+            # A 440 Hz stereo tone at Discord's sample rate
+            source = f"sine=frequency=440:duration={MEDIA_SECONDS}:sample_rate=48000"
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    source,
+                    "-ac",
+                    "2",
+                    *codec_options,
+                    str(path),
+                ],
+                check=True,
+            )
+        paths[name] = path
+
+    return paths
+
+
+class MediaServer:
+    """Serves a directory over HTTP on localhost, from a background thread."""
+
+    def __init__(self, directory: Path):
+        handler = functools.partial(_QuietHandler, directory=str(directory))
+        self._server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), handler
+        )
+        self._thread: threading.Thread = threading.Thread(
+            target=self._server.serve_forever, name="media-server", daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        """Base URL of the served directory."""
+
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> "MediaServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Static file handler that serves byte ranges, like a media CDN, and does
+    not log every request.
+    """
+
+    def send_head(self) -> Any:
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        path = Path(self.translate_path(self.path))
+        if match is None or not path.is_file():
+            return super().send_head()
+
+        size = path.stat().st_size
+        start = int(match.group(1))
+        end = min(int(match.group(2) or size - 1), size - 1)
+        if start >= size:
+            self.send_error(416)
+            return None
+
+        file = open(path, "rb")
+        file.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        return _Range(file, end - start + 1)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Range:
+    """Part of an open file, read by ``copyfile`` like the file itself."""
+
+    def __init__(self, file: BinaryIO, length: int):
+        self._file: BinaryIO = file
+        self._left: int = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._left:
+            size = self._left
+        data = self._file.read(size)
+        self._left -= len(data)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
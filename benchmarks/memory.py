@@ -0,0 +1,73 @@
+import gc
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, cast
+import discord
+from benchmarks.harness import BenchConfig
+from benchmarks.queue_ops import make_tracks
+from data.queue import MusicQueue
+from utils.state import GuildState
+from utils.timers import TimerWheel
+
+
+STATES = 2000
+QUICK_STATES = 200
+QUEUED_TRACKS = 100  # per queue when measuring the cost of a queued track
+
+
+def _allocated(build: Callable[[], Any]) -> int:
+    """
+    Measure the memory still held by what a function builds.
+
+    Args:
+        build: Creates the objects to measure and returns them
+
+    Returns:
+        Bytes allocated by ``build`` and kept alive by its result
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del kept
+    return after - before
+
+
+async def run(config: BenchConfig) -> dict[str, Any]:
+    """
+    Measure the memory held per guild state and per queued track.
+
+    Returns:
+        Bytes per idle GuildState, and per metadata-only track in a queue
+    """
+
+    count = QUICK_STATES if config.quick else STATES
+    timers = TimerWheel()
+    # Built up front, so only the states themselves are measured
+    guilds = [cast(discord.Guild, SimpleNamespace(id=index)) for index in range(count)]
+
+    state_bytes = _allocated(lambda: [GuildState(guild, timers) for guild in guilds])
+
+    def filled_queues() -> list[MusicQueue]:
+        queues = [MusicQueue() for _ in range(count)]
+        for index, queue in enumerate(queues):
+            # Tracks with their own strings, as every request creates its own
+            queue.add_many(make_tracks(QUEUED_TRACKS, seed=index))
+        return queues
+
+    empty_queue_bytes = _allocated(lambda: [MusicQueue() for _ in range(count)])
+    filled_queue_bytes = _allocated(filled_queues)
+
+    return {
+        "guild_state_bytes": state_bytes / count,
+        "queued_track_bytes": (filled_queue_bytes - empty_queue_bytes)
+        / (count * QUEUED_TRACKS),
+        "states": count,
+    }
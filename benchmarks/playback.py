@@ -0,0 +1,235 @@
+import array
+import math
+import resource
+import subprocess
+import time
+from typing import Any, Callable
+import discord
+from benchmarks.harness import (
+    MEDIA_SECONDS,
+    BenchConfig,
+    MediaServer,
+    ensure_media,
+    summarize,
+)
+from data.track import Track
+from utils.audio import YTDLSource
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE  # 20ms of 48kHz stereo PCM
+FRAMES_PER_SECOND = 50
+VOLUME = 0.5
+STARTUP_RUNS = 10
+QUICK_STARTUP_RUNS = 3
+VOLUME_FRAMES = 5000  # frames per run when timing in-process volume scaling
+
+
+class _FrameSource(discord.AudioSource):
+    """Audio source that returns the same PCM frame forever."""
+
+    def __init__(self, frame: bytes):
+        self.frame: bytes = frame
+
+    def read(self) -> bytes:
+        return self.frame
+
+    def is_opus(self) -> bool:
+        return False
+
+
+def _tone_frame() -> bytes:
+    """One frame of a stereo 440 Hz tone, as 16-bit PCM."""
+
+    samples = array.array("h")
+    for index in range(FRAME_SIZE // 4):
+        value = int(16000 * math.sin(2 * math.pi * 440 * index / 48000))
+        samples.extend((value, value))
+
+    return samples.tobytes()
+
+
+def _startup(config: BenchConfig, server: MediaServer) -> dict[str, Any]:
+    """
+    Time how long each kind of ffmpeg source takes to produce its first frame.
+
+    Sources are created by ``YTDLSource.get_audio_source`` from the local
+    media server, so the ffmpeg arguments match production ones.
+    """
+
+    modes: dict[str, tuple[str, str | None, float, bool | None]] = {
+        # name: (file, codec, volume, opus)
+        "passthrough": ("tone-opus.webm", "opus", 1.0, None),
+        "ffmpeg_volume": ("tone-aac.m4a", "aac", VOLUME, True),
+        "pcm_volume_transformer": ("tone-aac.m4a", "aac", VOLUME, False),
+    }
+    runs = QUICK_STARTUP_RUNS if config.quick else STARTUP_RUNS
+    results: dict[str, Any] = {}
+
+    for mode, (name, codec, volume, opus) in modes.items():
+        track = Track(
+            title=name,
+            webpage_url=f"{server.url}/{name}",
+            duration=MEDIA_SECONDS,
+            stream_url=f"{server.url}/{name}",
+            codec=codec,
+        )
+        spawn: list[float] = []
+        first_frame: list[float] = []
+
+        for _ in range(runs):
+            started = time.perf_counter()
+            source = YTDLSource.get_audio_source(track, volume=volume, opus=opus)
+            spawned = time.perf_counter()
+            try:
+                if not source.read():
+                    raise RuntimeError(f"{mode} produced no audio")
+                first_frame.append(time.perf_counter() - started)
+            finally:
+                source.cleanup()
+            spawn.append(spawned - started)
+
+        results[mode] = {
+            "spawn": summarize(spawn),
+            "first_frame": summarize(first_frame),
+        }
+
+    return results
+
+
+def _volume_in_process(config: BenchConfig) -> dict[str, Any]:
+    """Time volume scaling of one PCM frame in this process, per approach."""
+
+    frame = _tone_frame()
+    transformer = discord.PCMVolumeTransformer(_FrameSource(frame), volume=VOLUME)
+
+    def scale_array() -> bytes:
+        samples = array.array("h", frame)
+        return array.array("h", [int(sample * VOLUME) for sample in samples]).tobytes()
+
+    candidates: dict[str, Callable[[], Any]] = {
+        "pcm_volume_transformer": transformer.read,
+        "array": scale_array,
+    }
+    if audioop is not None:
+        # Bound here, as the None check does not carry into the lambda
+        multiply = audioop.mul
+        candidates["audioop"] = lambda: multiply(frame, 2, VOLUME)
+    try:
+        # What the PCM path pays on top of scaling: Opus encoding in Python
+        encoder = discord.opus.Encoder()
+        candidates["opus_encode"] = lambda: encoder.encode(
+            frame, encoder.SAMPLES_PER_FRAME
+        )
+    except discord.opus.OpusNotLoaded:
+        pass
+
+    frames = VOLUME_FRAMES // 10 if config.quick else VOLUME_FRAMES
+    results: dict[str, Any] = {}
+
+    for name, candidate in candidates.items():
+        samples: list[float] = []
+        for _ in range(config.repeat):
+            started = time.process_time()
+            for _ in range(frames):
+                candidate()
+            samples.append((time.process_time() - started) / frames)
+
+        results[name] = summarize(samples)
+
+    return results
+
+
+def _volume_in_ffmpeg(config: BenchConfig) -> dict[str, Any]:
+    """
+    Measure the CPU ffmpeg spends per frame for each playback path.
+
+    Runs ffmpeg over a test tone as fast as it can and divides its CPU time,
+    user plus system, by the number of 20ms frames.
+    """
+
+    media = ensure_media(config.media_dir)
+    transcoded = str(media["tone-aac.m4a"])
+    pipelines: dict[str, list[str]] = {
+        # PCM path: decode only, volume and encoding happen in Python
+        "pcm": ["-i", transcoded, "-f", "s16le", "-ar", "48000", "-ac", "2"],
+        "pcm_volume": [
+            "-i",
+            transcoded,
+            "-af",
+            f"volume={VOLUME}",
+            "-f",
+            "s16le",
+            "-ar",
+            "48000",
+            "-ac",
+            "2",
+        ],
+        # FFmpegVolumeAudio: decode, volume filter and Opus encoding in ffmpeg
+        "libopus_volume": [
+            "-i",
+            transcoded,
+            "-af",
+            f"volume={VOLUME}",
+            "-f",
+            "opus",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            "128k",
+            "-ar",
+            "48000",
+            "-ac",
+            "2",
+        ],
+        # Passthrough: remux the Opus stream without decoding it
+        "copy": ["-i", str(media["tone-opus.webm"]), "-f", "opus", "-c:a", "copy"],
+    }
+
+    frames = MEDIA_SECONDS * FRAMES_PER_SECOND
+    results: dict[str, Any] = {}
+
+    for name, arguments in pipelines.items():
+        samples: list[float] = []
+        for _ in range(config.repeat):
+            before = resource.getrusage(resource.RUSAGE_CHILDREN)
+            subprocess.run(
+                ["ffmpeg", "-loglevel", "error", "-y", *arguments, "pipe:1"],
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            user = after.ru_utime - before.ru_utime
+            system = after.ru_stime - before.ru_stime
+            samples.append((user + system) / frames)
+
+        results[name] = summarize(samples)
+
+    return results
+
+
+async def run(config: BenchConfig) -> dict[str, Any]:
+    """
+    Measure ffmpeg source startup and the CPU cost of volume scaling.
+
+    Returns:
+        Seconds until the first frame per source kind, and CPU seconds per
+        20ms frame for each way of applying volume
+    """
+
+    ensure_media(config.media_dir)
+
+    with MediaServer(config.media_dir) as server:
+        startup = _startup(config, server)
+
+    return {
+        "startup": startup,
+        "volume_cpu_per_frame": {
+            "in_process": _volume_in_process(config),
+            "ffmpeg": _volume_in_ffmpeg(config),
+        },
+    }
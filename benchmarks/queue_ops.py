@@ -0,0 +1,114 @@
+import random
+from typing import Any, Callable
+from benchmarks.harness import BenchConfig, time_per_call
+from data.constants import PLAYLIST_BATCH_SIZE, PREFETCH_DEPTH
+from data.queue import MusicQueue
+from data.track import Track
+
+
+SIZES = (10**2, 10**3, 10**4, 10**5)
+QUICK_SIZES = (10**2, 10**3)
+PAGE_SIZE = 10  # tracks per /queue page
+SEED = 1234
+
+
+def make_tracks(count: int, seed: int = SEED) -> list[Track]:
+    """
+    Build metadata-only tracks like the ones a playlist adds.
+
+    Args:
+        count: Number of tracks
+        seed: Seed for durations and uploaders, so runs are comparable
+
+    Returns:
+        Tracks in a deterministic order
+    """
+
+    rng = random.Random(seed)
+    return [
+        Track(
+            title=f"Track {index}",
+            webpage_url=f"https://www.youtube.com/watch?v={index:011d}",
+            duration=rng.randint(90, 600),
+            thumbnail=f"https://i.ytimg.com/vi/{index:011d}/hqdefault.jpg",
+            uploader=f"Uploader {rng.randrange(200)}",
+            requester_id=rng.randrange(50),
+            requester_name=f"user{rng.randrange(50)}",
+        )
+        for index in range(count)
+    ]
+
+
+async def run(config: BenchConfig) -> dict[str, Any]:
+    """
+    Time MusicQueue operations at growing queue sizes.
+
+    Mutating operations run on a fresh queue of the given size each run, and
+    only ``size / 10`` times, so the size barely drifts while timing.
+
+    Returns:
+        Seconds per call of each operation, by queue size
+    """
+
+    results: dict[str, Any] = {}
+
+    for size in QUICK_SIZES if config.quick else SIZES:
+        tracks = make_tracks(size)
+        extra = make_tracks(PLAYLIST_BATCH_SIZE, seed=SEED + 1)
+        rng = random.Random(SEED)
+        positions = [rng.randrange(size // 2) for _ in range(size)]
+
+        def filled() -> MusicQueue:
+            queue = MusicQueue()
+            queue.add_many(tracks)
+            return queue
+
+        shared = filled()
+        number = min(1000, max(1, size // 10))
+
+        operations: dict[str, tuple[Callable[[], MusicQueue], Callable[..., Any]]] = {
+            "add": (filled, lambda queue, index: queue.add(extra[0])),
+            "add_many": (filled, lambda queue, index: queue.add_many(extra)),
+            "add_next": (filled, lambda queue, index: queue.add_next(extra[0])),
+            "get_next": (filled, lambda queue, index: queue.get_next()),
+            "remove": (filled, lambda queue, index: queue.remove(positions[index])),
+            "move": (
+                filled,
+                lambda queue, index: queue.move(positions[index], positions[-index]),
+            ),
+            "getitem": (lambda: shared, lambda queue, index: queue[positions[index]]),
+            "peek_many": (
+                lambda: shared,
+                lambda queue, index: queue.peek_many(PREFETCH_DEPTH),
+            ),
+            "page": (
+                lambda: shared,
+                lambda queue, index: queue.slice(
+                    positions[index], positions[index] + PAGE_SIZE
+                ),
+            ),
+            "total_duration": (
+                lambda: shared,
+                lambda queue, index: queue.get_total_duration(),
+            ),
+        }
+
+        timings: dict[str, Any] = {
+            name: time_per_call(setup, operation, number, config.repeat)
+            for name, (setup, operation) in operations.items()
+        }
+
+        # Whole-queue operations, once per run
+        timings["build"] = time_per_call(
+            MusicQueue, lambda queue, index: queue.add_many(tracks), 1, config.repeat
+        )
+        timings["shuffle"] = time_per_call(
+            filled, lambda queue, index: queue.shuffle(), 1, config.repeat
+        )
+        timings["iterate"] = time_per_call(
+            lambda: shared, lambda queue, index: queue.to_list(), 1, config.repeat
+        )
+
+        results[str(size)] = timings
+
+    return results
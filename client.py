@@ -1,11 +1,34 @@
 from typing import override, Any
+import os
 import discord
 from discord.ext import commands
 import traceback
+import psutil
 from cogs.music import Music
-
-
-class MusicBot(commands.Bot):
+from utils.cluster import ClusterClient
+from utils.config import (
+    CLUSTER_ID,
+    CLUSTER_SOCKET,
+    LOOP_DEBUG,
+    LOOP_STALL_THRESHOLD,
+    METRICS_HOST,
+    METRICS_PORT,
+    TRACE_EXPORT,
+    TRACE_SERVICE_NAME,
+)
+from utils.loop_monitor import LoopMonitor
+from utils.metrics import VOICE_CLIENTS, MetricsServer
+from utils.sampler import MetricsSampler
+from utils.tracing import TRACER, OTLPExporter
+from data.constants import (
+    METRICS_HISTORY,
+    METRICS_SAMPLE_INTERVAL,
+    TRACE_EXPORT_BATCH,
+    TRACE_EXPORT_INTERVAL,
+)
+
+
+class MusicBot(commands.AutoShardedBot):
     """Custom bot class for the music bot."""
 
     def __init__(
@@ -26,6 +49,20 @@ class MusicBot(commands.Bot):
             "cogs.music",
         ]
 
+        # Link to the supervisor when running as a cluster worker
+        self.cluster: ClusterClient | None = None
+        if CLUSTER_ID is not None:
+            self.cluster = ClusterClient(CLUSTER_ID, CLUSTER_SOCKET)
+
+        # Resource usage sampled in the background for /debug stats
+        self.sampler: MetricsSampler = MetricsSampler(
+            self, interval=METRICS_SAMPLE_INTERVAL, history=METRICS_HISTORY
+        )
+        self.metrics_server: MetricsServer | None = None
+        self.loop_monitor: LoopMonitor = LoopMonitor(
+            threshold=LOOP_STALL_THRESHOLD, debug=LOOP_DEBUG
+        )
+
     @override
     async def setup_hook(self) -> None:
         """Setup hook called when bot is starting up."""
@@ -34,6 +71,37 @@ class MusicBot(commands.Bot):
         print("Starting Music Bot...")
         print("-" * 50)
 
+        self.loop_monitor.start()
+        self.sampler.start()
+        VOICE_CLIENTS.set_function(lambda: len(self.voice_clients))
+
+        if METRICS_PORT:
+            port = METRICS_PORT + (CLUSTER_ID or 0)
+            server = MetricsServer(METRICS_HOST, port)
+            try:
+                await server.start()
+                self.metrics_server = server
+                print(f"✓ Serving metrics at http://{METRICS_HOST}:{port}/metrics")
+            except OSError as error:
+                print(f"✗ Failed to start metrics endpoint on port {port}: {error}")
+
+        if TRACE_EXPORT:
+            exporter = OTLPExporter(
+                TRACE_EXPORT,
+                service=TRACE_SERVICE_NAME,
+                interval=TRACE_EXPORT_INTERVAL,
+                batch_size=TRACE_EXPORT_BATCH,
+            )
+            try:
+                exporter.start()
+                TRACER.exporter = exporter
+                print(f"✓ Exporting traces to {TRACE_EXPORT}")
+            except OSError as error:
+                print(f"✗ Failed to export traces to {TRACE_EXPORT}: {error}")
+
+        if self.cluster:
+            self.cluster.start(self.cluster_stats)
+
         # Load all cogs
         for extension in self.initial_extensions:
             try:
@@ -67,6 +135,51 @@ class MusicBot(commands.Bot):
 
         print("-" * 50)
 
+    @override
+    async def close(self) -> None:
+        """Stop background sampling and reporting before shutting down."""
+
+        self.sampler.stop()
+        self.loop_monitor.stop()
+        if self.cluster:
+            self.cluster.stop()
+
+        if self.metrics_server:
+            await self.metrics_server.stop()
+            self.metrics_server = None
+
+        if TRACER.exporter:
+            await TRACER.exporter.stop()
+            TRACER.exporter = None
+
+        await super().close()
+
+    def cluster_stats(self) -> dict[str, Any]:
+        """
+        Collect the stats this worker reports to the cluster supervisor.
+
+        Returns:
+            JSON-serializable stats
+        """
+
+        music_cog = self.get_cog("music")
+        sample = self.sampler.latest
+
+        return {
+            "shards": sorted(self.shards),
+            "guilds": len(self.guilds),
+            "voice": len(self.voice_clients),
+            "sessions": (
+                len(music_cog.state_manager) if isinstance(music_cog, Music) else 0
+            ),
+            "latency": self.latency,
+            "memory": (
+                sample.memory
+                if sample
+                else psutil.Process(os.getpid()).memory_info().rss
+            ),
+        }
+
     async def on_ready(self) -> None:
         """Called when bot is ready."""
 
@@ -75,7 +188,9 @@ class MusicBot(commands.Bot):
         if self.user:
             print(f"Logged in as: {self.user.name} (ID: {self.user.id})")
 
-        print(f"Connected to {len(self.guilds)} guild(s)")
+        print(
+            f"Connected to {len(self.guilds)} guild(s) on {len(self.shards)} shard(s)"
+        )
 
         if self.test_guild_id:
             print(f"Development Mode: Commands synced to guild {self.test_guild_id}")
@@ -215,13 +330,20 @@ class MusicBot(commands.Bot):
                     print(f"Cleaned up state for guild: {member.guild.name}")
 
 
-def create_bot(command_prefix: str, test_guild_id: int | None = None) -> MusicBot:
+def create_bot(
+    command_prefix: str,
+    test_guild_id: int | None = None,
+    shard_count: int | None = None,
+    shard_ids: list[int] | None = None,
+) -> MusicBot:
     """
     Create and configure the bot instance.
 
     Args:
         command_prefix: Prefix for text commands
         test_guild_id: Optional guild ID for instant command syncing (development)
+        shard_count: Total number of shards, or None to use Discord's recommendation
+        shard_ids: Shards this process runs, or None for all of them
 
     Returns:
         Configured MusicBot instance
@@ -237,6 +359,8 @@ def create_bot(command_prefix: str, test_guild_id: int | None = None) -> MusicBo
         intents=intents,
         test_guild_id=test_guild_id,
         case_insensitive=True,
+        shard_count=shard_count,
+        shard_ids=shard_ids,
     )
 
     return bot
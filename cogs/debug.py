@@ -1,9 +1,18 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+from collections import Counter
+from typing import Callable, cast
+import math
 import time
-import psutil
-import os
+from cogs.music import Music
+from utils.cluster import ClusterClient
+from utils.loop_monitor import LoopMonitor
+from utils.sampler import MetricsSampler, Sample
+from utils.tracing import TRACER, Trace
+from data.constants import MAX_SHARDS_SHOWN, TRACES_SHOWN, TREND_POINTS
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
 
 
 class Debug(commands.GroupCog, name="debug"):
@@ -68,39 +77,320 @@ class Debug(commands.GroupCog, name="debug"):
     async def stats(self, interaction: discord.Interaction):
         """Show detailed bot statistics."""
 
-        # System stats
-        process = psutil.Process(os.getpid())
-        memory_usage = process.memory_info().rss / 1024 / 1024  # MB
-        cpu_usage = process.cpu_percent(interval=0.1)
+        # Read from the background sampler, which keeps psutil calls and
+        # per-guild sums off the event loop
+        sample = self._sampler.latest if self._sampler else None
 
-        # Bot stats
-        total_members = sum(guild.member_count or 0 for guild in self.bot.guilds)
+        embed = discord.Embed(title="📊 Bot Statistics", color=discord.Color.blue())
 
-        # Voice stats
-        voice_clients = len(self.bot.voice_clients)
+        if sample is None:
+            embed.description = "Resource usage is still being sampled."
+        else:
+            embed.add_field(name="🌐 Guilds", value=f"`{sample.guilds}`", inline=True)
 
-        embed = discord.Embed(title="📊 Bot Statistics", color=discord.Color.blue())
+            embed.add_field(name="👥 Users", value=f"`{sample.members}`", inline=True)
+
+            embed.add_field(
+                name="🔊 Voice Connections",
+                value=f"`{sample.voice_clients}`",
+                inline=True,
+            )
+
+            embed.add_field(
+                name="💾 Memory",
+                value=f"`{sample.memory / 1024 / 1024:.2f} MB`",
+                inline=True,
+            )
+
+            embed.add_field(
+                name="⚙️ CPU",
+                value=f"`{sample.cpu_percent:.1f}%` · {sample.threads} threads",
+                inline=True,
+            )
+
+            embed.add_field(
+                name="🎛️ FFmpeg",
+                value=(
+                    f"`{sample.ffmpeg_processes}` · "
+                    f"{sample.ffmpeg_cpu_percent:.1f}% CPU · "
+                    f"{sample.ffmpeg_memory / 1024 / 1024:.0f} MB"
+                ),
+                inline=True,
+            )
+
+            embed.add_field(
+                name="⏳ Loop Lag",
+                value=f"`{sample.loop_lag * 1000:.1f}ms`",
+                inline=True,
+            )
 
         embed.add_field(
-            name="🌐 Guilds", value=f"`{len(self.bot.guilds)}`", inline=True
+            name="🏓 Latency", value=f"`{self.bot.latency * 1000:.2f}ms`", inline=True
+        )
+
+        music = self.bot.get_cog("music")
+        if isinstance(music, Music):
+            state_manager = music.state_manager
+            embed.add_field(
+                name="🗂️ Guild States",
+                value=f"`{len(state_manager)}` ({state_manager.evicted} evicted)",
+                inline=True,
+            )
+
+        embed.add_field(name="🧩 Shards", value=self._shard_summary(), inline=False)
+
+        cluster = getattr(self.bot, "cluster", None)
+        if isinstance(cluster, ClusterClient):
+            summary = await self._cluster_summary(cluster)
+            embed.add_field(name="🖧 Cluster", value=summary, inline=False)
+
+        if sample:
+            embed.set_footer(text=f"Sampled {time.time() - sample.timestamp:.0f}s ago")
+
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(
+        name="trends", description="Show recent resource usage trends"
+    )
+    async def trends(self, interaction: discord.Interaction):
+        """Show sparklines of recently sampled metrics."""
+
+        samples = self._sampler.history(TREND_POINTS) if self._sampler else []
+
+        if len(samples) < 2:
+            await interaction.response.send_message(
+                "❌ Not enough samples yet, try again in a minute.", ephemeral=True
+            )
+            return
+
+        span = (samples[-1].timestamp - samples[0].timestamp) / 60
+
+        trends: list[tuple[str, Callable[[Sample], float], str]] = [
+            ("⚙️ CPU", lambda sample: sample.cpu_percent, "{:.1f}%"),
+            ("💾 Memory", lambda sample: sample.memory / 1024 / 1024, "{:.0f} MB"),
+            ("⏳ Loop Lag", lambda sample: sample.loop_lag * 1000, "{:.1f}ms"),
+            ("🎛️ FFmpeg", lambda sample: sample.ffmpeg_processes, "{:.0f}"),
+            ("🎛️ FFmpeg CPU", lambda sample: sample.ffmpeg_cpu_percent, "{:.1f}%"),
+            ("🔊 Voice", lambda sample: sample.voice_clients, "{:.0f}"),
+        ]
+
+        embed = discord.Embed(
+            title="📈 Trends",
+            description=f"Last {span:.0f} minute(s), {len(samples)} samples",
+            color=discord.Color.blue(),
         )
 
-        embed.add_field(name="👥 Users", value=f"`{total_members}`", inline=True)
+        for name, metric, unit in trends:
+            values = [metric(sample) for sample in samples]
+            embed.add_field(
+                name=name,
+                value=(
+                    f"`{_sparkline(values)}`\n"
+                    f"min {unit.format(min(values))} · "
+                    f"max {unit.format(max(values))} · "
+                    f"now {unit.format(values[-1])}"
+                ),
+                inline=False,
+            )
+
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(
+        name="loop", description="Show event loop health and recent stalls"
+    )
+    async def loop(self, interaction: discord.Interaction):
+        """Show event loop lag and where the loop was last blocked."""
+
+        monitor = getattr(self.bot, "loop_monitor", None)
+        if not isinstance(monitor, LoopMonitor):
+            await interaction.response.send_message(
+                "❌ The loop monitor is not running.", ephemeral=True
+            )
+            return
+
+        lags = list(monitor.lags)
+        average = sum(lags) / len(lags) if lags else 0.0
+        worst = max(lags, default=0.0)
+
+        embed = discord.Embed(title="🔁 Event Loop", color=discord.Color.blue())
 
         embed.add_field(
-            name="🔊 Voice Connections", value=f"`{voice_clients}`", inline=True
+            name="⏳ Lag",
+            value=(
+                f"now `{monitor.last_lag * 1000:.1f}ms` · "
+                f"avg `{average * 1000:.1f}ms` · "
+                f"max `{worst * 1000:.1f}ms` (last minute)"
+            ),
+            inline=False,
         )
 
-        embed.add_field(name="💾 Memory", value=f"`{memory_usage:.2f} MB`", inline=True)
+        embed.add_field(
+            name="🧱 Stalls",
+            value=(
+                f"`{monitor.stall_count}` over {monitor.threshold * 1000:.0f}ms · "
+                f"`{monitor.slow_callback_count}` slow callbacks "
+                f"(debug mode {'on' if monitor.debug else 'off'})"
+            ),
+            inline=False,
+        )
 
-        embed.add_field(name="⚙️ CPU", value=f"`{cpu_usage:.1f}%`", inline=True)
+        stalls = monitor.recent_stalls()
+        if stalls:
+            stall = stalls[-1]
+            # Innermost frames are the interesting ones; fields hold 1024 chars
+            stack = "".join(stall.stack)[-900:] or "No stack captured"
+            embed.add_field(
+                name=(
+                    f"Last stall: {stall.duration * 1000:.0f}ms, "
+                    f"{time.time() - stall.started_at:.0f}s ago ({stall.source})"
+                ),
+                value=f"```py\n{stack}\n```",
+                inline=False,
+            )
+
+        await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(
+        name="trace", description="Show where slow /play requests spent time"
+    )
+    async def trace(self, interaction: discord.Interaction):
+        """Show per-stage timings of the slowest recently traced /play requests."""
+
+        traces = list(TRACER.traces)
+        if not traces:
+            await interaction.response.send_message(
+                "❌ No /play requests were traced yet.", ephemeral=True
+            )
+            return
+
+        embed = discord.Embed(
+            title="🧭 /play Traces",
+            description=f"Slowest of the last {len(traces)} requests",
+            color=discord.Color.blue(),
+        )
+
+        # Which stages dominate across every kept request
+        durations: dict[str, list[float]] = {}
+        for trace in traces:
+            for span in trace.spans[1:]:
+                durations.setdefault(span.name, []).append(span.duration)
+
+        stages = sorted(
+            durations.items(),
+            key=lambda item: sum(item[1]) / len(item[1]),
+            reverse=True,
+        )
         embed.add_field(
-            name="🏓 Latency", value=f"`{self.bot.latency * 1000:.2f}ms`", inline=True
+            name="📊 Stages",
+            value="\n".join(
+                f"`{name}` avg `{sum(values) / len(values) * 1000:.0f}ms` · "
+                f"max `{max(values) * 1000:.0f}ms` · {len(values)}×"
+                for name, values in stages
+            )
+            or "n/a",
+            inline=False,
         )
 
+        for rank, trace in enumerate(TRACER.slowest(TRACES_SHOWN), start=1):
+            ago = time.time() - trace.root.start_ns / 1e9
+            embed.add_field(
+                name=f"{rank}. {trace.duration * 1000:.0f}ms, {ago:.0f}s ago",
+                value=_trace_breakdown(trace),
+                inline=False,
+            )
+
         await interaction.response.send_message(embed=embed)
 
+    @property
+    def _sampler(self) -> MetricsSampler | None:
+        """The bot's background metrics sampler, if it has one."""
+
+        sampler = getattr(self.bot, "sampler", None)
+        return sampler if isinstance(sampler, MetricsSampler) else None
+
+    async def _cluster_summary(self, cluster: ClusterClient) -> str:
+        """Describe every worker process of the cluster."""
+
+        workers = await cluster.fetch()
+        if not workers:
+            return "Supervisor unreachable"
+
+        lines: list[str] = []
+        for cluster_id, stats in sorted(workers.items()):
+            shards = stats["shards"] or ["?"]
+            here = " (this worker)" if cluster_id == cluster.cluster_id else ""
+            lines.append(
+                f"`#{cluster_id}` shards {shards[0]}-{shards[-1]} · "
+                f"{stats['guilds']} guilds · {stats['voice']} voice · "
+                f"{stats['memory'] / 1024 / 1024:.0f} MB{here}"
+            )
+
+        lines.append(
+            f"Total: {sum(stats['guilds'] for stats in workers.values())} guilds · "
+            f"{sum(stats['voice'] for stats in workers.values())} voice"
+        )
+
+        return "\n".join(lines)
+
+    def _shard_summary(self) -> str:
+        """Describe the latency and load of each shard run by this process."""
+
+        if isinstance(self.bot, commands.AutoShardedBot):
+            latencies = sorted(self.bot.latencies)
+        else:
+            latencies = [(0, self.bot.latency)]
+
+        guilds = Counter(guild.shard_id for guild in self.bot.guilds)
+        voice = Counter(
+            cast(discord.VoiceClient, voice_client).guild.shard_id
+            for voice_client in self.bot.voice_clients
+        )
+
+        music = self.bot.get_cog("music")
+        state_manager = music.state_manager if isinstance(music, Music) else None
+
+        lines: list[str] = []
+        for shard_id, latency in latencies[:MAX_SHARDS_SHOWN]:
+            ping = f"{latency * 1000:.0f}ms" if math.isfinite(latency) else "n/a"
+            states = len(state_manager.shard_states(shard_id)) if state_manager else 0
+            lines.append(
+                f"`#{shard_id}` {ping} · {guilds[shard_id]} guilds · "
+                f"{voice[shard_id]} voice · {states} active"
+            )
+
+        if len(latencies) > MAX_SHARDS_SHOWN:
+            lines.append(f"…and {len(latencies) - MAX_SHARDS_SHOWN} more")
+
+        return "\n".join(lines) or "n/a"
+
+
+def _sparkline(values: list[float]) -> str:
+    """Draw values as a line of block characters scaled to their range."""
+
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_BLOCKS[0] * len(values)
+
+    scale = (len(SPARK_BLOCKS) - 1) / (high - low)
+    return "".join(SPARK_BLOCKS[round((value - low) * scale)] for value in values)
+
+
+def _trace_breakdown(trace: Trace) -> str:
+    """Describe the stages of a trace, one per line and indented by nesting."""
+
+    query = str(trace.root.attributes.get("query", ""))
+    lines = [f"`{query[:80]}`"] if query else []
+
+    lines.append("```")
+    for span in trace.spans[1:]:
+        label = "  " * (trace.depth(span) - 1) + span.name
+        failed = " ✗" if span.error else ""
+        lines.append(f"{label:<24}{span.duration * 1000:>8.0f}ms{failed}")
+    lines.append("```")
+
+    # Fields hold 1024 characters
+    return "\n".join(lines)[:1024]
+
 
 async def setup(bot: commands.Bot):
     """Setup function to add cog to bot."""
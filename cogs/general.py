@@ -21,9 +21,11 @@ class General(commands.GroupCog, name="general"):
         )
 
         music_commands = [
-            ("**`/play <query>`**", "Play a song or add it to queue"),
+            ("**`/play <query>`**", "Play a song or playlist, or add it to queue"),
+            ("**`/search <query>`**", "Search and pick a song to play"),
             ("**`/pause`**", "Pause the current song"),
             ("**`/resume`**", "Resume playback"),
+            ("**`/seek <position>`**", "Jump to a position in the song"),
             ("**`/skip`**", "Skip the current song"),
             ("**`/stop`**", "Stop playback and clear queue"),
             ("**`/queue [page]`**", "Show the current queue"),
@@ -53,6 +55,9 @@ class General(commands.GroupCog, name="general"):
             ("**`/ping`**", "Check bot latency"),
             ("**`/uptime`**", "Show bot uptime"),
             ("**`/stats`**", "Show bot statistics"),
+            ("**`/trends`**", "Show recent resource usage trends"),
+            ("**`/loop`**", "Show event loop health and recent stalls"),
+            ("**`/trace`**", "Show where slow /play requests spent time"),
         ]
 
         debug_text = "\n".join([f"{cmd} - {desc}" for cmd, desc in debug_commands])
@@ -1,11 +1,40 @@
+import asyncio
+import sqlite3
+import time
 from typing import override
 import discord
 from discord import app_commands
 from discord.ext import commands
-from utils.state import StateManager
+from utils.state import GuildState, StateManager
 from utils.audio import YTDLSource
 from utils.validators import Validators
-from data.exceptions import DownloadError, VoiceError, QueueError
+from utils.cache import SearchCache, TrackCache
+from utils.metadata_store import MetadataStore
+from utils.persistence import SnapshotStore
+from utils.remote_audio import AudioNode, NodeVoiceProtocol
+from utils.tracing import TRACER, span
+from utils.metrics import (
+    CACHE_HITS,
+    CACHE_MISSES,
+    GUILD_STATES,
+    LONGEST_QUEUE,
+    QUEUED_TRACKS,
+    TIME_TO_FIRST_AUDIO,
+)
+from utils.config import (
+    AUDIO_NODE_URL,
+    MAX_GUILD_STATES,
+    METADATA_DB_PATH,
+    QUEUE_SNAPSHOT_DIR,
+)
+from data.track import Track
+from data.exceptions import (
+    AudioError,
+    AudioNodeError,
+    DownloadError,
+    VoiceError,
+    QueueError,
+)
 from data.constants import (
     COLOR_PRIMARY,
     COLOR_SUCCESS,
@@ -27,21 +56,190 @@ from data.constants import (
     MSG_NOT_PAUSED,
     MAX_TRACK_DURATION,
     MAX_QUEUE_SIZE,
+    PLAYLIST_BATCH_SIZE,
+    SEARCH_RESULTS_LIMIT,
+    SEARCH_TIMEOUT,
+    METADATA_STORE_SIZE,
+    METADATA_STORE_MAX_AGE,
+    METADATA_FLUSH_INTERVAL,
+    QUEUE_SNAPSHOT_INTERVAL,
+    QUEUE_SNAPSHOT_MAX_AGE,
+    STATE_SWEEP_INTERVAL,
+    STATE_IDLE_TIMEOUT,
 )
 
 
+class SearchView(discord.ui.View):
+    """Select menu for picking one of the results of /search."""
+
+    def __init__(self, cog: "Music", requester_id: int, tracks: list[Track]):
+        super().__init__(timeout=SEARCH_TIMEOUT)
+        self.cog: Music = cog
+        self.requester_id: int = requester_id
+        self.tracks: list[Track] = tracks
+        self.message: discord.Message | None = None
+
+        self.select: discord.ui.Select[SearchView] = discord.ui.Select(
+            placeholder="Choose a track to play",
+            options=[
+                discord.SelectOption(
+                    label=f"{index + 1}. {track.title}"[:100],
+                    description=f"{track.duration_formatted} | {track.uploader or 'Unknown'}"[
+                        :100
+                    ],
+                    value=str(index),
+                )
+                for index, track in enumerate(tracks)
+            ],
+        )
+        self.select.callback = self.on_select
+        self.add_item(self.select)
+
+    @override
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only let the user who searched pick a result."""
+
+        if interaction.user.id != self.requester_id:
+            await interaction.response.send_message(
+                "❌ Only the user who searched can pick a result.", ephemeral=True
+            )
+            return False
+
+        return True
+
+    async def on_select(self, interaction: discord.Interaction) -> None:
+        """Queue the chosen track."""
+
+        self.stop()
+        track = self.tracks[int(self.select.values[0])]
+
+        await interaction.response.defer(thinking=True)
+        if interaction.message:
+            await interaction.message.edit(view=None)
+
+        await self.cog._handle_play(interaction, track=track)
+
+    @override
+    async def on_timeout(self) -> None:
+        """Remove the menu once it expires."""
+
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
 class Music(commands.Cog, name="music"):
     """Music playback commands."""
 
     def __init__(self, bot: commands.Bot):
         self.bot: commands.Bot = bot
         self.state_manager: StateManager = StateManager()
+        self._resumed: bool = False
+
+    @override
+    async def cog_load(self) -> None:
+        """Connect to the audio node and open the persistent stores."""
+
+        if AUDIO_NODE_URL:
+            node = AudioNode(AUDIO_NODE_URL)
+            try:
+                await node.connect()
+                NodeVoiceProtocol.node = node
+                print(f"✓ Connected to audio node at {AUDIO_NODE_URL} (experimental)")
+            except (OSError, ValueError, AudioNodeError) as error:
+                # Fall back to playing audio in this process
+                print(f"✗ Not using audio node at {AUDIO_NODE_URL}: {error}")
+                await node.close()
+
+        QUEUED_TRACKS.set_function(
+            lambda: sum(len(state.queue) for state in self.state_manager)
+        )
+        LONGEST_QUEUE.set_function(
+            lambda: max((len(state.queue) for state in self.state_manager), default=0)
+        )
+        GUILD_STATES.set_function(lambda: len(self.state_manager))
+        CACHE_HITS.set_function(lambda: self._cache_counts(hits=True))
+        CACHE_MISSES.set_function(lambda: self._cache_counts(hits=False))
+
+        self.state_manager.start_sweeper(
+            interval=STATE_SWEEP_INTERVAL,
+            idle_after=STATE_IDLE_TIMEOUT,
+            max_states=MAX_GUILD_STATES,
+        )
+
+        if QUEUE_SNAPSHOT_DIR:
+            self.state_manager.attach_store(
+                SnapshotStore(QUEUE_SNAPSHOT_DIR, max_age=QUEUE_SNAPSHOT_MAX_AGE),
+                interval=QUEUE_SNAPSHOT_INTERVAL,
+            )
+
+        if not METADATA_DB_PATH:
+            return
+
+        store = MetadataStore(
+            METADATA_DB_PATH,
+            max_entries=METADATA_STORE_SIZE,
+            max_age=METADATA_STORE_MAX_AGE,
+            flush_interval=METADATA_FLUSH_INTERVAL,
+        )
+
+        try:
+            await store.open()
+        except sqlite3.Error as error:
+            print(f"✗ Failed to open metadata store at {METADATA_DB_PATH}: {error}")
+            await store.close()
+            return
+
+        YTDLSource.store = store
 
     @override
     async def cog_unload(self) -> None:
         """Cleanup when cog is unloaded."""
 
+        # Snapshot before disconnecting, so the next start can resume
+        self.state_manager.stop_sweeper()
+        await self.state_manager.detach_store()
         await self.state_manager.cleanup_all()
+        self.state_manager.timers.close()
+        YTDLSource.extractor.shutdown()
+
+        if NodeVoiceProtocol.node:
+            await NodeVoiceProtocol.node.close()
+            NodeVoiceProtocol.node = None
+
+        if YTDLSource.store:
+            await YTDLSource.store.close()
+            YTDLSource.store = None
+
+    @staticmethod
+    def _cache_counts(hits: bool) -> dict[tuple[str, ...], float]:
+        """Hit or miss counts of every cache, for the metrics endpoint."""
+
+        caches: list[tuple[str, TrackCache | SearchCache | MetadataStore]] = [
+            ("track", YTDLSource.cache),
+            ("search", YTDLSource.search_cache),
+        ]
+        if YTDLSource.store:
+            caches.append(("store", YTDLSource.store))
+
+        return {
+            (name,): cache.hits if hits else cache.misses for name, cache in caches
+        }
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """Resume playback that was interrupted by a restart."""
+
+        # on_ready fires again after every reconnect
+        if self._resumed:
+            return
+        self._resumed = True
+
+        resumed = await self.state_manager.restore_all(self.bot)
+        if resumed:
+            print(f"✓ Resumed playback in {resumed} guild(s)")
 
     def _check_voice_state(self, interaction: discord.Interaction) -> str | None:
         """
@@ -60,23 +258,40 @@ class Music(commands.Cog, name="music"):
         if not interaction.guild:
             return "❌ This command can only be used in a server."
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if state.is_connected and state.voice_client:
+        if state and state.is_connected and state.voice_channel:
             if (
                 interaction.user.voice.channel
-                and interaction.user.voice.channel.id != state.voice_client.channel.id
+                and interaction.user.voice.channel.id != state.voice_channel.id
             ):
                 return MSG_DIFFERENT_VOICE
 
         return None
 
     @app_commands.command(name="play", description="Play a song or add it to the queue")
-    @app_commands.describe(query="Song name or URL to play")
+    @app_commands.describe(query="Song name, URL or playlist URL to play")
     async def play(self, interaction: discord.Interaction, query: str) -> None:
         """Play a song from YouTube or other sources."""
 
-        await interaction.response.defer(thinking=True)
+        with TRACER.trace("play", guild_id=interaction.guild_id or 0, query=query):
+            with span("defer"):
+                await interaction.response.defer(thinking=True)
+            await self._handle_play(interaction, query=query)
+
+    async def _handle_play(
+        self,
+        interaction: discord.Interaction,
+        query: str | None = None,
+        track: Track | None = None,
+    ) -> None:
+        """
+        Join the user's voice channel and queue a query or an already known track.
+
+        The interaction must already be deferred.
+        """
+
+        started = time.perf_counter()
 
         if not isinstance(interaction.user, discord.Member):
             await interaction.followup.send(MSG_NOT_IN_VOICE, ephemeral=True)
@@ -111,7 +326,8 @@ class Music(commands.Cog, name="music"):
                     )
                     return
 
-                await state.connect(interaction.user.voice.channel)
+                with span("voice.connect"):
+                    await state.connect(interaction.user.voice.channel)
 
             if not Validators.validate_queue_size(len(state.queue)):
                 await interaction.followup.send(
@@ -120,12 +336,24 @@ class Music(commands.Cog, name="music"):
                 )
                 return
 
-            if not Validators.is_url(query):
-                query = f"ytsearch:{Validators.sanitize_search_query(query)}"
+            if track is not None:
+                track = track.requested_by(interaction.user)
+            elif query is None:
+                return
+            elif Validators.is_playlist_url(query):
+                await self._enqueue_playlist(interaction, state, query)
+                return
+            else:
+                if not Validators.is_url(query):
+                    query = f"ytsearch:{Validators.sanitize_search_query(query)}"
 
-            track = await YTDLSource.from_url(query, interaction.user)
+                with span("extract"):
+                    track = await YTDLSource.from_url(query, interaction.user)
 
-            if not Validators.validate_duration(track.duration):
+            with span("validate"):
+                valid = Validators.validate_duration(track.duration)
+
+            if not valid:
                 await interaction.followup.send(
                     f"❌ Track is too long! Maximum duration is {MAX_TRACK_DURATION // 60} minutes.",
                     ephemeral=True,
@@ -155,10 +383,14 @@ class Music(commands.Cog, name="music"):
             if track.uploader:
                 embed.add_field(name="Uploader", value=track.uploader, inline=True)
 
-            await interaction.followup.send(embed=embed)
+            with span("respond"):
+                await interaction.followup.send(embed=embed)
 
             if not state.is_playing:
-                await state.play_next()
+                with span("play_next"):
+                    await state.play_next()
+                if state.is_playing:
+                    TIME_TO_FIRST_AUDIO.observe(time.perf_counter() - started)
 
         except DownloadError as error:
             await interaction.followup.send(
@@ -173,6 +405,107 @@ class Music(commands.Cog, name="music"):
                 f"❌ An unexpected error occurred: {str(exception)}", ephemeral=True
             )
 
+    async def _enqueue_playlist(
+        self, interaction: discord.Interaction, state: GuildState, url: str
+    ) -> None:
+        """Add a playlist to the queue in batches and start playback."""
+
+        if not isinstance(interaction.user, discord.Member):
+            return
+
+        with span("extract", playlist=True):
+            title, tracks, entries = await YTDLSource.from_playlist(
+                url, interaction.user
+            )
+
+        playable = [
+            track for track in tracks if Validators.validate_duration(track.duration)
+        ]
+        capacity = MAX_QUEUE_SIZE - len(state.queue)
+        added = playable[:capacity]
+
+        if not added:
+            await interaction.followup.send(
+                "❌ No tracks from this playlist could be added.", ephemeral=True
+            )
+            return
+
+        position = len(state.queue)
+        for start in range(0, len(added), PLAYLIST_BATCH_SIZE):
+            state.queue.add_many(added[start : start + PLAYLIST_BATCH_SIZE])
+            # Let other guilds' events through between batches
+            await asyncio.sleep(0)
+
+        embed = discord.Embed(
+            title=f"{EMOJI_MUSIC} Added Playlist to Queue",
+            description=f"[{title}]({url})",
+            color=COLOR_SUCCESS,
+        )
+
+        if added[0].thumbnail:
+            embed.set_thumbnail(url=added[0].thumbnail)
+
+        embed.add_field(name="Tracks", value=f"{len(added)}", inline=True)
+        embed.add_field(
+            name="Position in Queue",
+            value=f"#{position + 1} - #{position + len(added)}",
+            inline=True,
+        )
+
+        skipped = {
+            "unavailable": entries - len(tracks),
+            "too long": len(tracks) - len(playable),
+            "queue full": len(playable) - len(added),
+        }
+        reasons = [f"{count} {reason}" for reason, count in skipped.items() if count]
+        if reasons:
+            embed.set_footer(
+                text=f"{sum(skipped.values())} track(s) skipped: {', '.join(reasons)}"
+            )
+
+        with span("respond"):
+            await interaction.followup.send(embed=embed)
+
+        if not state.is_playing:
+            with span("play_next"):
+                await state.play_next()
+
+    @app_commands.command(name="search", description="Search for a song to play")
+    @app_commands.describe(query="Song name to search for")
+    async def search(self, interaction: discord.Interaction, query: str) -> None:
+        """Search YouTube and pick a result from a menu."""
+
+        await interaction.response.defer(thinking=True)
+
+        if not isinstance(interaction.user, discord.Member):
+            await interaction.followup.send(MSG_NOT_IN_VOICE, ephemeral=True)
+            return
+
+        try:
+            tracks = await YTDLSource.search(
+                Validators.sanitize_search_query(query),
+                limit=SEARCH_RESULTS_LIMIT,
+                guild_id=interaction.user.guild.id,
+            )
+        except DownloadError as error:
+            await interaction.followup.send(
+                f"❌ Download error: {str(error)}", ephemeral=True
+            )
+            return
+
+        embed = discord.Embed(
+            title=f"🔎 Results for {Validators.sanitize_search_query(query)}",
+            description="\n".join(
+                f"`{index + 1}.` [{track.title}]({track.webpage_url}) `{track.duration_formatted}`"
+                for index, track in enumerate(tracks)
+            ),
+            color=COLOR_PRIMARY,
+        )
+        embed.set_footer(text=f"Pick a track within {SEARCH_TIMEOUT} seconds")
+
+        view = SearchView(self, interaction.user.id, tracks)
+        view.message = await interaction.followup.send(embed=embed, view=view, wait=True)
+
     @app_commands.command(name="pause", description="Pause the current song")
     async def pause(self, interaction: discord.Interaction) -> None:
         """Pause current playback."""
@@ -189,9 +522,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.is_playing:
+        if state is None or not state.is_playing:
             await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
 
@@ -219,9 +552,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.is_paused:
+        if state is None or not state.is_paused:
             await interaction.response.send_message(MSG_NOT_PAUSED, ephemeral=True)
             return
 
@@ -229,6 +562,59 @@ class Music(commands.Cog, name="music"):
             state.player.resume()
         await interaction.response.send_message(f"{EMOJI_PLAY} Resumed playback.")
 
+    @app_commands.command(name="seek", description="Jump to a position in the song")
+    @app_commands.describe(position="Position, e.g. 90, 1:30 or 1:02:03")
+    async def seek(self, interaction: discord.Interaction, position: str) -> None:
+        """Seek within the current track."""
+
+        if not interaction.guild:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server.", ephemeral=True
+            )
+
+            return
+
+        error = self._check_voice_state(interaction)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
+
+        state = self.state_manager.peek_state(interaction.guild.id)
+
+        if state is None or not state.player or not state.current_track:
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
+            return
+
+        seconds = Validators.parse_timestamp(position)
+        if seconds is None:
+            await interaction.response.send_message(
+                "❌ Position must look like `90`, `1:30` or `1:02:03`.", ephemeral=True
+            )
+            return
+
+        if state.current_track.duration and seconds >= state.current_track.duration:
+            await interaction.response.send_message(
+                f"❌ The song is only {state.current_track.duration_formatted} long.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.response.defer()
+
+        try:
+            await state.player.seek(seconds)
+        except (AudioError, DownloadError) as error:
+            await interaction.followup.send(f"❌ {str(error)}", ephemeral=True)
+            return
+
+        hours, remainder = divmod(seconds, 3600)
+        minutes, remainder = divmod(remainder, 60)
+        if hours:
+            timestamp = f"{hours}:{minutes:02d}:{remainder:02d}"
+        else:
+            timestamp = f"{minutes}:{remainder:02d}"
+        await interaction.followup.send(f"⏩ Jumped to **{timestamp}**.")
+
     @app_commands.command(name="skip", description="Skip the current song")
     async def skip(self, interaction: discord.Interaction) -> None:
         """Skip current track."""
@@ -245,9 +631,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.is_playing:
+        if state is None or not state.is_playing:
             await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
 
@@ -279,9 +665,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.is_connected:
+        if state is None or not state.is_connected:
             await interaction.response.send_message(
                 MSG_BOT_NOT_IN_VOICE, ephemeral=True
             )
@@ -306,9 +692,9 @@ class Music(commands.Cog, name="music"):
 
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if state.queue.is_empty and not state.current_track:
+        if state is None or (state.queue.is_empty and not state.current_track):
             await interaction.response.send_message(MSG_QUEUE_EMPTY, ephemeral=True)
             return
 
@@ -323,7 +709,7 @@ class Music(commands.Cog, name="music"):
 
         if state.current_track:
             current = state.current_track
-            requester_name = current.requester.name if current.requester else "Unknown"
+            requester_name = current.requester_name or "Unknown"
             embed.add_field(
                 name="🎵 Now Playing",
                 value=(
@@ -338,9 +724,10 @@ class Music(commands.Cog, name="music"):
             end_idx = min(start_idx + items_per_page, len(state.queue))
 
             queue_text = ""
-            for i in range(start_idx, end_idx):
-                track = state.queue[i]
-                requester_name = track.requester.name if track.requester else "Unknown"
+            for i, track in enumerate(
+                state.queue.slice(start_idx, end_idx), start=start_idx
+            ):
+                requester_name = track.requester_name or "Unknown"
                 queue_text += f"`{i + 1}.` [{track.title}]({track.webpage_url})\n"
                 queue_text += f"     `{track.duration_formatted}` | {requester_name}\n"
 
@@ -389,9 +776,9 @@ class Music(commands.Cog, name="music"):
 
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.current_track:
+        if state is None or not state.current_track:
             await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
 
@@ -408,7 +795,7 @@ class Music(commands.Cog, name="music"):
 
         embed.add_field(name="Duration", value=track.duration_formatted, inline=True)
 
-        requester_name = track.requester.name if track.requester else "Unknown"
+        requester_name = track.requester_name or "Unknown"
         embed.add_field(name="Requested by", value=requester_name, inline=True)
 
         if track.uploader:
@@ -445,9 +832,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.is_playing:
+        if state is None or not state.is_playing:
             await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
 
@@ -460,6 +847,15 @@ class Music(commands.Cog, name="music"):
         if state.player:
             state.player.volume = volume
 
+            # Passthrough streams are not decoded, so restart this one with
+            # a re-encoding source at the same position
+            if state.player.is_passthrough and volume != 100:
+                await interaction.response.defer()
+                try:
+                    await state.player.seek(state.player.position)
+                except (AudioError, DownloadError):
+                    pass
+
         # Choose emoji based on volume
         if volume == 0:
             emoji = "🔇"
@@ -470,7 +866,15 @@ class Music(commands.Cog, name="music"):
         else:
             emoji = "📢"
 
-        await interaction.response.send_message(f"{emoji} Volume set to **{volume}%**")
+        message = f"{emoji} Volume set to **{volume}%**"
+        if state.player and state.player.is_passthrough:
+            # The restart failed, the old source keeps playing
+            message += " (applies from the next track)"
+
+        if interaction.response.is_done():
+            await interaction.followup.send(message)
+        else:
+            await interaction.response.send_message(message)
 
     @app_commands.command(
         name="loop", description="Toggle loop mode for the current song"
@@ -485,7 +889,11 @@ class Music(commands.Cog, name="music"):
 
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
+
+        if state is None:
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
+            return
 
         state.queue.loop = not state.queue.loop
 
@@ -512,7 +920,11 @@ class Music(commands.Cog, name="music"):
 
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
+
+        if state is None:
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
+            return
 
         state.queue.loop_queue = not state.queue.loop_queue
 
@@ -542,9 +954,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if state.queue.is_empty:
+        if state is None or state.queue.is_empty:
             await interaction.response.send_message(MSG_QUEUE_EMPTY, ephemeral=True)
             return
 
@@ -569,9 +981,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if state.queue.is_empty:
+        if state is None or state.queue.is_empty:
             await interaction.response.send_message(MSG_QUEUE_EMPTY, ephemeral=True)
             return
 
@@ -599,9 +1011,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if state.queue.is_empty:
+        if state is None or state.queue.is_empty:
             await interaction.response.send_message(MSG_QUEUE_EMPTY, ephemeral=True)
             return
 
@@ -635,9 +1047,9 @@ class Music(commands.Cog, name="music"):
             await interaction.response.send_message(error, ephemeral=True)
             return
 
-        state = self.state_manager.get_state(interaction.guild)
+        state = self.state_manager.peek_state(interaction.guild.id)
 
-        if not state.is_connected:
+        if state is None or not state.is_connected:
             await interaction.response.send_message(
                 MSG_BOT_NOT_IN_VOICE, ephemeral=True
             )
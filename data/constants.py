@@ -30,14 +30,53 @@ EMOJI_WARNING = "⚠️"
 EMOJI_INFO = "ℹ️"
 
 # Limits
-MAX_QUEUE_SIZE = 100
+MAX_QUEUE_SIZE = 10000
 MAX_TRACK_DURATION = 7200
 MAX_PLAYLIST_SIZE = 50
+PLAYLIST_BATCH_SIZE = 10  # tracks enqueued per event loop iteration
 SEARCH_RESULTS_LIMIT = 5
+MAX_PENDING_EXTRACTIONS = 5  # per guild
+TRACK_CACHE_SIZE = 2000
+SEARCH_CACHE_SIZE = 500
+METADATA_STORE_SIZE = 100000
+PREFETCH_DEPTH = 2  # upcoming tracks resolved ahead of time
+RESTORE_CONCURRENCY = 10  # guilds resumed at once after a restart
+STREAM_RECOVERY_ATTEMPTS = 3  # restarts of a broken stream per track
+MAX_SHARDS_SHOWN = 15  # shards listed one by one in /debug stats
+METRICS_HISTORY = 360  # samples kept for /debug trends
+TREND_POINTS = 30  # samples drawn per trend line
+LOOP_LAG_HISTORY = 600  # heartbeats kept for /debug loop (one minute)
+LOOP_STALLS_KEPT = 20
+TRACE_HISTORY = 200  # finished /play traces kept for /debug trace
+TRACES_SHOWN = 5
+TRACE_EXPORT_BATCH = 100  # traces per export request
 
 # Timeouts
 VOICE_TIMEOUT = 300
 SEARCH_TIMEOUT = 30
+SKIP_VOTE_TIMEOUT = 120
+TRACK_CACHE_TTL = 21600  # metadata
+STREAM_URL_TTL = 1800  # direct media URLs expire much sooner
+STREAM_EXPIRY_MARGIN = 60  # required validity left after a track would end
+STREAM_END_TOLERANCE = 5  # a stream ending sooner than this before the end broke
+SEARCH_CACHE_TTL = 3600
+METADATA_STORE_MAX_AGE = 2592000  # 30 days
+METADATA_FLUSH_INTERVAL = 5
+QUEUE_SNAPSHOT_INTERVAL = 10
+QUEUE_SNAPSHOT_MAX_AGE = 3600  # older snapshots are not resumed
+CLUSTER_REPORT_INTERVAL = 15
+CLUSTER_STABLE_UPTIME = 300  # a worker running this long resets its backoff
+CLUSTER_RESTART_BACKOFF_MAX = 60
+CLUSTER_SHUTDOWN_TIMEOUT = 8  # before a worker that ignores SIGTERM is killed
+AUDIO_NODE_RECONNECT_MAX = 30
+AUDIO_NODE_HANDSHAKE_TIMEOUT = 5
+AUDIO_NODE_STATE_INTERVAL = 1  # between position updates sent by the node
+AUDIO_NODE_VOICE_TIMEOUT = 30  # for a node to join voice with forwarded credentials
+STATE_SWEEP_INTERVAL = 60
+METRICS_SAMPLE_INTERVAL = 10
+LOOP_HEARTBEAT_INTERVAL = 0.1
+TRACE_EXPORT_INTERVAL = 5
+STATE_IDLE_TIMEOUT = 900  # before an unused guild state with nothing queued is evicted
 
 # Messages
 MSG_NOT_IN_VOICE = "❌ You need to be in a voice channel to use this command."
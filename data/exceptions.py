@@ -10,6 +10,12 @@ class AudioError(BotError):
     pass
 
 
+class AudioNodeError(AudioError):
+    """Raised when the audio node cannot be used."""
+
+    pass
+
+
 class DownloadError(AudioError):
     """Raised when downloading/extracting audio fails."""
 
@@ -0,0 +1,216 @@
+from itertools import chain, islice
+from typing import Generic, Iterable, Iterator, TypeVar
+
+
+T = TypeVar("T")
+
+
+class IndexedList(Generic[T]):
+    """
+    Sequence with logarithmic positional access, insert and delete.
+
+    Items are stored in blocks of bounded size, and a Fenwick tree over the
+    block lengths maps a position to its block in O(log n). Inserting into or
+    deleting from a block only shifts that block, so every positional
+    operation costs amortized O(log n) plus a bounded block shift, and
+    slicing ``k`` items costs O(log n + k).
+    """
+
+    def __init__(self, items: Iterable[T] = (), load: int = 256):
+        self._load: int = max(8, load)
+        self._blocks: list[list[T]] = []
+        self._tree: list[int] = [0]
+        self._len: int = 0
+        self._rebuild(list(items))
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+
+        return self._len
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate over items in order."""
+
+        return chain.from_iterable(self._blocks)
+
+    def __getitem__(self, index: int) -> T:
+        """Get the item at a non-negative index."""
+
+        block, offset = self._locate(index)
+
+        return self._blocks[block][offset]
+
+    def append(self, item: T) -> None:
+        """Add an item at the end."""
+
+        if not self._blocks:
+            self._blocks.append([item])
+            self._rebuild_tree()
+        else:
+            self._blocks[-1].append(item)
+            self._update(len(self._blocks) - 1, 1)
+            self._split_if_full(len(self._blocks) - 1)
+
+        self._len += 1
+
+    def extend(self, items: Iterable[T]) -> None:
+        """Add several items at the end."""
+
+        remaining = list(items)
+        if not remaining:
+            return
+
+        self._len += len(remaining)
+
+        if self._blocks:
+            room = max(0, self._load - len(self._blocks[-1]))
+            self._blocks[-1].extend(remaining[:room])
+            self._update(len(self._blocks) - 1, min(room, len(remaining)))
+            remaining = remaining[room:]
+
+        for start in range(0, len(remaining), self._load):
+            self._append_block(remaining[start : start + self._load])
+
+    def insert(self, index: int, item: T) -> None:
+        """Insert an item before a position (clamped to the valid range)."""
+
+        index = max(0, min(index, self._len))
+        if index == self._len:
+            self.append(item)
+            return
+
+        block, offset = self._locate(index)
+        self._blocks[block].insert(offset, item)
+        self._update(block, 1)
+        self._len += 1
+        self._split_if_full(block)
+
+    def pop(self, index: int) -> T:
+        """Remove and return the item at a non-negative index."""
+
+        block, offset = self._locate(index)
+        item = self._blocks[block].pop(offset)
+        self._len -= 1
+
+        if not self._blocks[block]:
+            del self._blocks[block]
+            self._rebuild_tree()
+        elif len(self._blocks[block]) < self._load // 4 and len(self._blocks) > 1:
+            self._merge(block)
+        else:
+            self._update(block, -1)
+
+        return item
+
+    def slice(self, start: int, stop: int) -> list[T]:
+        """
+        Return the items in ``[start, stop)``.
+
+        Args:
+            start: First position (clamped to the valid range)
+            stop: Position after the last item (clamped to the valid range)
+
+        Returns:
+            Items in order
+        """
+
+        start = max(0, start)
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+
+        block, offset = self._locate(start)
+        items = chain(
+            islice(self._blocks[block], offset, None),
+            chain.from_iterable(islice(self._blocks, block + 1, None)),
+        )
+
+        return list(islice(items, stop - start))
+
+    def clear(self) -> None:
+        """Remove all items."""
+
+        self._rebuild([])
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """Map a position to (block index, offset in block)."""
+
+        if index < 0 or index >= self._len:
+            raise IndexError(f"Index {index} out of range")
+
+        position = 0
+        remaining = index
+        step = 1 << (len(self._blocks).bit_length() - 1)
+
+        while step:
+            candidate = position + step
+            if candidate <= len(self._blocks) and self._tree[candidate] <= remaining:
+                position = candidate
+                remaining -= self._tree[candidate]
+            step >>= 1
+
+        return position, remaining
+
+    def _update(self, block: int, delta: int) -> None:
+        index = block + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def _prefix(self, blocks: int) -> int:
+        """Number of items in the first ``blocks`` blocks."""
+
+        total = 0
+        while blocks:
+            total += self._tree[blocks]
+            blocks -= blocks & -blocks
+
+        return total
+
+    def _append_block(self, items: list[T]) -> None:
+        """Add a block at the end, extending the tree in O(log n)."""
+
+        self._blocks.append(items)
+        index = len(self._blocks)
+
+        # The new node covers this block and the lowbit - 1 blocks before it
+        covered = self._prefix(index - 1) - self._prefix(index - (index & -index))
+        self._tree.append(len(items) + covered)
+
+    def _split_if_full(self, block: int) -> None:
+        items = self._blocks[block]
+        if len(items) <= self._load * 2:
+            return
+
+        self._blocks[block : block + 1] = [items[: self._load], items[self._load :]]
+        self._rebuild_tree()
+
+    def _merge(self, block: int) -> None:
+        """Merge an underfull block into a neighbour to keep blocks dense."""
+
+        low = block if block + 1 < len(self._blocks) else block - 1
+        merged = self._blocks[low] + self._blocks[low + 1]
+        self._blocks[low : low + 2] = [merged]
+
+        if len(merged) > self._load * 2:
+            self._split_if_full(low)
+        else:
+            self._rebuild_tree()
+
+    def _rebuild(self, items: list[T]) -> None:
+        self._blocks = [
+            items[start : start + self._load]
+            for start in range(0, len(items), self._load)
+        ]
+        self._len = len(items)
+        self._rebuild_tree()
+
+    def _rebuild_tree(self) -> None:
+        tree = [0] * (len(self._blocks) + 1)
+        for index, block in enumerate(self._blocks, start=1):
+            tree[index] += len(block)
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+
+        self._tree = tree
@@ -1,17 +1,32 @@
 from collections import deque
+from typing import Callable
+from data.indexed_list import IndexedList
 from data.track import Track
 from data.exceptions import QueueError
 
 
 class MusicQueue:
-    """Manages a queue of music tracks for a guild."""
+    """
+    Manages a queue of music tracks for a guild.
+
+    Tracks are kept in an IndexedList, so positional access, removal and
+    moves stay logarithmic for large queues, and the total duration is kept
+    as a running sum.
+    """
 
     def __init__(self):
-        self._queue: deque[Track] = deque()
+        self._queue: IndexedList[Track] = IndexedList()
+        self._total_duration: int = 0
         self._history: deque[Track] = deque(maxlen=10)
         self._loop: bool = False
         self._loop_queue: bool = False
 
+        # Bumped on every change to the upcoming tracks
+        self._revision: int = 0
+
+        # Called after edits that change which tracks are coming up next
+        self.on_change: Callable[[], None] | None = None
+
     def __len__(self) -> int:
         """Return the number of tracks in queue."""
 
@@ -64,6 +79,12 @@ class MusicQueue:
 
         self._loop_queue = value
 
+    @property
+    def revision(self) -> int:
+        """Counter that changes whenever the queued tracks change."""
+
+        return self._revision
+
     @property
     def history(self) -> list[Track]:
         """Get recently played tracks."""
@@ -82,9 +103,29 @@ class MusicQueue:
         """
 
         self._queue.append(track)
+        self._total_duration += track.duration
+        self._notify()
 
         return len(self._queue) - 1
 
+    def add_many(self, tracks: list[Track]) -> int:
+        """
+        Add several tracks to the end of the queue.
+
+        Args:
+            tracks: Tracks to add, in order
+
+        Returns:
+            Position of the first added track (0-indexed)
+        """
+
+        position = len(self._queue)
+        self._queue.extend(tracks)
+        self._total_duration += sum(track.duration for track in tracks)
+        self._notify()
+
+        return position
+
     def add_next(self, track: Track):
         """
         Add a track to play next (front of queue).
@@ -93,7 +134,9 @@ class MusicQueue:
             track: Track to add
         """
 
-        self._queue.appendleft(track)
+        self._queue.insert(0, track)
+        self._total_duration += track.duration
+        self._notify()
 
     def get_next(self) -> Track | None:
         """
@@ -106,11 +149,14 @@ class MusicQueue:
         if self.is_empty:
             return None
 
-        track = self._queue.popleft()
+        track = self._queue.pop(0)
         self._history.append(track)
+        self._revision += 1
 
         if self._loop_queue:
             self._queue.append(track)
+        else:
+            self._total_duration -= track.duration
 
         return track
 
@@ -127,6 +173,19 @@ class MusicQueue:
 
         return self._queue[0]
 
+    def peek_many(self, count: int) -> list[Track]:
+        """
+        Peek at the next tracks without removing them.
+
+        Args:
+            count: Maximum number of tracks to return
+
+        Returns:
+            Up to ``count`` tracks from the front of the queue
+        """
+
+        return self._queue.slice(0, count)
+
     def remove(self, index: int) -> Track:
         """
         Remove a track at a specific index.
@@ -144,13 +203,17 @@ class MusicQueue:
         if index < 0 or index >= len(self._queue):
             raise QueueError(f"Index {index} out of range")
 
-        track = self._queue[index]
-        del self._queue[index]
+        track = self._queue.pop(index)
+        self._total_duration -= track.duration
+        self._notify()
+
         return track
 
     def clear(self):
         """Clear all tracks from the queue."""
         self._queue.clear()
+        self._total_duration = 0
+        self._notify()
 
     def shuffle(self):
         """Shuffle the queue randomly."""
@@ -158,7 +221,8 @@ class MusicQueue:
 
         tracks = list(self._queue)
         random.shuffle(tracks)
-        self._queue = deque(tracks)
+        self._queue = IndexedList(tracks)
+        self._notify()
 
     def move(self, from_index: int, to_index: int):
         """
@@ -177,9 +241,9 @@ class MusicQueue:
         if to_index < 0 or to_index >= len(self._queue):
             raise QueueError(f"Target index {to_index} out of range")
 
-        track = self._queue[from_index]
-        del self._queue[from_index]
+        track = self._queue.pop(from_index)
         self._queue.insert(to_index, track)
+        self._notify()
 
     def get_total_duration(self) -> int:
         """
@@ -189,7 +253,21 @@ class MusicQueue:
             Total duration in seconds
         """
 
-        return sum(track.duration for track in self._queue)
+        return self._total_duration
+
+    def slice(self, start: int, end: int) -> list[Track]:
+        """
+        Get a range of tracks, e.g. one page of the queue.
+
+        Args:
+            start: Index of the first track
+            end: Index after the last track
+
+        Returns:
+            Tracks in ``[start, end)``, clipped to the queue
+        """
+
+        return self._queue.slice(start, end)
 
     def to_list(self) -> list[Track]:
         """
@@ -200,3 +278,10 @@ class MusicQueue:
         """
 
         return list(self._queue)
+
+    def _notify(self) -> None:
+        """Record a change and invoke the change callback, if any."""
+
+        self._revision += 1
+        if self.on_change:
+            self.on_change()
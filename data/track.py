@@ -1,18 +1,55 @@
-from dataclasses import dataclass
+import re
+import time
+from dataclasses import dataclass, replace
+from typing import Any
 import discord
 
 
-@dataclass
+# googlevideo URLs carry their expiry as a query parameter or path segment
+_EXPIRE_REGEX = re.compile(r"[?&/]expire[=/](\d+)")
+
+# Shared copies of strings that repeat across many tracks (uploaders,
+# requester names, codecs). Bounded so it cannot grow without limit.
+# Thumbnail URLs are left out: each is unique to its video, and a string
+# cannot share its host prefix with others, so pooling the host would mean
+# storing the URL in two parts for a saving of about 15 bytes per track.
+_STRING_POOL: dict[str, str] = {}
+_STRING_POOL_SIZE = 65536
+
+
+def _intern(value: str | None) -> str | None:
+    """Return a shared copy of a frequently repeated string."""
+
+    if value is None:
+        return None
+
+    pooled = _STRING_POOL.get(value)
+    if pooled is None:
+        if len(_STRING_POOL) >= _STRING_POOL_SIZE:
+            _STRING_POOL.clear()
+        pooled = _STRING_POOL[value] = value
+
+    return pooled
+
+
+@dataclass(slots=True)
 class Track:
     """Represents a music track."""
 
     title: str
-    url: str
     webpage_url: str
     duration: int  # in seconds
     thumbnail: str | None = None
     uploader: str | None = None
-    requester: discord.Member | None = None
+    requester_id: int | None = None
+    requester_name: str | None = None
+    stream_url: str | None = None  # resolved just before playback
+    codec: str | None = None  # audio codec of stream_url, e.g. "opus"
+
+    def __post_init__(self) -> None:
+        self.uploader = _intern(self.uploader)
+        self.requester_name = _intern(self.requester_name)
+        self.codec = _intern(self.codec)
 
     @property
     def duration_formatted(self) -> str:
@@ -25,3 +62,87 @@ class Track:
             return f"{hours}:{minutes:02d}:{seconds:02d}"
 
         return f"{minutes}:{seconds:02d}"
+
+    @property
+    def stream_expires_at(self) -> int | None:
+        """Unix timestamp at which the stream URL stops working, if known."""
+
+        if not self.stream_url:
+            return None
+
+        match = _EXPIRE_REGEX.search(self.stream_url)
+
+        return int(match.group(1)) if match else None
+
+    def needs_stream(self, margin: int = 0) -> bool:
+        """
+        Check if the stream URL must be resolved before playback.
+
+        Args:
+            margin: Extra seconds the URL must stay valid after the track ends
+
+        Returns:
+            True if the URL is missing or would expire before the track ends
+        """
+
+        if not self.stream_url:
+            return True
+
+        expires_at = self.stream_expires_at
+        if expires_at is None:
+            return False
+
+        return expires_at <= time.time() + self.duration + margin
+
+    def requested_by(self, member: discord.Member) -> "Track":
+        """
+        Copy the track's metadata for a new request.
+
+        Args:
+            member: Discord member who requested the track
+
+        Returns:
+            New track without a stream URL, attributed to the member
+        """
+
+        return replace(
+            self,
+            requester_id=member.id,
+            requester_name=member.name,
+            stream_url=None,
+            codec=None,
+        )
+
+    def to_tuple(self) -> tuple[Any, ...]:
+        """
+        Serialize the track's stable metadata.
+
+        Stream URLs expire, so they are not included.
+
+        Returns:
+            Tuple accepted by ``from_tuple``
+        """
+
+        return (
+            self.title,
+            self.webpage_url,
+            self.duration,
+            self.thumbnail,
+            self.uploader,
+            self.requester_id,
+            self.requester_name,
+        )
+
+    @classmethod
+    def from_tuple(cls, data: tuple[Any, ...] | list[Any]) -> "Track":
+        """
+        Rebuild a track serialized with ``to_tuple``.
+
+        Args:
+            data: Serialized track
+
+        Returns:
+            Track without a stream URL
+        """
+
+        return cls(*data[:7])
@@ -2,7 +2,18 @@ import sys
 import asyncio
 import signal
 from client import MusicBot, create_bot
-from utils.config import TOKEN, ENVIRONMENT, COMMAND_PREFIX, test_guild_id
+from utils.cluster import Supervisor, recommended_shard_count
+from utils.config import (
+    TOKEN,
+    ENVIRONMENT,
+    COMMAND_PREFIX,
+    SHARD_COUNT,
+    SHARD_IDS,
+    CLUSTER_WORKERS,
+    CLUSTER_ID,
+    CLUSTER_SOCKET,
+    test_guild_id,
+)
 
 
 def setup_environment():
@@ -19,6 +30,17 @@ def setup_environment():
     else:
         print("Test Guild ID: Not set (Production Mode)")
 
+    if SHARD_IDS and not SHARD_COUNT:
+        print("❌ ERROR: SHARD_IDS requires SHARD_COUNT to be set!")
+        sys.exit(1)
+
+    print(f"Shards: {SHARD_IDS or 'all'} of {SHARD_COUNT or 'recommended count'}")
+
+    if CLUSTER_ID is not None:
+        print(f"Cluster worker: {CLUSTER_ID}")
+    elif CLUSTER_WORKERS > 0:
+        print(f"Cluster mode: {CLUSTER_WORKERS} worker process(es)")
+
     return TOKEN
 
 
@@ -37,7 +59,9 @@ async def main():
     """Main function to run the bot."""
 
     token = setup_environment()
-    bot = create_bot(COMMAND_PREFIX, test_guild_id)
+    bot = create_bot(
+        COMMAND_PREFIX, test_guild_id, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS
+    )
 
     # Setup signal handlers
     loop = asyncio.get_event_loop()
@@ -54,6 +78,9 @@ async def main():
         import traceback
 
         traceback.print_exc()
+
+        # Non-zero, so a cluster supervisor restarts this worker
+        sys.exit(1)
     finally:
         if not bot.is_closed():
             await bot.close()
@@ -63,9 +90,31 @@ async def main():
         print("-" * 50)
 
 
+async def run_cluster():
+    """Run the bot as supervised worker processes, one per shard range."""
+
+    token = setup_environment()
+    shard_count = SHARD_COUNT or await recommended_shard_count(token)
+
+    supervisor = Supervisor(CLUSTER_WORKERS, shard_count, CLUSTER_SOCKET)
+
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, supervisor.stop)
+
+    await supervisor.run()
+
+    print("\n" + "-" * 50)
+    print("Cluster has been shut down successfully.")
+    print("-" * 50)
+
+
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if CLUSTER_WORKERS > 0 and CLUSTER_ID is None:
+            asyncio.run(run_cluster())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\nShutdown complete.")
     except Exception as exception:
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import os
+import shutil
+import ssl
+import struct
+import subprocess
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Any
+import pytest
+
+if sys.version_info < (3, 12):
+    pytest.skip("the bot's modules need Python 3.12", allow_module_level=True)
+
+import aiohttp
+from aiohttp import web
+from nacl.bindings import crypto_aead_xchacha20poly1305_ietf_decrypt
+from audio_node import handle_connection
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("openssl")),
+    reason="needs ffmpeg and openssl",
+)
+
+GUILD_ID = 111
+USER_ID = 222
+CHANNEL_ID = 333
+TRACK_SECONDS = 2
+
+
+class FakeVoiceServer:
+    """
+    Voice server on localhost that records what a client sends it.
+
+    Speaks the voice websocket handshake (hello, identify, ready, select
+    protocol, session description) without DAVE, answers UDP IP discovery
+    and decrypts every RTP packet with the session key.
+    """
+
+    MODE = "aead_xchacha20_poly1305_rtpsize"
+
+    def __init__(self, ssl_context: ssl.SSLContext):
+        self.ssl_context: ssl.SSLContext = ssl_context
+        self.ssrc: int = 4242
+        self.secret_key: bytes = os.urandom(32)
+        self.identify: dict[str, Any] | None = None
+        self.speaking: list[int] = []
+        self.packets: list[tuple[int, int, bytes]] = []  # sequence, SSRC, payload
+        self.endpoint: str = ""
+        self._udp_port: int = 0
+        self._runner: web.AppRunner | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _VoiceUDP(self), local_addr=("127.0.0.1", 0)
+        )
+        self._udp_port = self._transport.get_extra_info("sockname")[1]
+
+        app = web.Application()
+        app.router.add_get("/", self._websocket)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, ssl_context=self.ssl_context)
+        await site.start()
+        self.endpoint = f"127.0.0.1:{self._runner.addresses[0][1]}"
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+        if self._transport:
+            self._transport.close()
+
+    def receive_rtp(self, packet: bytes) -> None:
+        header, ciphertext, nonce = packet[:12], packet[12:-4], packet[-4:] + bytes(20)
+        payload = crypto_aead_xchacha20poly1305_ietf_decrypt(
+            ciphertext, header, nonce, self.secret_key
+        )
+        sequence, _, ssrc = struct.unpack(">HII", header[2:])
+        self.packets.append((sequence, ssrc, payload))
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"op": 8, "d": {"heartbeat_interval": 1000}})
+
+        async for message in ws:
+            data = json.loads(message.data)
+            op, payload = data["op"], data["d"]
+
+            if op == 0:
+                self.identify = payload
+                await ws.send_json(
+                    {
+                        "op": 2,
+                        "d": {
+                            "ssrc": self.ssrc,
+                            "ip": "127.0.0.1",
+                            "port": self._udp_port,
+                            "modes": [self.MODE],
+                        },
+                    }
+                )
+            elif op == 1:
+                assert payload["data"]["mode"] == self.MODE
+                await ws.send_json(
+                    {
+                        "op": 4,
+                        "d": {
+                            "mode": self.MODE,
+                            "secret_key": list(self.secret_key),
+                            "dave_protocol_version": 0,
+                        },
+                    }
+                )
+            elif op == 3:
+                await ws.send_json({"op": 6, "d": {"t": payload["t"]}})
+            elif op == 5:
+                self.speaking.append(payload["speaking"])
+
+        return ws
+
+
+class _VoiceUDP(asyncio.DatagramProtocol):
+    def __init__(self, server: FakeVoiceServer):
+        self.server: FakeVoiceServer = server
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        if len(data) == 74 and data[1] == 0x01:
+            # IP discovery: answer with the address the packet came from
+            reply = bytearray(74)
+            struct.pack_into(">HHI", reply, 0, 2, 70, self.server.ssrc)
+            reply[8 : 8 + len(addr[0])] = addr[0].encode()
+            struct.pack_into(">H", reply, 72, addr[1])
+            assert self.transport is not None
+            self.transport.sendto(bytes(reply), addr)
+        else:
+            self.server.receive_rtp(data)
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    directory = tmp_path_factory.mktemp("tls")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", str(directory / "key.pem"), "-out", str(directory / "cert.pem"),
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )  # fmt: skip
+
+    return directory
+
+
+@pytest.fixture(scope="module")
+def track(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("audio") / "tone.wav"
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error", "-f", "lavfi",
+            "-i", f"sine=frequency=440:duration={TRACK_SECONDS}", "-ac", "2", str(path),
+        ],
+        check=True,
+    )  # fmt: skip
+
+    return path
+
+
+class NodeSession:
+    """A fake voice server, an audio node serving it, and a bot connection."""
+
+    def __init__(self, certificate: Path):
+        server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_context.load_cert_chain(
+            certificate / "cert.pem", certificate / "key.pem"
+        )
+        self.client_context: ssl.SSLContext = ssl.create_default_context(
+            cafile=str(certificate / "cert.pem")
+        )
+        self.voice_server: FakeVoiceServer = FakeVoiceServer(server_context)
+
+    async def __aenter__(self) -> "NodeSession":
+        await self.voice_server.start()
+
+        self.http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=self.client_context)
+        )
+        self.node = await asyncio.start_server(
+            partial(handle_connection, http=self.http), "127.0.0.1", 0
+        )
+        port = self.node.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.writer.close()
+        await asyncio.sleep(0.5)  # let the node leave voice
+        self.node.close()
+        await self.http.close()
+        await self.voice_server.close()
+
+    def send(self, op: str, **fields: Any) -> None:
+        self.writer.write(
+            json.dumps({"op": op, "guild_id": GUILD_ID, **fields}).encode() + b"\n"
+        )
+
+    async def receive(self, op: str) -> dict[str, Any]:
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), 15))
+            if message["op"] == op:
+                return message
+
+    async def join(self) -> None:
+        self.send("hello")
+        assert (await self.receive("ready"))["voice"] is True
+
+        self.send(
+            "voice",
+            user_id=USER_ID,
+            channel_id=CHANNEL_ID,
+            session_id="session",
+            token="token",
+            endpoint=self.voice_server.endpoint,
+        )
+
+
+def test_node_plays_track_over_voice(certificate: Path, track: Path):
+    async def scenario() -> tuple[FakeVoiceServer, dict[str, Any]]:
+        async with NodeSession(certificate) as session:
+            await session.join()
+            session.send("play", play_id=1, url=str(track), start=0, volume=0.5)
+            end = await session.receive("end")
+
+        return session.voice_server, end
+
+    server, end = asyncio.run(scenario())
+
+    assert server.identify is not None
+    assert server.identify["server_id"] == str(GUILD_ID)
+    assert server.identify["user_id"] == str(USER_ID)
+    assert server.identify["session_id"] == "session"
+    assert server.identify["token"] == "token"
+    assert 1 in server.speaking
+
+    assert end["play_id"] == 1
+    assert end["reason"] == "finished"
+    assert end["error"] is None
+    assert end["position"] == pytest.approx(TRACK_SECONDS, abs=0.1)
+
+    # One 20 ms Opus frame per packet, in order, all decrypted with the key
+    sequences = [sequence for sequence, _, _ in server.packets]
+    assert len(server.packets) >= TRACK_SECONDS * 50
+    assert sequences == list(range(sequences[0], sequences[0] + len(sequences)))
+    assert {ssrc for _, ssrc, _ in server.packets} == {server.ssrc}
+    assert all(payload for _, _, payload in server.packets)
+
+
+def test_node_reports_stop_and_seek(certificate: Path, track: Path):
+    async def scenario() -> tuple[dict[str, Any], dict[str, Any]]:
+        async with NodeSession(certificate) as session:
+            await session.join()
+            session.send("play", play_id=1, url=str(track), start=0, volume=0.5)
+            await session.receive("state")
+
+            session.send("seek", position=1.5)
+            session.send("pause")
+            paused = await session.receive("state")
+            session.send("stop")
+            end = await session.receive("end")
+
+        return paused, end
+
+    paused, end = asyncio.run(scenario())
+
+    assert paused["paused"] is True
+    assert paused["position"] >= 1.5
+    assert end["reason"] == "stopped"
+    assert end["position"] < TRACK_SECONDS
@@ -0,0 +1,78 @@
+import random
+import pytest
+from data.indexed_list import IndexedList
+
+
+def test_matches_list_under_random_operations():
+    # Small blocks, so splits, merges and multi-block extends happen often
+    for seed in range(200):
+        rng = random.Random(seed)
+        items: IndexedList[float] = IndexedList(load=8)
+        expected: list[float] = []
+
+        for _ in range(300):
+            op = rng.random()
+            if op < 0.3:
+                batch = [rng.random() for _ in range(rng.randint(0, 40))]
+                items.extend(batch)
+                expected.extend(batch)
+            elif op < 0.5:
+                value = rng.random()
+                items.append(value)
+                expected.append(value)
+            elif op < 0.7:
+                index = rng.randint(-2, len(expected) + 2)
+                value = rng.random()
+                items.insert(index, value)
+                expected.insert(max(0, min(index, len(expected))), value)
+            elif op < 0.9 and expected:
+                index = rng.randrange(len(expected))
+                assert items.pop(index) == expected.pop(index)
+            elif op < 0.92:
+                items.clear()
+                expected.clear()
+
+            assert len(items) == len(expected)
+            assert list(items) == expected
+
+            if expected:
+                index = rng.randrange(len(expected))
+                assert items[index] == expected[index]
+
+                start = rng.randint(-3, len(expected) + 3)
+                stop = rng.randint(-3, len(expected) + 3)
+                assert (
+                    items.slice(start, stop) == expected[max(0, start) : max(0, stop)]
+                )
+
+            # Incremental tree updates agree with a full rebuild
+            tree = list(items._tree)
+            items._rebuild_tree()
+            assert items._tree == tree, seed
+
+
+def test_extend_fills_the_last_block_before_adding_blocks():
+    items = IndexedList(range(10), load=8)
+    items.extend(range(10, 40))
+
+    assert list(items) == list(range(40))
+    assert [len(block) for block in items._blocks] == [8, 8, 8, 8, 8]
+    assert [items[index] for index in (0, 7, 8, 39)] == [0, 7, 8, 39]
+
+
+@pytest.mark.parametrize("index", [-1, 3])
+def test_out_of_range_access_raises(index: int):
+    items = IndexedList([1, 2, 3])
+
+    with pytest.raises(IndexError):
+        items[index]
+    with pytest.raises(IndexError):
+        items.pop(index)
+
+
+def test_insert_clamps_to_the_ends():
+    items = IndexedList([2, 3])
+    items.insert(-5, 1)
+    items.insert(99, 4)
+
+    assert list(items) == [1, 2, 3, 4]
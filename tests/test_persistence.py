@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+from data.track import Track
+from utils.persistence import SnapshotStore
+
+MAX_AGE = 3600
+
+TRACK = Track(
+    title="Title",
+    webpage_url="https://youtu.be/a",
+    duration=60,
+    uploader="Uploader",
+    requester_id=1,
+    requester_name="user",
+    stream_url="https://example.com/expiring",
+)
+
+
+def restart(directory: Path) -> SnapshotStore:
+    """A fresh store over the same directory, as after a restart."""
+
+    return SnapshotStore(str(directory), MAX_AGE)
+
+
+def snapshot(guild_id: int, position: float = 0.0) -> dict[str, Any]:
+    return {
+        "guild_id": guild_id,
+        "position": position,
+        "queue": [TRACK.to_tuple()],
+    }
+
+
+def write_raw(directory: Path, guild_id: int, data: dict[str, Any]) -> Path:
+    path = directory / f"{guild_id}.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    return path
+
+
+def test_snapshots_survive_a_restart(tmp_path: Path):
+    store = restart(tmp_path)
+    asyncio.run(store.save({1: snapshot(1, 12.5), 2: snapshot(2)}))
+    store.close()
+
+    store = restart(tmp_path)
+    loaded = sorted(asyncio.run(store.load()), key=lambda item: item["guild_id"])
+    store.close()
+
+    assert [item["guild_id"] for item in loaded] == [1, 2]
+    assert loaded[0]["position"] == 12.5
+    # Stream URLs expire, so they are not part of a snapshot
+    restored = Track.from_tuple(loaded[0]["queue"][0])
+    assert restored.stream_url is None
+    assert restored.to_tuple() == TRACK.to_tuple()
+    assert loaded[0]["saved_at"] <= time.time()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_none_deletes_a_snapshot(tmp_path: Path):
+    store = restart(tmp_path)
+    asyncio.run(store.save({1: snapshot(1), 2: snapshot(2)}))
+    asyncio.run(store.save({1: None}))
+    store.close()
+
+    store = restart(tmp_path)
+    assert [item["guild_id"] for item in asyncio.run(store.load())] == [2]
+    store.close()
+
+
+def test_unchanged_snapshots_are_not_rewritten(tmp_path: Path):
+    store = restart(tmp_path)
+    path = tmp_path / "1.json"
+
+    asyncio.run(store.save({1: snapshot(1)}))
+    saved_at = json.loads(path.read_text())["saved_at"]
+
+    asyncio.run(store.save({1: snapshot(1)}))
+    assert json.loads(path.read_text())["saved_at"] == saved_at
+
+    asyncio.run(store.save({1: snapshot(1, 30.0)}))
+    assert json.loads(path.read_text())["position"] == 30.0
+    store.close()
+
+
+def test_stale_and_unreadable_snapshots_are_dropped(tmp_path: Path):
+    old = time.time() - MAX_AGE - 60
+    stale = write_raw(tmp_path, 1, {**snapshot(1), "saved_at": old})
+    fresh = write_raw(tmp_path, 2, {**snapshot(2), "saved_at": time.time()})
+    broken = tmp_path / "3.json"
+    broken.write_text("{not json", encoding="utf-8")
+
+    store = restart(tmp_path)
+    assert [item["guild_id"] for item in asyncio.run(store.load())] == [2]
+    store.close()
+
+    assert not stale.exists() and not broken.exists()
+    assert fresh.exists()
+
+
+def test_old_snapshot_is_kept_while_the_bot_was_alive(tmp_path: Path):
+    # e.g. paused for hours: nothing changed, but saves kept touching "alive"
+    old = time.time() - MAX_AGE - 60
+    write_raw(tmp_path, 1, {**snapshot(1), "saved_at": old})
+    (tmp_path / "alive").touch()
+
+    store = restart(tmp_path)
+    assert [item["guild_id"] for item in asyncio.run(store.load())] == [1]
+    store.close()
+
+
+def test_liveness_of_the_previous_run_is_read_before_saving(tmp_path: Path):
+    old = time.time() - MAX_AGE - 60
+    write_raw(tmp_path, 1, {**snapshot(1), "saved_at": old})
+    alive = tmp_path / "alive"
+    alive.touch()
+    os.utime(alive, (old, old))
+
+    # A save before the load must not make the old run look alive
+    store = restart(tmp_path)
+    asyncio.run(store.save({}))
+    assert asyncio.run(store.load()) == []
+    store.close()
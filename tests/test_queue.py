@@ -0,0 +1,91 @@
+import random
+import pytest
+from data.exceptions import QueueError
+from data.queue import MusicQueue
+from data.track import Track
+
+
+def make_track(index: int, duration: int) -> Track:
+    return Track(f"Track {index}", f"https://youtu.be/{index}", duration)
+
+
+def test_running_duration_matches_queued_tracks():
+    rng = random.Random(3)
+    queue = MusicQueue()
+    expected: list[Track] = []
+    count = 0
+
+    def new_track() -> Track:
+        nonlocal count
+        count += 1
+        return make_track(count, rng.randint(1, 600))
+
+    for _ in range(2000):
+        op = rng.random()
+        if op < 0.25:
+            track = new_track()
+            queue.add(track)
+            expected.append(track)
+        elif op < 0.4:
+            tracks = [new_track() for _ in range(rng.randint(0, 30))]
+            queue.add_many(tracks)
+            expected.extend(tracks)
+        elif op < 0.5:
+            track = new_track()
+            queue.add_next(track)
+            expected.insert(0, track)
+        elif op < 0.65:
+            queue.loop_queue = rng.random() < 0.3
+            track = queue.get_next()
+            assert track is (expected.pop(0) if expected else None)
+            if track and queue.loop_queue:
+                expected.append(track)
+        elif op < 0.8 and expected:
+            index = rng.randrange(len(expected))
+            assert queue.remove(index) is expected.pop(index)
+        elif op < 0.9 and expected:
+            source, target = rng.randrange(len(expected)), rng.randrange(len(expected))
+            queue.move(source, target)
+            expected.insert(target, expected.pop(source))
+        elif op < 0.92:
+            queue.shuffle()
+            assert sorted(queue, key=id) == sorted(expected, key=id)
+            expected = queue.to_list()
+        elif op < 0.93:
+            queue.clear()
+            expected.clear()
+
+        assert queue.to_list() == expected
+        assert queue.get_total_duration() == sum(track.duration for track in expected)
+
+
+def test_changes_bump_the_revision_and_notify():
+    queue = MusicQueue()
+    changes: list[int] = []
+    queue.on_change = lambda: changes.append(queue.revision)
+
+    queue.add(make_track(1, 60))
+    queue.add_many([make_track(2, 60), make_track(3, 60)])
+    queue.move(0, 2)
+    queue.remove(0)
+
+    assert changes == [1, 2, 3, 4]
+
+    revision = queue.revision
+    queue.get_next()
+    assert queue.revision > revision
+
+
+@pytest.mark.parametrize("index", [-1, 1])
+def test_out_of_range_positions_raise_queue_errors(index: int):
+    queue = MusicQueue()
+    queue.add(make_track(1, 60))
+
+    with pytest.raises(QueueError):
+        queue[index]
+    with pytest.raises(QueueError):
+        queue.remove(index)
+    with pytest.raises(QueueError):
+        queue.move(index, 0)
+    with pytest.raises(QueueError):
+        queue.move(0, index)
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from utils.extraction import SingleFlight
+
+
+def test_concurrent_calls_with_one_key_run_once():
+    async def scenario() -> None:
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def extract() -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "info"
+
+        waiters = [asyncio.create_task(flight.run("url", extract)) for _ in range(3)]
+        other = asyncio.create_task(flight.run("other", extract))
+        await asyncio.sleep(0)
+
+        assert len(flight) == 2
+        release.set()
+
+        assert await asyncio.gather(*waiters, other) == ["info"] * 4
+        assert calls == 2
+        assert flight.coalesced == 2
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario() -> None:
+        flight = SingleFlight()
+        calls = 0
+
+        async def extract() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise ValueError("unavailable")
+
+        results = await asyncio.gather(
+            flight.run("url", extract),
+            flight.run("url", extract),
+            return_exceptions=True,
+        )
+        assert [type(result) for result in results] == [ValueError, ValueError]
+
+        # The failed call is forgotten, so the next one runs again
+        with pytest.raises(ValueError):
+            await flight.run("url", extract)
+        assert calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    async def scenario() -> None:
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def extract() -> str:
+            await release.wait()
+            return "info"
+
+        first = asyncio.create_task(flight.run("url", extract))
+        second = asyncio.create_task(flight.run("url", extract))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "info"
+        assert first.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_call_is_cancelled_once_every_waiter_gave_up():
+    async def scenario() -> None:
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def extract() -> str:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "info"
+
+        waiters = [asyncio.create_task(flight.run("url", extract)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,133 @@
+import asyncio
+import random
+import pytest
+from utils.timers import TimerWheel
+
+RESOLUTION = 0.01
+
+# Tiny wheels (4 slots, 3 levels: 64 ticks) so short delays exercise cascades
+# and parking beyond the slowest wheel
+SLOTS = 4
+LEVELS = 3
+
+
+def test_timers_fire_in_order_and_never_early():
+    async def scenario() -> None:
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(resolution=RESOLUTION, slots=SLOTS, levels=LEVELS)
+        rng = random.Random(7)
+        fired: list[tuple[float, float, float]] = []  # due, fired, delay
+
+        def record(due: float, delay: float) -> None:
+            fired.append((due, loop.time(), delay))
+
+        for _ in range(60):
+            # Up to 0.9 s, past the 0.64 s the wheels cover
+            delay = rng.choice([0.0, RESOLUTION, rng.uniform(0, 0.9)])
+            wheel.schedule(
+                delay, lambda due=loop.time() + delay, delay=delay: record(due, delay)
+            )
+            await asyncio.sleep(rng.uniform(0, 0.005))
+
+        await asyncio.wait_for(wait_until_empty(wheel), 3)
+
+        assert len(fired) == 60
+        for due, fired_at, delay in fired:
+            assert fired_at >= due, delay
+            # One tick late at most, plus scheduling slack
+            assert fired_at - due < RESOLUTION + 0.05, delay
+
+        # Nothing fires after a timer due more than a tick later
+        latest_due = 0.0
+        for due, _, delay in fired:
+            assert due > latest_due - RESOLUTION, delay
+            latest_due = max(latest_due, due)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_timers_do_not_fire():
+    async def scenario() -> None:
+        wheel = TimerWheel(resolution=RESOLUTION, slots=SLOTS, levels=LEVELS)
+        fired: list[str] = []
+
+        kept = wheel.schedule(0.05, lambda: fired.append("kept"))
+        cancelled = wheel.schedule(0.05, lambda: fired.append("cancelled"))
+        far = wheel.schedule(5, lambda: fired.append("far"))
+        assert len(wheel) == 3
+
+        cancelled.cancel()
+        far.cancel()
+        cancelled.cancel()  # no-op the second time
+        assert not cancelled.active and not far.active
+        assert len(wheel) == 1
+
+        await asyncio.wait_for(wait_until_empty(wheel), 1)
+
+        assert fired == ["kept"]
+        assert not kept.active
+
+    asyncio.run(scenario())
+
+
+def test_coroutine_callbacks_run_and_failures_are_contained(
+    caplog: pytest.LogCaptureFixture,
+):
+    async def scenario() -> None:
+        wheel = TimerWheel(resolution=RESOLUTION, slots=SLOTS, levels=LEVELS)
+        done = asyncio.Event()
+
+        async def finish() -> None:
+            done.set()
+
+        async def fail_later() -> None:
+            raise RuntimeError("async boom")
+
+        def fail_now() -> None:
+            raise RuntimeError("boom")
+
+        wheel.schedule(0.01, fail_now)
+        wheel.schedule(0.01, fail_later)
+        wheel.schedule(0.02, finish)
+
+        await asyncio.wait_for(done.wait(), 1)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    failures = [
+        record for record in caplog.records if "Timer callback failed" in record.message
+    ]
+    assert len(failures) == 2
+
+
+def test_driver_stops_when_idle_and_restarts():
+    async def scenario() -> None:
+        wheel = TimerWheel(resolution=RESOLUTION, slots=SLOTS, levels=LEVELS)
+        fired: list[int] = []
+
+        wheel.schedule(0.01, lambda: fired.append(1))
+        await asyncio.wait_for(wait_until_empty(wheel), 1)
+        assert wheel._driver is not None
+        await asyncio.wait_for(wheel._driver, 1)
+
+        # Idle for longer than the wheels cover, then schedule again
+        await asyncio.sleep(0.7)
+        wheel.schedule(0.01, lambda: fired.append(2))
+        await asyncio.wait_for(wait_until_empty(wheel), 1)
+
+        assert fired == [1, 2]
+        wheel.close()
+
+    asyncio.run(scenario())
+
+
+def test_slot_count_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        TimerWheel(slots=10)
+
+
+async def wait_until_empty(wheel: TimerWheel) -> None:
+    while len(wheel):
+        await asyncio.sleep(RESOLUTION)
+    await asyncio.sleep(0)
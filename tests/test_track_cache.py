@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+import pytest
+from data.track import Track
+from utils.cache import TrackCache
+
+
+class Clock:
+    """Stands in for time.monotonic so expiry can be tested without sleeping."""
+
+    def __init__(self):
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr("utils.cache.time", SimpleNamespace(monotonic=clock))
+
+    return clock
+
+
+def make_track(video_id: str) -> Track:
+    return Track(f"Track {video_id}", f"https://youtu.be/{video_id}", 60)
+
+
+def test_aliases_reach_the_canonical_entry(clock: Clock):
+    cache = TrackCache(max_size=10, ttl=100, stream_ttl=10)
+    track = make_track("a")
+    cache.put("youtube:a", track, aliases=["never gonna", track.webpage_url, ""])
+
+    for key in ("youtube:a", "never gonna", track.webpage_url):
+        entry = cache.get(key)
+        assert entry is not None and entry.track is track
+
+    assert cache.get("") is None
+    assert cache.get("youtube:b") is None
+    assert (cache.hits, cache.misses) == (3, 2)
+    assert len(cache) == 1
+
+
+def test_stream_expires_before_metadata(clock: Clock):
+    cache = TrackCache(max_size=10, ttl=100, stream_ttl=10)
+    cache.put("youtube:a", make_track("a"), aliases=["query"])
+
+    entry = cache.get("query")
+    assert entry is not None and entry.has_fresh_stream
+
+    clock.now += 10
+    entry = cache.get("query")
+    assert entry is not None and not entry.has_fresh_stream
+
+    clock.now += 90
+    assert cache.get("query") is None
+    assert cache.get("youtube:a") is None
+    assert len(cache) == 0
+
+
+def test_put_refreshes_both_expiry_times(clock: Clock):
+    cache = TrackCache(max_size=10, ttl=100, stream_ttl=10)
+    cache.put("youtube:a", make_track("a"))
+
+    clock.now += 50
+    cache.put("youtube:a", make_track("a"))
+    clock.now += 60
+
+    entry = cache.get("youtube:a")
+    assert entry is not None and not entry.has_fresh_stream
+
+
+def test_least_recently_used_entry_is_evicted(clock: Clock):
+    cache = TrackCache(max_size=2, ttl=100, stream_ttl=10)
+    cache.put("youtube:a", make_track("a"), aliases=["a"])
+    cache.put("youtube:b", make_track("b"), aliases=["b"])
+
+    # Reading through an alias counts as a use of the entry
+    assert cache.get("a") is not None
+    cache.put("youtube:c", make_track("c"), aliases=["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("youtube:b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert len(cache) == 2
+
+
+def test_alias_table_stays_bounded(clock: Clock):
+    cache = TrackCache(max_size=2, ttl=100, stream_ttl=10)
+    for index in range(20):
+        cache.put("youtube:a", make_track("a"), aliases=[f"query {index}"])
+
+    assert cache.get("query 19") is not None
+    assert cache.get("query 0") is None
+    assert len(cache._aliases) <= 2 * 4
@@ -0,0 +1,26 @@
+import pytest
+from utils.validators import Validators
+
+
+@pytest.mark.parametrize(
+    ("text", "seconds"),
+    [
+        ("0", 0),
+        ("90", 90),
+        ("1:30", 90),
+        ("01:02:03", 3723),
+        (" 2:00 ", 120),
+        # Components are not limited to 59, so 1:75 is 2:15
+        ("1:75", 135),
+    ],
+)
+def test_parse_timestamp_accepts_seconds_and_colon_forms(text: str, seconds: int):
+    assert Validators.parse_timestamp(text) == seconds
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", " ", ":", "1:", ":30", "1::2", "1:2:3:4", "-5", "1.5", "1:3O", "²", "1:2 3"],
+)
+def test_parse_timestamp_rejects_anything_else(text: str):
+    assert Validators.parse_timestamp(text) is None
@@ -1,31 +1,271 @@
 import asyncio
-from typing import Any, Callable, cast
+import io
+import subprocess
+import time
+from typing import IO, Any, Callable, cast, override
 import discord
-import yt_dlp
 from data.track import Track
+from data.constants import (
+    MAX_PENDING_EXTRACTIONS,
+    MAX_PLAYLIST_SIZE,
+    TRACK_CACHE_SIZE,
+    TRACK_CACHE_TTL,
+    STREAM_URL_TTL,
+    STREAM_EXPIRY_MARGIN,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
+)
 from data.exceptions import AudioError, DownloadError
-from utils.config import YTDL_FORMAT_OPTIONS, YTDL_HEADERS, FFMPEG_OPTIONS
+from utils.config import (
+    YTDL_FORMAT_OPTIONS,
+    YTDL_HEADERS,
+    FFMPEG_OPTIONS,
+    EXTRACTION_WORKERS,
+    EXTRACTION_MAX_IN_FLIGHT,
+    OPUS_PASSTHROUGH,
+    FFMPEG_VOLUME,
+)
+from utils.extraction import ExtractionPool, SingleFlight
+from utils.cache import CacheEntry, SearchCache, TrackCache
+from utils.metadata_store import MetadataStore
+from utils.metrics import EXTRACTION_FAILURES, EXTRACTION_SECONDS, FFMPEG_SPAWN_FAILURES
+from utils.tracing import span
+from utils.validators import Validators
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 
+class _FFmpegLog(io.RawIOBase):
+    """
+    Stderr of an ffmpeg process that takes commands on stdin.
+
+    ffmpeg prints a prompt and a reply for every stdin command straight to
+    stderr, whatever the log level. Those lines are dropped and the rest is
+    logged. discord.py copies the process's stderr here from its own thread.
+    """
+
+    _CHATTER: tuple[bytes, ...] = (b"Enter command:", b"Command reply for stream")
+
+    def __init__(self):
+        super().__init__()
+        self._partial: bytes = b""
+
+    @override
+    def writable(self) -> bool:
+        return True
+
+    @override
+    def write(self, data: Any, /) -> int:
+        *lines, self._partial = (self._partial + bytes(data)).split(b"\n")
+
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith(self._CHATTER):
+                logger.warning(f"ffmpeg: {line.decode(errors='replace')}")
+
+        return len(data)
+
+
+class FFmpegVolumeAudio(discord.FFmpegOpusAudio):
+    """
+    Opus source that applies volume inside ffmpeg's filter graph.
+
+    ffmpeg accepts filter commands on stdin (``c`` followed by
+    ``<target> <time> <command> <argument>``), so the process is spawned with
+    a writable stdin and the volume filter can be changed while it plays.
+    """
+
+    def __init__(self, source: str, volume: float, **kwargs: Any):
+        options = f"-af volume={volume:.2f} {kwargs.pop('options', None) or ''}"
+        self._control: IO[bytes] | None = None
+
+        # Keep command prompts off the bot's stderr
+        kwargs.setdefault("stderr", _FFmpegLog())
+
+        # No codec: discord.py stream-copies anything named Opus, "libopus"
+        # included, and ffmpeg cannot filter a copied stream
+        super().__init__(source, options=options.strip(), **kwargs)
+
+    @override
+    def _spawn_process(self, args: Any, **subprocess_kwargs: Any) -> subprocess.Popen[bytes]:
+        subprocess_kwargs["stdin"] = subprocess.PIPE
+        process = super()._spawn_process(args, **subprocess_kwargs)
+        self._control = process.stdin
+
+        return process
+
+    def set_volume(self, volume: float) -> bool:
+        """
+        Change the volume of the running ffmpeg process.
+
+        Args:
+            volume: New volume (0.0 to 1.0)
+
+        Returns:
+            True if the command was delivered
+        """
+
+        if self._control is None:
+            return False
+
+        try:
+            self._control.write(f"cvolume -1 volume {volume:.2f}\n".encode())
+            self._control.flush()
+        except (OSError, ValueError):
+            return False
+
+        return True
+
+    @override
+    def cleanup(self) -> None:
+        super().cleanup()
+
+        if self._control is not None:
+            try:
+                self._control.close()
+            except OSError:
+                pass
+            self._control = None
+
+
+class SeekableAudio(discord.AudioSource):
+    """
+    Wraps a source to count the frames it plays and to swap it mid-track.
+
+    Every frame holds 20 ms of audio, so the number of frames read gives the
+    playback position regardless of pauses or network stalls. Swapping the
+    wrapped source moves playback without stopping the voice client's player,
+    which would run its ``after`` callback.
+    """
+
+    FRAME_SECONDS: float = discord.opus.Encoder.FRAME_LENGTH / 1000
+
+    def __init__(self, original: discord.AudioSource, start: float = 0.0):
+        self.original: discord.AudioSource = original
+        self.start: float = start
+        self._frames: int = 0
+
+    @property
+    def position(self) -> float:
+        """Position of the last frame read, in seconds."""
+
+        return self.start + self._frames * self.FRAME_SECONDS
+
+    @property
+    def _current_error(self) -> Exception | None:
+        # Read by discord.py's player thread once the source runs dry
+        return getattr(self.original, "_current_error", None)
+
+    @override
+    def read(self) -> bytes:
+        while True:
+            original = self.original
+            data = original.read()
+
+            if original is self.original:
+                if data:
+                    self._frames += 1
+                return data
+
+            # Swapped while reading: drop the old source's frame
+
+    @override
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def swap(self, original: discord.AudioSource, start: float) -> discord.AudioSource:
+        """
+        Continue playback from another source.
+
+        Args:
+            original: Source to read from next, of the same kind (Opus or PCM)
+            start: Position the new source starts at, in seconds
+
+        Returns:
+            The previous source, which the caller must clean up
+
+        Raises:
+            AudioError: If the new source does not match the old one's kind
+        """
+
+        if original.is_opus() != self.original.is_opus():
+            raise AudioError("Cannot switch between Opus and PCM mid-track")
+
+        self.start = start
+        self._frames = 0
+        previous, self.original = self.original, original
+
+        return previous
+
+    @override
+    def cleanup(self) -> None:
+        self.original.cleanup()
+
+
 class YTDLSource:
     """Handles YouTube-DL operations for downloading and extracting audio info."""
 
     ytdl_options: dict[str, Any] = YTDL_FORMAT_OPTIONS.copy()
     ytdl_options["http_headers"] = YTDL_HEADERS
-    ytdl: yt_dlp.YoutubeDL = yt_dlp.YoutubeDL(cast(Any, ytdl_options))
+    # Lists playlist entries without resolving formats for each of them
+    flat_options: dict[str, Any] = {
+        **ytdl_options,
+        "extract_flat": "in_playlist",
+        "noplaylist": False,
+        "playlistend": MAX_PLAYLIST_SIZE,
+    }
+    extractor: ExtractionPool = ExtractionPool(
+        {"full": ytdl_options, "flat": flat_options},
+        workers=EXTRACTION_WORKERS,
+        max_in_flight=EXTRACTION_MAX_IN_FLIGHT,
+        max_pending_per_guild=MAX_PENDING_EXTRACTIONS,
+    )
+    cache: TrackCache = TrackCache(
+        max_size=TRACK_CACHE_SIZE, ttl=TRACK_CACHE_TTL, stream_ttl=STREAM_URL_TTL
+    )
+    # Persistent metadata behind the in-memory cache, set up by the music cog
+    store: MetadataStore | None = None
+    # Concurrent requests for the same media share one extraction
+    inflight: SingleFlight = SingleFlight()
+    search_cache: SearchCache = SearchCache(
+        max_size=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL
+    )
+
+    @staticmethod
+    def cache_key(query: str) -> str:
+        """
+        Normalize a URL or search query into a cache key.
+
+        Args:
+            query: The URL or search query
+
+        Returns:
+            ``youtube:<video id>`` for YouTube links, the casefolded query for
+            searches, and the URL itself otherwise
+        """
+
+        video_id = Validators.extract_youtube_id(query)
+        if video_id:
+            return f"youtube:{video_id}"
+
+        if Validators.is_url(query):
+            return query
+
+        return query.casefold()
 
     @classmethod
-    async def extract_info(cls, url: str, download: bool = False) -> dict[str, Any]:
+    async def extract_info(
+        cls, url: str, download: bool = False, guild_id: int | None = None
+    ) -> dict[str, Any]:
         """
         Extract information from a URL asynchronously.
 
         Args:
             url: The URL or search query
             download: Whether to download the audio
+            guild_id: Guild the extraction is queued under
 
         Returns:
             Dictionary containing track information
@@ -33,17 +273,18 @@ class YTDLSource:
         Raises:
             DownloadError: If extraction fails
         """
-        loop = asyncio.get_event_loop()
 
-        logger.info(
-            f"yt-dlp extractor_args: {cls.ytdl.params.get('extractor_args', {})}"
-        )
+        started = time.perf_counter()
 
         try:
-            # Run in executor to avoid blocking
-            data = await loop.run_in_executor(
-                None, lambda: cls.ytdl.extract_info(url, download=download)
+            # Run on the extraction pool to avoid blocking
+            data = await cls.inflight.run(
+                ("full", cls.cache_key(url), download),
+                lambda: cls.extractor.extract(
+                    url, download=download, guild_id=guild_id
+                ),
             )
+            EXTRACTION_SECONDS.observe(time.perf_counter() - started, kind="full")
 
             if not data:
                 raise DownloadError(f"Could not extract info from {url}")
@@ -56,7 +297,11 @@ class YTDLSource:
 
             return dict(data)
 
+        except DownloadError:
+            EXTRACTION_FAILURES.inc(kind="full")
+            raise
         except Exception as exception:
+            EXTRACTION_FAILURES.inc(kind="full")
             raise DownloadError(
                 f"Unexpected error during extraction: {str(exception)}"
             ) from exception
@@ -66,18 +311,241 @@ class YTDLSource:
         """
         Create a Track object from a URL or search query.
 
+        Only stable metadata is kept on the returned track; the stream URL is
+        resolved by ``resolve_stream`` right before playback.
+
         Args:
             url: YouTube URL or search query
             requester: Discord member who requested the track
 
         Returns:
-            Track object ready to play
+            Track object ready to be queued
 
         Raises:
             DownloadError: If track creation fails
         """
 
-        data = await cls.extract_info(url, download=False)
+        key = cls.cache_key(url)
+        entry = cls.cache.get(key)
+
+        if entry is None and cls.store:
+            stored = await cls.store.get(key)
+            if stored is not None:
+                entry = cls.cache.put(
+                    cls.cache_key(stored.webpage_url), stored, aliases=(key,)
+                )
+
+        if entry is None:
+            data = await cls.extract_info(
+                url, download=False, guild_id=requester.guild.id
+            )
+            entry = cls._cache_info(data, url)
+
+        return entry.track.requested_by(requester)
+
+    @classmethod
+    async def from_playlist(
+        cls, url: str, requester: discord.Member
+    ) -> tuple[str, list[Track], int]:
+        """
+        List the tracks of a playlist with a single flat extraction.
+
+        Entries only carry metadata; each stream URL is resolved when the
+        track is about to play. Private and deleted videos are left out.
+
+        Args:
+            url: Playlist URL
+            requester: Discord member who requested the playlist
+
+        Returns:
+            Tuple of (playlist title, tracks, number of entries listed), at
+            most MAX_PLAYLIST_SIZE entries
+
+        Raises:
+            DownloadError: If the playlist cannot be listed or is empty
+        """
+
+        data = await cls.extract_flat(url, guild_id=requester.guild.id)
+
+        if not data.get("entries"):
+            raise DownloadError("Playlist is empty")
+
+        entries = list(data["entries"])[:MAX_PLAYLIST_SIZE]
+        tracks = [
+            track.requested_by(requester)
+            for track in cls._tracks_from_entries(entries)
+        ]
+
+        if not tracks:
+            raise DownloadError("Playlist has no playable tracks")
+
+        return data.get("title", "Unknown Playlist"), tracks, len(entries)
+
+    @classmethod
+    async def search(
+        cls, query: str, limit: int, guild_id: int | None = None
+    ) -> list[Track]:
+        """
+        Search YouTube with a single flat extraction.
+
+        Results are cached, so repeating a search does not run yt-dlp again.
+
+        Args:
+            query: Sanitized search query
+            limit: Maximum number of results
+            guild_id: Guild the extraction is queued under
+
+        Returns:
+            Tracks without a requester or stream URL
+
+        Raises:
+            DownloadError: If the search fails or finds nothing
+        """
+
+        key = cls.cache_key(f"ytsearch{limit}:{query}")
+        tracks = cls.search_cache.get(key)
+
+        if tracks is None:
+            data = await cls.extract_flat(f"ytsearch{limit}:{query}", guild_id=guild_id)
+            tracks = cls._tracks_from_entries(data.get("entries") or [])
+            if not tracks:
+                raise DownloadError(f"No results found for {query}")
+
+            cls.search_cache.put(key, tracks)
+
+        return tracks
+
+    @classmethod
+    async def extract_flat(cls, url: str, guild_id: int | None = None) -> dict[str, Any]:
+        """
+        List a playlist or search without resolving each entry.
+
+        Args:
+            url: Playlist URL or search query
+            guild_id: Guild the extraction is queued under
+
+        Returns:
+            Info dict whose ``entries`` only carry basic metadata
+
+        Raises:
+            DownloadError: If extraction fails
+        """
+
+        started = time.perf_counter()
+
+        try:
+            data = await cls.inflight.run(
+                ("flat", cls.cache_key(url)),
+                lambda: cls.extractor.extract(url, guild_id=guild_id, profile="flat"),
+            )
+            EXTRACTION_SECONDS.observe(time.perf_counter() - started, kind="flat")
+        except DownloadError:
+            EXTRACTION_FAILURES.inc(kind="flat")
+            raise
+        except Exception as exception:
+            EXTRACTION_FAILURES.inc(kind="flat")
+            raise DownloadError(
+                f"Unexpected error during extraction: {str(exception)}"
+            ) from exception
+
+        if not data:
+            raise DownloadError(f"Could not extract info from {url}")
+
+        return dict(data)
+
+    @staticmethod
+    def _tracks_from_entries(entries: list[dict[str, Any]]) -> list[Track]:
+        """Build metadata-only tracks from flat playlist or search entries."""
+
+        tracks: list[Track] = []
+        for entry in entries:
+            # Private and deleted videos are listed without a duration
+            if not entry or not entry.get("url") or not entry.get("duration"):
+                continue
+
+            thumbnails = entry.get("thumbnails") or []
+            tracks.append(
+                Track(
+                    title=entry.get("title", "Unknown Title"),
+                    webpage_url=entry["url"],
+                    duration=int(entry["duration"]),
+                    thumbnail=thumbnails[-1].get("url") if thumbnails else None,
+                    uploader=entry.get("uploader") or entry.get("channel"),
+                )
+            )
+
+        return tracks
+
+    @classmethod
+    async def resolve_stream(
+        cls, track: Track, guild_id: int | None = None, force: bool = False
+    ) -> Track:
+        """
+        Make sure a track has a stream URL that outlives its playback.
+
+        The URL is reused when still valid, taken from the cache when another
+        lookup refreshed it recently, and re-extracted otherwise.
+
+        Args:
+            track: Track to resolve, updated in place
+            guild_id: Guild the extraction is queued under
+            force: Re-extract even if the URL looks valid, e.g. after the
+                CDN rejected it
+
+        Returns:
+            The same track, with a usable ``stream_url``
+
+        Raises:
+            DownloadError: If the stream URL cannot be resolved
+        """
+
+        if not force and not track.needs_stream(STREAM_EXPIRY_MARGIN):
+            return track
+
+        entry = None if force else cls.cache.get(cls.cache_key(track.webpage_url))
+        if (
+            entry is None
+            or not entry.has_fresh_stream
+            or entry.track.needs_stream(STREAM_EXPIRY_MARGIN)
+        ):
+            data = await cls.extract_info(
+                track.webpage_url, download=False, guild_id=guild_id
+            )
+            entry = cls._cache_info(data, track.webpage_url)
+
+        track.stream_url = entry.track.stream_url
+        track.codec = entry.track.codec
+
+        return track
+
+    @classmethod
+    async def probe_codec(cls, track: Track) -> str | None:
+        """
+        Probe the audio codec of a track's stream with ffprobe.
+
+        Only needed when the extractor did not report a codec.
+
+        Args:
+            track: Track with a resolved stream URL
+
+        Returns:
+            Codec name, or None if probing failed
+        """
+
+        if not track.stream_url:
+            return None
+
+        try:
+            codec, _ = await discord.FFmpegOpusAudio.probe(track.stream_url)
+        except Exception as exception:
+            logger.info(f"Could not probe codec for {track.title}: {exception}")
+            return None
+
+        return codec
+
+    @classmethod
+    def _cache_info(cls, data: dict[str, Any], url: str) -> CacheEntry:
+        """Normalize an extracted info dict into a Track and cache it."""
 
         # Extract the streaming URL
         if "url" not in data:
@@ -85,36 +553,102 @@ class YTDLSource:
 
         track = Track(
             title=data.get("title", "Unknown Title"),
-            url=data["url"],
             webpage_url=data.get("webpage_url", url),
-            duration=int(data.get("duration", 0)),
+            duration=int(data.get("duration") or 0),
             thumbnail=data.get("thumbnail"),
             uploader=data.get("uploader", "Unknown"),
-            requester=requester,
+            stream_url=data["url"],
+            codec=data.get("acodec") if data.get("acodec") != "none" else None,
         )
 
-        return track
+        canonical = (
+            f"{str(data['extractor_key']).lower()}:{data['id']}"
+            if data.get("extractor_key") and data.get("id")
+            else track.webpage_url
+        )
+
+        aliases = (cls.cache_key(url), cls.cache_key(track.webpage_url))
+        if cls.store:
+            cls.store.put(canonical, track, queries=aliases)
+
+        return cls.cache.put(canonical, track, aliases=aliases)
+
+    @classmethod
+    def can_passthrough(cls, track: Track, volume: float) -> bool:
+        """
+        Check if a track can be sent to Discord without re-encoding.
+
+        Args:
+            track: Track to play
+            volume: Playback volume (0.0 to 1.0)
+
+        Returns:
+            True if the stream is Opus and needs no volume scaling
+        """
+
+        return OPUS_PASSTHROUGH and volume == 1.0 and track.codec == "opus"
 
     @classmethod
     def get_audio_source(
-        cls, track: Track, volume: float = 0.5
-    ) -> discord.PCMVolumeTransformer[discord.FFmpegPCMAudio]:
+        cls,
+        track: Track,
+        volume: float = 0.5,
+        start: float = 0.0,
+        opus: bool | None = None,
+    ) -> discord.AudioSource:
         """
         Create an audio source from a Track object.
 
+        Opus streams played at full volume are remuxed by ffmpeg and sent as
+        is. Everything else is volume-scaled and encoded by ffmpeg, unless
+        FFMPEG_VOLUME is off, in which case it is decoded to PCM and scaled
+        in Python.
+
         Args:
             track: Track object to create source from
             volume: Initial volume (0.0 to 1.0)
+            start: Position to start from, in seconds
+            opus: Require an Opus (True) or PCM (False) source, e.g. to
+                replace a playing source of that kind
 
         Returns:
             Discord audio source ready to play
         """
 
-        source = discord.FFmpegPCMAudio(
-            track.url,
-            before_options=FFMPEG_OPTIONS.get("before_options"),
-            options=FFMPEG_OPTIONS.get("options"),
-        )
+        if not track.stream_url:
+            raise AudioError(f"No stream URL resolved for {track.title}")
+
+        before_options = FFMPEG_OPTIONS.get("before_options", "")
+        if start > 0:
+            # Input seeking, so ffmpeg skips ahead with a ranged request
+            before_options = f"{before_options} -ss {start:.2f}"
+
+        try:
+            if opus is not False and cls.can_passthrough(track, volume):
+                return discord.FFmpegOpusAudio(
+                    track.stream_url,
+                    codec="copy",
+                    before_options=before_options,
+                    options=FFMPEG_OPTIONS.get("options"),
+                )
+
+            if opus or (opus is None and FFMPEG_VOLUME):
+                return FFmpegVolumeAudio(
+                    track.stream_url,
+                    volume=volume,
+                    before_options=before_options,
+                    options=FFMPEG_OPTIONS.get("options"),
+                )
+
+            source = discord.FFmpegPCMAudio(
+                track.stream_url,
+                before_options=before_options,
+                options=FFMPEG_OPTIONS.get("options"),
+            )
+        except discord.ClientException:
+            # ffmpeg is missing or could not be started
+            FFMPEG_SPAWN_FAILURES.inc()
+            raise
 
         return discord.PCMVolumeTransformer(source, volume=volume)
 
@@ -127,6 +661,9 @@ class AudioPlayer:
         self._volume: float = 0.5
         self.current_track: Track | None = None
 
+        # Source of the current track, kept after it ends until the next play
+        self._source: SeekableAudio | None = None
+
     @property
     def volume(self) -> int:
         """Get current volume (0-100)."""
@@ -140,11 +677,27 @@ class AudioPlayer:
         self._volume = max(0, min(100, value)) / 100
 
         # Update current playing audio if exists
-        if self.voice_client.source and isinstance(
-            self.voice_client.source, discord.PCMVolumeTransformer
-        ):
-            source = cast(discord.PCMVolumeTransformer[Any], self.voice_client.source)
-            source.volume = self._volume
+        source = self._playing_source()
+        if isinstance(source, FFmpegVolumeAudio):
+            source.set_volume(self._volume)
+        elif isinstance(source, discord.PCMVolumeTransformer):
+            cast(discord.PCMVolumeTransformer[Any], source).volume = self._volume
+
+    @property
+    def is_passthrough(self) -> bool:
+        """Check if the current source is sent without re-encoding."""
+
+        source = self._playing_source()
+
+        return isinstance(source, discord.FFmpegOpusAudio) and not isinstance(
+            source, FFmpegVolumeAudio
+        )
+
+    @property
+    def position(self) -> float:
+        """Position in the current track, in seconds."""
+
+        return self._source.position if self._source else 0.0
 
     def is_playing(self) -> bool:
         """Check if audio is currently playing."""
@@ -157,7 +710,11 @@ class AudioPlayer:
         return self.voice_client.is_paused()
 
     async def play(
-        self, track: Track, after: Callable[[Exception | None], Any] | None = None
+        self,
+        track: Track,
+        after: Callable[[Exception | None], Any] | None = None,
+        start: float = 0.0,
+        refresh_stream: bool = False,
     ) -> None:
         """
         Play a track.
@@ -165,19 +722,104 @@ class AudioPlayer:
         Args:
             track: Track to play
             after: Callback function to call when track finishes
+            start: Position to start from, in seconds
+            refresh_stream: Re-resolve the stream URL even if it looks valid
+
+        Raises:
+            DownloadError: If the stream URL cannot be resolved
+            AudioError: If playback fails to start
         """
 
         if self.voice_client.is_playing():
+            self._source = None
             self.voice_client.stop()
 
+        # Resolve or refresh the stream URL just in time
+        with span("resolve_stream"):
+            await YTDLSource.resolve_stream(
+                track, guild_id=self.voice_client.guild.id, force=refresh_stream
+            )
+        if track.codec is None and OPUS_PASSTHROUGH and self._volume == 1.0:
+            with span("probe_codec"):
+                track.codec = await YTDLSource.probe_codec(track)
+
         self.current_track = track
 
         try:
-            source = YTDLSource.get_audio_source(track, volume=self._volume)
-            self.voice_client.play(source, after=after)
+            with span("ffmpeg.spawn"):
+                source = YTDLSource.get_audio_source(
+                    track, volume=self._volume, start=start
+                )
+                self._source = SeekableAudio(source, start=start)
+                self.voice_client.play(self._source, after=after)
         except Exception as exception:
             raise AudioError(f"Failed to play track: {str(exception)}") from exception
 
+    def ended_early(self, tolerance: float) -> float | None:
+        """
+        Check if the current track's stream ended before the track did.
+
+        Tracks stopped on purpose, and tracks of unknown length such as live
+        streams, never count as ended early.
+
+        Args:
+            tolerance: Seconds before the end that still count as finished
+
+        Returns:
+            Position where the stream ended, or None
+        """
+
+        track = self.current_track
+        if self._source is None or track is None or not track.duration:
+            return None
+
+        position = self._source.position
+
+        return position if position < track.duration - tolerance else None
+
+    async def seek(self, position: float) -> None:
+        """
+        Continue the current track from another position.
+
+        A new ffmpeg process is started at the position and swapped in for
+        the running one, so the track is not reported as finished.
+
+        Args:
+            position: Position to continue from, in seconds
+
+        Raises:
+            AudioError: If nothing is playing or the new source fails
+            DownloadError: If the stream URL cannot be refreshed
+        """
+
+        source = self._source
+        track = self.current_track
+        if track is None or source is None or self.voice_client.source is not source:
+            raise AudioError("Nothing is playing")
+
+        if track.duration:
+            position = min(position, track.duration)
+        position = max(0.0, position)
+
+        await YTDLSource.resolve_stream(track, guild_id=self.voice_client.guild.id)
+
+        try:
+            replacement = YTDLSource.get_audio_source(
+                track, volume=self._volume, start=position, opus=source.is_opus()
+            )
+        except Exception as exception:
+            raise AudioError(f"Failed to seek: {str(exception)}") from exception
+
+        if self.voice_client.source is not source or self.current_track is not track:
+            # Playback moved on while the stream was being resolved
+            replacement.cleanup()
+            return
+
+        previous = source.swap(replacement, start=position)
+
+        # Killing ffmpeg waits for the process to exit
+        await asyncio.to_thread(previous.cleanup)
+
     def pause(self) -> None:
         """Pause current playback."""
 
@@ -193,5 +835,13 @@ class AudioPlayer:
     def stop(self) -> None:
         """Stop current playback."""
 
+        self._source = None
         self.voice_client.stop()
         self.current_track = None
+
+    def _playing_source(self) -> discord.AudioSource | None:
+        """Return the source being played, without the position wrapper."""
+
+        source = self.voice_client.source
+
+        return source.original if isinstance(source, SeekableAudio) else source
@@ -0,0 +1,181 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+from data.track import Track
+
+
+@dataclass
+class CacheEntry:
+    """A cached track along with its expiry times."""
+
+    track: Track
+    expires_at: float
+    stream_expires_at: float
+
+    @property
+    def has_fresh_stream(self) -> bool:
+        """Check if the cached stream URL can still be used."""
+
+        return time.monotonic() < self.stream_expires_at
+
+
+class TrackCache:
+    """
+    In-process LRU cache of resolved track metadata.
+
+    Entries are stored under a canonical key (extractor and video ID) and can
+    be reached through any number of aliases, such as the search query or the
+    webpage URL that produced them. Metadata and stream URLs expire separately,
+    since stream URLs are only valid for a few hours.
+    """
+
+    def __init__(self, max_size: int, ttl: float, stream_ttl: float):
+        self._max_size: int = max(1, max_size)
+        self._ttl: float = ttl
+        self._stream_ttl: float = stream_ttl
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._aliases: OrderedDict[str, str] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached tracks."""
+
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Look up a track by canonical key or alias.
+
+        Args:
+            key: Canonical key or alias
+
+        Returns:
+            Cache entry, or None if missing or expired
+        """
+
+        canonical = self._aliases.get(key, key)
+        entry = self._entries.get(canonical)
+
+        if entry is None or time.monotonic() >= entry.expires_at:
+            if entry is not None:
+                del self._entries[canonical]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(canonical)
+        if key in self._aliases:
+            self._aliases.move_to_end(key)
+
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, track: Track, aliases: Iterable[str] = ()) -> CacheEntry:
+        """
+        Store a track under a canonical key.
+
+        Args:
+            key: Canonical key (e.g. ``youtube:<video id>``)
+            track: Track metadata to store, without a requester
+            aliases: Other keys that should resolve to this entry
+
+        Returns:
+            The stored cache entry
+        """
+
+        now = time.monotonic()
+        entry = CacheEntry(
+            track=track,
+            expires_at=now + self._ttl,
+            stream_expires_at=now + self._stream_ttl,
+        )
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        for alias in aliases:
+            if alias and alias != key:
+                self._aliases[alias] = key
+                self._aliases.move_to_end(alias)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+        # Aliases of evicted entries are dropped lazily by get(); this only
+        # keeps the alias table itself bounded.
+        while len(self._aliases) > self._max_size * 4:
+            self._aliases.popitem(last=False)
+
+        return entry
+
+    def clear(self) -> None:
+        """Remove all cached tracks."""
+
+        self._entries.clear()
+        self._aliases.clear()
+
+
+class SearchCache:
+    """LRU cache of search result lists with a single TTL."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size: int = max(1, max_size)
+        self._ttl: float = ttl
+        self._entries: OrderedDict[str, tuple[float, list[Track]]] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached searches."""
+
+        return len(self._entries)
+
+    def get(self, key: str) -> list[Track] | None:
+        """
+        Look up the results of a search.
+
+        Args:
+            key: Normalized search query
+
+        Returns:
+            Cached results, or None if missing or expired
+        """
+
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        expires_at, tracks = cached
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+
+        self.hits += 1
+        return tracks
+
+    def put(self, key: str, tracks: list[Track]) -> None:
+        """
+        Store the results of a search.
+
+        Args:
+            key: Normalized search query
+            tracks: Results, without a requester
+        """
+
+        self._entries[key] = (time.monotonic() + self._ttl, tracks)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached searches."""
+
+        self._entries.clear()
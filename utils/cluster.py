@@ -0,0 +1,270 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+import aiohttp
+from data.constants import (
+    CLUSTER_REPORT_INTERVAL,
+    CLUSTER_RESTART_BACKOFF_MAX,
+    CLUSTER_SHUTDOWN_TIMEOUT,
+    CLUSTER_STABLE_UPTIME,
+)
+
+
+logger = logging.getLogger(__name__)
+
+Stats = dict[str, Any]
+
+
+def split_shards(shard_count: int, workers: int) -> list[list[int]]:
+    """
+    Split shards into contiguous, evenly sized ranges.
+
+    Args:
+        shard_count: Total number of shards
+        workers: Number of worker processes
+
+    Returns:
+        Shard IDs per worker, without empty ranges
+    """
+
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+
+    ranges: list[list[int]] = []
+    start = 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+async def recommended_shard_count(token: str) -> int:
+    """
+    Ask Discord how many shards the bot should run.
+
+    Args:
+        token: Bot token
+
+    Returns:
+        Recommended shard count
+    """
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"},
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+
+    return int(data["shards"])
+
+
+class Supervisor:
+    """
+    Runs the bot as several worker processes, each owning a range of shards.
+
+    Crashed workers are restarted with exponential backoff, while a worker
+    that shuts down cleanly stays down. Workers share the metadata store
+    (SQLite in WAL mode) and the snapshot directory, which holds one file
+    per guild, so moving shards between workers keeps both. Workers report
+    their stats over a Unix socket, and any worker can query the stats of
+    the whole cluster through the same socket.
+    """
+
+    def __init__(self, workers: int, shard_count: int, socket_path: str):
+        self.shard_ranges: list[list[int]] = split_shards(shard_count, workers)
+        self.shard_count: int = shard_count
+        self.socket_path: str = socket_path
+
+        self._stats: dict[int, Stats] = {}
+        self._stopping: asyncio.Event = asyncio.Event()
+
+    async def run(self) -> None:
+        """Start the workers and supervise them until ``stop`` is called."""
+
+        Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(self.socket_path).unlink(missing_ok=True)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+
+        print(
+            f"✓ Starting {len(self.shard_ranges)} worker(s) "
+            f"for {self.shard_count} shard(s)"
+        )
+
+        try:
+            await asyncio.gather(
+                *(
+                    self._supervise(cluster_id, shard_ids)
+                    for cluster_id, shard_ids in enumerate(self.shard_ranges)
+                )
+            )
+        finally:
+            server.close()
+            await server.wait_closed()
+            Path(self.socket_path).unlink(missing_ok=True)
+
+    def stop(self) -> None:
+        """Ask every worker to shut down gracefully."""
+
+        self._stopping.set()
+
+    async def _supervise(self, cluster_id: int, shard_ids: list[int]) -> None:
+        """Run one worker, restarting it whenever it exits with an error."""
+
+        backoff = 1.0
+
+        while not self._stopping.is_set():
+            env = {
+                **os.environ,
+                "CLUSTER_ID": str(cluster_id),
+                "CLUSTER_SOCKET": self.socket_path,
+                "SHARD_COUNT": str(self.shard_count),
+                "SHARD_IDS": f"{shard_ids[0]}-{shard_ids[-1]}",
+            }
+
+            started_at = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, sys.argv[0], env=env
+            )
+            print(
+                f"✓ Worker {cluster_id} (PID {process.pid}) "
+                f"runs shards {shard_ids[0]}-{shard_ids[-1]}"
+            )
+
+            exited = asyncio.ensure_future(process.wait())
+            stopping = asyncio.ensure_future(self._stopping.wait())
+            await asyncio.wait({exited, stopping}, return_when=asyncio.FIRST_COMPLETED)
+            stopping.cancel()
+            self._stats.pop(cluster_id, None)
+
+            if self._stopping.is_set():
+                await self._terminate(process)
+                return
+
+            returncode = exited.result()
+            if returncode == 0:
+                print(f"✓ Worker {cluster_id} shut down cleanly")
+                return
+
+            if time.monotonic() - started_at >= CLUSTER_STABLE_UPTIME:
+                backoff = 1.0
+
+            print(
+                f"✗ Worker {cluster_id} exited with code {returncode}, "
+                f"restarting in {backoff:.0f}s"
+            )
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+
+            backoff = min(backoff * 2, CLUSTER_RESTART_BACKOFF_MAX)
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> int:
+        """Shut a worker down gracefully, killing it if it hangs."""
+
+        if process.returncode is None:
+            process.send_signal(signal.SIGTERM)
+
+        try:
+            return await asyncio.wait_for(
+                process.wait(), timeout=CLUSTER_SHUTDOWN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            return await process.wait()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one request from a worker."""
+
+        try:
+            message = json.loads(await reader.readline())
+
+            if message["op"] == "report":
+                self._stats[int(message["cluster_id"])] = message["stats"]
+            elif message["op"] == "query":
+                reply = {str(key): value for key, value in self._stats.items()}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning(f"Bad cluster request: {error}")
+        finally:
+            writer.close()
+
+
+class ClusterClient:
+    """Reports a worker's stats to the supervisor and reads the cluster's."""
+
+    def __init__(self, cluster_id: int, socket_path: str):
+        self.cluster_id: int = cluster_id
+        self.socket_path: str = socket_path
+        self._report_task: asyncio.Task[None] | None = None
+
+    def start(self, collect: Callable[[], Stats]) -> None:
+        """
+        Report stats to the supervisor in the background.
+
+        Args:
+            collect: Returns the worker's current stats (JSON-serializable)
+        """
+
+        self._report_task = asyncio.create_task(self._report_loop(collect))
+
+    def stop(self) -> None:
+        """Stop reporting."""
+
+        if self._report_task:
+            self._report_task.cancel()
+            self._report_task = None
+
+    async def fetch(self) -> dict[int, Stats] | None:
+        """
+        Get the latest stats of every worker.
+
+        Returns:
+            Stats per cluster ID, or None if the supervisor is unreachable
+        """
+
+        try:
+            reply = await self._request({"op": "query"}, expect_reply=True)
+        except (OSError, ValueError) as error:
+            logger.warning(f"Failed to query cluster stats: {error}")
+            return None
+
+        return {int(key): value for key, value in reply.items()}
+
+    async def _report_loop(self, collect: Callable[[], Stats]) -> None:
+        while True:
+            try:
+                await self._request(
+                    {"op": "report", "cluster_id": self.cluster_id, "stats": collect()}
+                )
+            except (OSError, ValueError) as error:
+                logger.warning(f"Failed to report cluster stats: {error}")
+
+            await asyncio.sleep(CLUSTER_REPORT_INTERVAL)
+
+    async def _request(self, message: Stats, expect_reply: bool = False) -> Any:
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+
+        try:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+
+            if expect_reply:
+                return json.loads(await reader.readline())
+        finally:
+            writer.close()
+            await writer.wait_closed()
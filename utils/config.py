@@ -22,6 +22,42 @@ if test_guild_id:
     except ValueError:
         test_guild_id = None
 
+# Sharding: leave SHARD_COUNT unset to use the count Discord recommends.
+# SHARD_IDS limits this process to some shards, e.g. "0-3" or "0,2,4".
+shard_count = os.getenv("SHARD_COUNT")
+SHARD_COUNT = int(shard_count) if shard_count else None
+
+SHARD_IDS: list[int] | None = None
+shard_ids = os.getenv("SHARD_IDS")
+if shard_ids:
+    SHARD_IDS = []
+    for part in shard_ids.split(","):
+        first, _, last = part.strip().partition("-")
+        SHARD_IDS.extend(range(int(first), int(last or first) + 1))
+
+# Cluster mode: CLUSTER_WORKERS > 0 turns this process into a supervisor that
+# runs the shards across that many worker processes. The supervisor sets
+# CLUSTER_ID for each worker.
+CLUSTER_WORKERS = int(os.getenv("CLUSTER_WORKERS", "0"))
+cluster_id = os.getenv("CLUSTER_ID")
+CLUSTER_ID = int(cluster_id) if cluster_id else None
+CLUSTER_SOCKET = os.getenv("CLUSTER_SOCKET", "./cache/cluster.sock")
+
+# Prometheus metrics endpoint at http://METRICS_HOST:METRICS_PORT/metrics
+# (0 to disable); cluster workers listen on METRICS_PORT + CLUSTER_ID
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Event loop stalls longer than this many seconds are reported with a stack
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.1"))
+# Also run asyncio in debug mode to report each slow callback (slower)
+LOOP_DEBUG = os.getenv("LOOP_DEBUG", "false").lower() == "true"
+
+# Export /play traces as OpenTelemetry JSON (empty to disable): a collector's
+# OTLP/HTTP endpoint, e.g. "http://localhost:4318/v1/traces", or a file path
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "pyrrhos")
+
 POT_PROVIDER_URL = os.getenv("POT_PROVIDER_URL", "http://pot-provider:4416")
 COOKIES_PATH = os.getenv("COOKIES_PATH", "./cookies.txt")
 
@@ -63,6 +99,19 @@ if Path(COOKIES_PATH).exists():
 else:
     print(f"Cookies file not found at: {COOKIES_PATH}")
 
+# Extraction Configuration
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+EXTRACTION_MAX_IN_FLIGHT = int(os.getenv("EXTRACTION_MAX_IN_FLIGHT", "4"))
+
+# Guild states kept in memory before idle ones are evicted early (0 for no cap)
+MAX_GUILD_STATES = int(os.getenv("MAX_GUILD_STATES", "5000"))
+
+# Persistent metadata store (empty to disable)
+METADATA_DB_PATH = os.getenv("METADATA_DB_PATH", "./cache/metadata.db")
+
+# Queue snapshots used to resume playback after a restart (empty to disable)
+QUEUE_SNAPSHOT_DIR = os.getenv("QUEUE_SNAPSHOT_DIR", "./cache/queues")
+
 # Additional headers to avoid blocks
 YTDL_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -72,6 +121,15 @@ YTDL_HEADERS = {
 }
 
 # Audio Configuration
+# Experimental: hand playback to an audio node process, e.g.
+# "unix:./cache/audio-node.sock" or "tcp://127.0.0.1:2333" (empty plays audio
+# in this process). audio_node.py runs one. Nodes that do not announce voice
+# support in their handshake are refused.
+AUDIO_NODE_URL = os.getenv("AUDIO_NODE_URL", "")
 MAX_VOLUME = 100
 DEFAULT_VOLUME = 50
+# Stream Opus sources straight through ffmpeg instead of decoding to PCM
+OPUS_PASSTHROUGH = os.getenv("OPUS_PASSTHROUGH", "true").lower() == "true"
+# Apply volume in ffmpeg's filter graph instead of scaling PCM in Python
+FFMPEG_VOLUME = os.getenv("FFMPEG_VOLUME", "true").lower() == "true"
 AUDIO_TIMEOUT = 300
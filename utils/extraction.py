@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, TypeVar, cast
+import yt_dlp
+from data.exceptions import DownloadError
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Job:
+    """A pending extraction request."""
+
+    query: str
+    download: bool
+    profile: str
+    future: asyncio.Future[Any]
+
+
+class ExtractionPool:
+    """
+    Runs yt-dlp extractions on a dedicated, bounded thread pool.
+
+    Each worker thread owns one YoutubeDL instance per option profile (e.g.
+    full or flat extraction). Pending requests are queued per guild and
+    dispatched round-robin, so one busy guild cannot starve the others, and at
+    most ``max_in_flight`` extractions run at once.
+    """
+
+    def __init__(
+        self,
+        profiles: dict[str, dict[str, Any]],
+        workers: int,
+        max_in_flight: int,
+        max_pending_per_guild: int,
+    ):
+        self._profiles: dict[str, dict[str, Any]] = profiles
+        self._workers: int = max(1, workers)
+        self._max_in_flight: int = max(1, min(max_in_flight, self._workers))
+        self._max_pending_per_guild: int = max(1, max_pending_per_guild)
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._local: threading.local = threading.local()
+        self._pending: OrderedDict[int | None, deque[_Job]] = OrderedDict()
+        self._in_flight: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of extractions currently running."""
+
+        return self._in_flight
+
+    @property
+    def pending(self) -> int:
+        """Number of extractions waiting for a free worker."""
+
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    async def extract(
+        self,
+        query: str,
+        download: bool = False,
+        guild_id: int | None = None,
+        profile: str = "full",
+    ) -> Any:
+        """
+        Queue an extraction and wait for its result.
+
+        Args:
+            query: URL or search query passed to yt-dlp
+            download: Whether to download the media
+            guild_id: Guild the request is accounted to for fair queuing
+            profile: Name of the yt-dlp option profile to use
+
+        Returns:
+            The raw info dict returned by yt-dlp
+
+        Raises:
+            DownloadError: If the guild already has too many pending requests
+        """
+
+        jobs = self._pending.get(guild_id)
+        if jobs is not None and len(jobs) >= self._max_pending_per_guild:
+            raise DownloadError(
+                "Too many songs are being looked up for this server, try again shortly"
+            )
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(guild_id, deque()).append(
+            _Job(query=query, download=download, profile=profile, future=future)
+        )
+        self._dispatch()
+
+        return await future
+
+    def shutdown(self) -> None:
+        """Stop the worker threads and drop pending requests."""
+
+        for jobs in self._pending.values():
+            for job in jobs:
+                job.future.cancel()
+        self._pending.clear()
+
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="ytdl-worker"
+            )
+
+        return self._executor
+
+    def _dispatch(self) -> None:
+        """Start pending jobs, one guild at a time, until the pool is full."""
+
+        loop = asyncio.get_running_loop()
+
+        while self._in_flight < self._max_in_flight and self._pending:
+            guild_id, jobs = self._pending.popitem(last=False)
+            job = jobs.popleft()
+            if jobs:
+                # Re-append so the guild goes to the back of the rotation
+                self._pending[guild_id] = jobs
+
+            if job.future.done():
+                # Caller gave up before a worker picked the job up
+                continue
+
+            self._in_flight += 1
+            work = loop.run_in_executor(
+                self._get_executor(), self._run, job.query, job.download, job.profile
+            )
+            work.add_done_callback(partial(self._on_done, job))
+
+    def _on_done(self, job: _Job, work: asyncio.Future[Any]) -> None:
+        self._in_flight -= 1
+
+        if not job.future.done():
+            if work.cancelled():
+                job.future.cancel()
+            elif (exception := work.exception()) is not None:
+                job.future.set_exception(exception)
+            else:
+                job.future.set_result(work.result())
+
+        self._dispatch()
+
+    def _run(self, query: str, download: bool, profile: str) -> Any:
+        """Run a single extraction on the current worker thread."""
+
+        instances: dict[str, yt_dlp.YoutubeDL] | None = getattr(
+            self._local, "instances", None
+        )
+        if instances is None:
+            instances = self._local.instances = {}
+
+        ytdl = instances.get(profile)
+        if ytdl is None:
+            ytdl = yt_dlp.YoutubeDL(cast(Any, self._profiles[profile]))
+            instances[profile] = ytdl
+            logger.info(
+                f"{threading.current_thread().name} yt-dlp ({profile}) extractor_args: "
+                f"{ytdl.params.get('extractor_args', {})}"
+            )
+
+        return ytdl.extract_info(query, download=download)
+
+
+@dataclass
+class _Call:
+    """An in-flight call shared by one or more waiters."""
+
+    task: asyncio.Future[Any]
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    Waiters are shielded from each other: one of them being cancelled does
+    not cancel the call for the rest. The call is only cancelled once every
+    waiter has given up.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self.coalesced: int = 0
+
+    def __len__(self) -> int:
+        """Return the number of calls in flight."""
+
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``factory()``, or join the in-flight call with the same key.
+
+        Args:
+            key: Identifies equivalent calls
+            factory: Creates the awaitable when no call is in flight
+
+        Returns:
+            The result of the shared call
+        """
+
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(partial(self._forget, key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call, task: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+        # Mark the exception as retrieved when every waiter already left
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from data.constants import LOOP_HEARTBEAT_INTERVAL, LOOP_LAG_HISTORY, LOOP_STALLS_KEPT
+from utils.metrics import LOOP_LAG, LOOP_STALLS, SLOW_CALLBACKS
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Stall:
+    """A stretch of time during which the event loop did not run."""
+
+    started_at: float  # Unix time
+    duration: float  # seconds, updated until the loop recovers
+    source: str  # "watchdog" or "asyncio"
+    stack: list[str] = field(default_factory=list)  # where the loop was stuck
+
+
+class LoopMonitor:
+    """
+    Watches the health of the event loop.
+
+    A heartbeat task wakes up every LOOP_HEARTBEAT_INTERVAL seconds and
+    records how late it was. A watchdog thread notices when the heartbeat
+    stops for longer than ``threshold`` and captures the stack of the loop
+    thread while it is still blocked, so the offending code shows up even
+    when it never yields. Optionally, asyncio's debug mode also reports every
+    callback that runs longer than ``threshold``; it costs some throughput,
+    so it is off unless asked for.
+    """
+
+    def __init__(self, threshold: float, debug: bool = False):
+        self.threshold: float = threshold
+        self.debug: bool = debug
+        self.lags: deque[float] = deque(maxlen=LOOP_LAG_HISTORY)
+        self.stalls: deque[Stall] = deque(maxlen=LOOP_STALLS_KEPT)
+        self.stall_count: int = 0
+        self.stalls_lock: threading.Lock = threading.Lock()  # watchdog appends too
+        self.slow_callback_count: int = 0
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._last_beat: float = time.monotonic()
+        self._open_stall: Stall | None = None  # reported but not yet over
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped: threading.Event = threading.Event()
+        self._handler: _SlowCallbackHandler | None = None
+
+    @property
+    def last_lag(self) -> float:
+        """Lag of the latest heartbeat, in seconds."""
+
+        return self.lags[-1] if self.lags else 0.0
+
+    def recent_stalls(self) -> list[Stall]:
+        """Copy of the stalls kept, oldest first; safe against the watchdog."""
+
+        with self.stalls_lock:
+            return list(self.stalls)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+
+        self._heartbeat = self._loop.create_task(self._beat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+        if self.debug:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+            self._handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._handler)
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+
+        self._stopped.set()
+
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+        if self._handler:
+            logging.getLogger("asyncio").removeHandler(self._handler)
+            self._handler = None
+
+            if self._loop:
+                self._loop.set_debug(False)
+
+    async def _beat(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            expected = loop.time() + LOOP_HEARTBEAT_INTERVAL
+            await asyncio.sleep(LOOP_HEARTBEAT_INTERVAL)
+            lag = max(0.0, loop.time() - expected)
+
+            self._last_beat = time.monotonic()
+            self.lags.append(lag)
+            LOOP_LAG.observe(lag)
+
+            # The watchdog saw this stall start; now its length is known
+            stall, self._open_stall = self._open_stall, None
+            if stall:
+                stall.duration = lag
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack when heartbeats stop; runs in a thread."""
+
+        while not self._stopped.wait(self.threshold / 2):
+            late = time.monotonic() - self._last_beat - LOOP_HEARTBEAT_INTERVAL
+            if late < self.threshold or self._open_stall is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread or 0)
+            stall = Stall(
+                started_at=time.time() - late,
+                duration=late,
+                source="watchdog",
+                stack=traceback.format_stack(frame) if frame else [],
+            )
+            self._open_stall = stall
+            with self.stalls_lock:
+                self.stalls.append(stall)
+                self.stall_count += 1
+            LOOP_STALLS.inc()
+
+            logger.warning(
+                f"Event loop blocked for over {late * 1000:.0f}ms at:\n"
+                + "".join(stall.stack)
+            )
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Turns asyncio's debug-mode slow callback warnings into stalls."""
+
+    def __init__(self, monitor: LoopMonitor):
+        super().__init__(logging.WARNING)
+        self.monitor: LoopMonitor = monitor
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # asyncio logs "Executing <handle> took 0.123 seconds"
+        args = record.args
+        if not isinstance(args, tuple) or len(args) != 2:
+            return
+        if not isinstance(record.msg, str) or not record.msg.startswith("Executing"):
+            return
+
+        handle, duration = args
+        if not isinstance(duration, (int, float)):
+            return
+
+        stall = Stall(
+            started_at=record.created - duration,
+            duration=duration,
+            source="asyncio",
+            stack=[f"{handle}\n"],
+        )
+        with self.monitor.stalls_lock:
+            self.monitor.stalls.append(stall)
+        self.monitor.slow_callback_count += 1
+        SLOW_CALLBACKS.inc()
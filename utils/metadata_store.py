@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+from data.track import Track
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    video_id TEXT PRIMARY KEY,  -- canonical key, e.g. youtube:<id>
+    title TEXT NOT NULL,
+    webpage_url TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    thumbnail TEXT,
+    uploader TEXT,
+    resolved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_resolved_at ON tracks (resolved_at);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    resolved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queries_resolved_at ON queries (resolved_at);
+"""
+
+_TrackRow = tuple[str, str, str, int, str | None, str | None, float]
+_QueryRow = tuple[str, str, float]
+
+
+class MetadataStore:
+    """
+    SQLite-backed store of resolved track metadata that survives restarts.
+
+    All database work runs on a single dedicated thread. Writes are buffered
+    and flushed in batches; reads see buffered writes immediately. Stream
+    URLs are never stored since they expire within hours.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        max_age: float,
+        flush_interval: float,
+        evict_interval: float = 3600,
+    ):
+        self.path: str = path
+        self.max_entries: int = max_entries
+        self.max_age: float = max_age
+        self.flush_interval: float = flush_interval
+        self.evict_interval: float = evict_interval
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="metadata-store"
+        )
+        self._connection: sqlite3.Connection | None = None
+        self._pending_tracks: dict[str, _TrackRow] = {}
+        self._pending_queries: dict[str, _QueryRow] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        self._last_evicted: float = 0.0
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    async def open(self) -> None:
+        """
+        Open the database and start the background flusher.
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+
+        await self._run(self._open)
+        await self._run(self._evict)
+        self._last_evicted = time.monotonic()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Flush buffered writes and close the database."""
+
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        if self._connection is not None:
+            await self.flush()
+            await self._run(self._connection.close)
+            self._connection = None
+
+        self._executor.shutdown(wait=False)
+
+    async def get(self, key: str) -> Track | None:
+        """
+        Look up a track by canonical key or query.
+
+        Args:
+            key: Canonical key (e.g. ``youtube:<id>``) or cache key of a query
+
+        Returns:
+            Track metadata without a requester or stream URL, or None
+        """
+
+        query = self._pending_queries.get(key)
+        video_id = query[1] if query else key
+
+        row = self._pending_tracks.get(video_id)
+        if row is None and self._connection is not None:
+            row = await self._run(self._select, video_id)
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return Track(
+            title=row[1],
+            webpage_url=row[2],
+            duration=row[3],
+            thumbnail=row[4],
+            uploader=row[5],
+        )
+
+    def put(self, key: str, track: Track, queries: tuple[str, ...] = ()) -> None:
+        """
+        Buffer a track and the queries that resolved to it.
+
+        Args:
+            key: Canonical key
+            track: Track metadata
+            queries: Cache keys of queries that resolved to this track
+        """
+
+        now = time.time()
+        self._pending_tracks[key] = (
+            key,
+            track.title,
+            track.webpage_url,
+            track.duration,
+            track.thumbnail,
+            track.uploader,
+            now,
+        )
+
+        for query in queries:
+            if query and query != key:
+                self._pending_queries[query] = (query, key, now)
+
+    async def flush(self) -> None:
+        """Write buffered entries to the database."""
+
+        if self._connection is None or not (
+            self._pending_tracks or self._pending_queries
+        ):
+            return
+
+        tracks = list(self._pending_tracks.values())
+        queries = list(self._pending_queries.values())
+        self._pending_tracks.clear()
+        self._pending_queries.clear()
+
+        try:
+            await self._run(self._write, tracks, queries)
+        except sqlite3.Error as error:
+            logger.warning(f"Failed to write {len(tracks)} track(s): {error}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+            if time.monotonic() - self._last_evicted >= self.evict_interval:
+                self._last_evicted = time.monotonic()
+                try:
+                    await self._run(self._evict)
+                except sqlite3.Error as error:
+                    logger.warning(f"Failed to evict old entries: {error}")
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # The methods below run on the store's thread
+
+    def _open(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        connection.commit()
+
+        self._connection = connection
+
+    def _select(self, key: str) -> _TrackRow | None:
+        assert self._connection is not None
+
+        mapped = self._connection.execute(
+            "SELECT video_id FROM queries WHERE query = ?", (key,)
+        ).fetchone()
+        video_id = mapped[0] if mapped else key
+
+        return self._connection.execute(
+            "SELECT * FROM tracks WHERE video_id = ?", (video_id,)
+        ).fetchone()
+
+    def _write(self, tracks: list[_TrackRow], queries: list[_QueryRow]) -> None:
+        assert self._connection is not None
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)", tracks
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?)", queries
+            )
+
+    def _evict(self) -> None:
+        assert self._connection is not None
+
+        cutoff = time.time() - self.max_age
+
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM tracks WHERE resolved_at < ?", (cutoff,)
+            )
+            self._connection.execute(
+                """
+                DELETE FROM tracks WHERE video_id NOT IN (
+                    SELECT video_id FROM tracks ORDER BY resolved_at DESC LIMIT ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._connection.execute(
+                """
+                DELETE FROM queries WHERE resolved_at < ?
+                    OR video_id NOT IN (SELECT video_id FROM tracks)
+                """,
+                (cutoff,),
+            )
@@ -0,0 +1,351 @@
+import bisect
+import logging
+import math
+from typing import Callable, Iterable, Iterator
+from aiohttp import web
+
+
+logger = logging.getLogger(__name__)
+
+Labels = tuple[str, ...]
+# Values of a callback-backed metric: a single value, or one per label set
+Reading = float | dict[Labels, float]
+
+
+class Metric:
+    """
+    Base class of metrics exposed in the Prometheus text format.
+
+    Values are kept per combination of label values. Metrics whose values
+    already live elsewhere (cache counters, queue lengths) can instead be
+    given a function that is read on every scrape.
+    """
+
+    kind: str = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        registry: "Registry | None" = None,
+    ):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labels: Labels = labels
+        self._values: dict[Labels, float] = {}
+        self._function: Callable[[], Reading] | None = None
+
+        (registry or REGISTRY).register(self)
+
+    def set_function(self, function: Callable[[], Reading]) -> None:
+        """
+        Read the metric's values from a function at scrape time.
+
+        Args:
+            function: Returns the value, or values keyed by label values
+        """
+
+        self._function = function
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        """Yield ``(suffix, label values, value)`` for every series."""
+
+        if self._function is not None:
+            reading = self._function()
+            if isinstance(reading, dict):
+                for values, value in reading.items():
+                    yield "", values, value
+            else:
+                yield "", (), reading
+
+        for values, value in self._values.items():
+            yield "", values, value
+
+    def render(self) -> Iterator[str]:
+        """Yield the metric's lines in the Prometheus text format."""
+
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+        for suffix, values, value in self.samples():
+            names = (*self.labels, "le") if suffix == "_bucket" else self.labels
+            labels = _format_labels(names, values)
+            yield f"{self.name}{suffix}{labels} {_format_value(value)}"
+
+    def _key(self, labels: dict[str, str]) -> Labels:
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}")
+
+        return tuple(str(labels[name]) for name in self.labels)
+
+
+class Counter(Metric):
+    """Value that only goes up, e.g. a number of failures."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative amount to add
+            **labels: Label values
+        """
+
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down, e.g. a number of connections."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """
+        Set the gauge.
+
+        Args:
+            value: New value
+            **labels: Label values
+        """
+
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets, e.g. latencies."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Iterable[float],
+        labels: Labels = (),
+        registry: "Registry | None" = None,
+    ):
+        super().__init__(name, documentation, labels, registry)
+        self.buckets: list[float] = sorted(buckets)
+        # Per label set: count per bucket (last one is +Inf) and the sum
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value: Observed value, e.g. seconds
+            **labels: Label values
+        """
+
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        for values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip([*self.buckets, math.inf], counts):
+                cumulative += count
+                yield "_bucket", (*values, _format_value(bound)), cumulative
+
+            yield "_sum", values, total[0]
+            yield "_count", values, cumulative
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        """
+        Add a metric.
+
+        Raises:
+            ValueError: If a metric with the same name exists
+        """
+
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                # A failing callback must not break the whole scrape
+                logger.exception(f"Failed to collect {metric.name}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves a registry over HTTP at ``/metrics`` for Prometheus to scrape."""
+
+    def __init__(self, host: str, port: int, registry: Registry | None = None):
+        self.host: str = host
+        self.port: int = port
+        self.registry: Registry = registry or REGISTRY
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        """
+        Start listening.
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError:
+            await self.stop()
+            raise
+
+    async def stop(self) -> None:
+        """Stop listening."""
+
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+
+def _format_labels(names: Labels, values: Labels) -> str:
+    if not names:
+        return ""
+
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+# Extraction
+EXTRACTION_SECONDS = Histogram(
+    "pyrrhos_extraction_seconds",
+    "Time to extract media info with yt-dlp, including queueing.",
+    labels=("kind",),
+    buckets=(0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30),
+)
+EXTRACTION_FAILURES = Counter(
+    "pyrrhos_extraction_failures_total",
+    "Extractions that raised an error.",
+    labels=("kind",),
+)
+CACHE_HITS = Counter(
+    "pyrrhos_cache_hits_total",
+    "Lookups answered by a cache.",
+    labels=("cache",),
+)
+CACHE_MISSES = Counter(
+    "pyrrhos_cache_misses_total",
+    "Lookups a cache could not answer.",
+    labels=("cache",),
+)
+
+# Playback
+TIME_TO_FIRST_AUDIO = Histogram(
+    "pyrrhos_time_to_first_audio_seconds",
+    "Time from /play to the track starting, when nothing else was playing.",
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30),
+)
+TRACK_GAP = Histogram(
+    "pyrrhos_track_gap_seconds",
+    "Silence between one track ending and the next one starting.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+FFMPEG_SPAWN_FAILURES = Counter(
+    "pyrrhos_ffmpeg_spawn_failures_total",
+    "ffmpeg processes that could not be started.",
+)
+QUEUED_TRACKS = Gauge(
+    "pyrrhos_queued_tracks",
+    "Tracks waiting in all queues.",
+)
+LONGEST_QUEUE = Gauge(
+    "pyrrhos_longest_queue_tracks",
+    "Tracks waiting in the longest queue.",
+)
+GUILD_STATES = Gauge(
+    "pyrrhos_guild_states",
+    "Guild states held in memory.",
+)
+VOICE_CLIENTS = Gauge(
+    "pyrrhos_voice_clients",
+    "Active voice connections.",
+)
+
+# Process
+LOOP_LAG = Histogram(
+    "pyrrhos_event_loop_lag_seconds",
+    "How late the loop monitor's heartbeat woke up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+LOOP_STALLS = Counter(
+    "pyrrhos_event_loop_stalls_total",
+    "Times the event loop was blocked for longer than the stall threshold.",
+)
+SLOW_CALLBACKS = Counter(
+    "pyrrhos_slow_callbacks_total",
+    "Callbacks asyncio's debug mode reported as slow.",
+)
+PROCESS_CPU = Gauge(
+    "pyrrhos_process_cpu_percent",
+    "CPU used by the bot process over the last sample interval.",
+)
+PROCESS_MEMORY = Gauge(
+    "pyrrhos_process_resident_memory_bytes",
+    "Resident memory of the bot process.",
+)
+FFMPEG_PROCESSES = Gauge(
+    "pyrrhos_ffmpeg_processes",
+    "Running ffmpeg child processes.",
+)
+FFMPEG_CPU = Gauge(
+    "pyrrhos_ffmpeg_cpu_percent",
+    "CPU used by all ffmpeg child processes over the last sample interval.",
+)
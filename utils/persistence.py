@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Snapshot = dict[str, Any]
+
+
+class SnapshotStore:
+    """
+    Crash-safe store of per-guild playback snapshots.
+
+    Each guild's snapshot is a small JSON file that is written to disk and
+    then replaced atomically, so a crash in the middle of a write leaves the
+    previous snapshot intact. Snapshots identical to the last one written are
+    skipped. Every save also touches an ``alive`` file, so snapshots that have
+    not changed in a while still count as recent as long as the bot was
+    running. All file work runs on a single dedicated thread.
+    """
+
+    def __init__(self, directory: str, max_age: float):
+        self.directory: Path = Path(directory)
+        self.max_age: float = max_age
+        self.alive_path: Path = self.directory / "alive"
+        self._alive_at: float | None = None  # as left by the previous run
+
+        # Serialized payload last written per guild, without its timestamp
+        self._written: dict[int, str] = {}
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="snapshot-store"
+        )
+
+    async def load(self) -> list[Snapshot]:
+        """
+        Read every snapshot that is recent enough to resume.
+
+        A snapshot is recent if it was saved, or the store was last alive,
+        within ``max_age``. Stale and unreadable snapshots are deleted.
+
+        Returns:
+            Snapshots, in no particular order
+        """
+
+        return await self._run(self._load)
+
+    async def save(self, snapshots: dict[int, Snapshot | None]) -> None:
+        """
+        Write or delete the snapshots of several guilds.
+
+        Called periodically even when nothing changed, to mark the store as
+        alive.
+
+        Args:
+            snapshots: Snapshot per guild ID, or None to delete it
+        """
+
+        try:
+            await self._run(self._save, snapshots)
+        except OSError as error:
+            logger.warning(f"Failed to save {len(snapshots)} snapshot(s): {error}")
+
+    def close(self) -> None:
+        """Stop the store's thread once pending writes are done."""
+
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # The methods below run on the store's thread
+
+    def _load(self) -> list[Snapshot]:
+        if not self.directory.is_dir():
+            return []
+
+        alive_at = self._previous_alive_at()
+        cutoff = time.time() - self.max_age
+        snapshots: list[Snapshot] = []
+
+        for path in self.directory.glob("*.json"):
+            try:
+                with path.open(encoding="utf-8") as file:
+                    snapshot = json.load(file)
+                if max(snapshot.get("saved_at", 0), alive_at) >= cutoff:
+                    snapshots.append(snapshot)
+                    continue
+            except (OSError, ValueError) as error:
+                logger.warning(f"Dropping unreadable snapshot {path.name}: {error}")
+
+            path.unlink(missing_ok=True)
+
+        return snapshots
+
+    def _previous_alive_at(self) -> float:
+        """When the previous run was last alive, read before this one touches it."""
+
+        if self._alive_at is None:
+            try:
+                self._alive_at = self.alive_path.stat().st_mtime
+            except OSError:
+                self._alive_at = 0.0
+
+        return self._alive_at
+
+    def _save(self, snapshots: dict[int, Snapshot | None]) -> None:
+        self._previous_alive_at()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        changed = False
+
+        for guild_id, snapshot in snapshots.items():
+            path = self.directory / f"{guild_id}.json"
+
+            if snapshot is None:
+                self._written.pop(guild_id, None)
+                path.unlink(missing_ok=True)
+                changed = True
+                continue
+
+            payload = json.dumps(snapshot, separators=(",", ":"))
+            if self._written.get(guild_id) == payload:
+                continue
+
+            temporary = path.with_suffix(".tmp")
+            with temporary.open("w", encoding="utf-8") as file:
+                json.dump({**snapshot, "saved_at": now}, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+
+            # Atomic on POSIX: readers see either the old or the new snapshot
+            os.replace(temporary, path)
+            self._written[guild_id] = payload
+            changed = True
+
+        # Liveness only needs the modification time, so no fsync
+        self.alive_path.touch()
+
+        if changed:
+            # Make the renames and deletions themselves durable
+            directory = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
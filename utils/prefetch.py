@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from data.constants import PREFETCH_DEPTH, STREAM_EXPIRY_MARGIN
+from data.exceptions import DownloadError
+from data.queue import MusicQueue
+from data.track import Track
+from utils.audio import YTDLSource
+
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Resolves stream URLs for the next few queued tracks in the background."""
+
+    def __init__(self, queue: MusicQueue, guild_id: int, depth: int = PREFETCH_DEPTH):
+        self.queue: MusicQueue = queue
+        self.guild_id: int = guild_id
+        self.depth: int = depth
+
+        # Keyed by id(track); the track is kept alongside so the id stays valid
+        self._tasks: dict[int, tuple[Track, asyncio.Task[None]]] = {}
+
+    def refresh(self) -> None:
+        """Start prefetching upcoming tracks and cancel work for the rest."""
+
+        upcoming = {id(track): track for track in self.queue.peek_many(self.depth)}
+
+        for key, (_, task) in list(self._tasks.items()):
+            if key not in upcoming:
+                task.cancel()
+                del self._tasks[key]
+
+        for key, track in upcoming.items():
+            if key in self._tasks or not track.needs_stream(STREAM_EXPIRY_MARGIN):
+                continue
+
+            task = asyncio.create_task(self._resolve(track))
+            self._tasks[key] = (track, task)
+
+    async def wait(self, track: Track) -> None:
+        """
+        Wait for an in-progress prefetch of a track to finish.
+
+        Args:
+            track: Track about to be played
+        """
+
+        pending = self._tasks.get(id(track))
+        if pending:
+            await asyncio.wait({pending[1]})
+
+    def cancel(self) -> None:
+        """Cancel all in-progress prefetches."""
+
+        for _, task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    async def _resolve(self, track: Track) -> None:
+        try:
+            await YTDLSource.resolve_stream(track, guild_id=self.guild_id)
+        except DownloadError as error:
+            # Playback resolves it again and reports the failure
+            logger.info(f"Prefetch failed for {track.title}: {error}")
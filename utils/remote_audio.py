@@ -0,0 +1,522 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, cast, override
+from urllib.parse import urlparse
+import discord
+from discord.types.voice import (
+    GuildVoiceState as GuildVoiceStatePayload,
+    VoiceServerUpdate as VoiceServerUpdatePayload,
+)
+from data.constants import AUDIO_NODE_HANDSHAKE_TIMEOUT, AUDIO_NODE_RECONNECT_MAX
+from data.exceptions import AudioError, AudioNodeError
+from data.track import Track
+from utils.audio import YTDLSource
+from utils.config import FFMPEG_OPTIONS
+from utils.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, Any]
+
+
+async def open_node_connection(
+    url: str,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Connect to an audio node.
+
+    Args:
+        url: ``unix:<path>`` or ``tcp://<host>:<port>``
+
+    Returns:
+        Stream reader and writer of the connection
+    """
+
+    parsed = urlparse(url)
+    if parsed.scheme == "unix":
+        return await asyncio.open_unix_connection(parsed.path)
+    if parsed.scheme == "tcp" and parsed.hostname and parsed.port:
+        return await asyncio.open_connection(parsed.hostname, parsed.port)
+
+    raise ValueError(f"Unsupported audio node URL: {url}")
+
+
+class AudioNode:
+    """
+    Connection to an out-of-process audio node (experimental).
+
+    Commands and events are JSON objects, one per line, each carrying the
+    guild they concern. A connection starts with a ``hello``/``ready``
+    handshake in which the node must announce that it sends voice; nodes
+    that would play silently are refused. The bot resolves tracks and
+    relays voice credentials; the node (see audio_node.py) joins voice,
+    encodes and sends audio, and reports back ``state`` (position) and
+    ``end`` events. The connection is re-established in the
+    background if it drops, and the last voice credentials of every guild
+    are sent again so the node can rejoin.
+    """
+
+    def __init__(self, url: str):
+        self.url: str = url
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._players: dict[int, "RemoteAudioPlayer"] = {}
+        self._voice: dict[int, Message] = {}
+        self._closed: bool = False
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the node connection is open."""
+
+        return self._writer is not None
+
+    async def connect(self) -> None:
+        """
+        Open the connection to the node.
+
+        Raises:
+            OSError: If the node cannot be reached
+            AudioNodeError: If the handshake fails or the node cannot send voice
+        """
+
+        reader, writer = await open_node_connection(self.url)
+
+        try:
+            writer.write(json.dumps({"op": "hello", "guild_id": 0}).encode() + b"\n")
+            line = await asyncio.wait_for(
+                reader.readline(), timeout=AUDIO_NODE_HANDSHAKE_TIMEOUT
+            )
+            ready = json.loads(line)
+        except (asyncio.TimeoutError, ValueError) as error:
+            writer.close()
+            raise AudioNodeError(f"Audio node handshake failed: {error!r}") from error
+
+        if ready.get("op") != "ready" or not ready.get("voice"):
+            writer.close()
+            raise AudioNodeError("Audio node cannot send voice, nothing would be heard")
+
+        self._writer = writer
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+
+        for message in self._voice.values():
+            self.send(message)
+
+    async def close(self) -> None:
+        """Close the connection and stop reconnecting."""
+
+        self._closed = True
+
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    def send(self, message: Message) -> None:
+        """
+        Queue a command for the node.
+
+        Args:
+            message: JSON-serializable command
+
+        Raises:
+            AudioNodeError: If the node is not connected
+        """
+
+        if self._writer is None or self._writer.is_closing():
+            raise AudioNodeError("The audio node is not available right now")
+
+        self._writer.write(json.dumps(message).encode() + b"\n")
+
+        if message["op"] == "voice":
+            self._voice[message["guild_id"]] = message
+        elif message["op"] == "destroy":
+            self._voice.pop(message["guild_id"], None)
+
+    def register(self, guild_id: int, player: "RemoteAudioPlayer") -> None:
+        """Route a guild's events to a player."""
+
+        self._players[guild_id] = player
+
+    def unregister(self, guild_id: int) -> None:
+        """Stop routing a guild's events."""
+
+        self._players.pop(guild_id, None)
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    player = self._players.get(int(message["guild_id"]))
+                except (ValueError, KeyError) as error:
+                    logger.warning(f"Bad message from audio node: {error}")
+                    continue
+
+                if player:
+                    player.handle_event(message)
+        except OSError as error:
+            logger.warning(f"Audio node connection failed: {error}")
+
+        self._writer = None
+
+        # Whatever was playing is gone along with the node's state
+        for guild_id, player in list(self._players.items()):
+            player.handle_event(
+                {
+                    "op": "end",
+                    "guild_id": guild_id,
+                    "reason": "failed",
+                    "position": player.position,
+                    "error": "Audio node disconnected",
+                }
+            )
+
+        if not self._closed:
+            asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+
+        while not self._closed:
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+                logger.info(f"Reconnected to audio node at {self.url}")
+                return
+            except (OSError, ValueError, AudioNodeError) as error:
+                logger.warning(f"Audio node still unreachable: {error}")
+                delay = min(delay * 2, AUDIO_NODE_RECONNECT_MAX)
+
+
+class NodeVoiceProtocol(discord.VoiceProtocol):
+    """
+    Voice connection whose audio is handled by an audio node.
+
+    The bot only joins the channel through the gateway and forwards the voice
+    session and server credentials to the node, which connects to the voice
+    server itself.
+    """
+
+    # Set when an audio node is configured and reachable
+    node: AudioNode | None = None
+
+    def __init__(self, client: discord.Client, channel: discord.abc.Connectable):
+        super().__init__(client, channel)
+
+        if NodeVoiceProtocol.node is None:
+            raise AudioNodeError("No audio node is configured")
+
+        self.audio_node: AudioNode = NodeVoiceProtocol.node
+        self.guild: discord.Guild = getattr(channel, "guild")
+        self.loop: asyncio.AbstractEventLoop = client.loop
+
+        self._session_id: str | None = None
+        self._server: VoiceServerUpdatePayload | None = None
+        self._connected: asyncio.Event = asyncio.Event()
+
+    @override
+    async def on_voice_state_update(self, data: GuildVoiceStatePayload, /) -> None:
+        channel_id = data.get("channel_id")
+        if channel_id is None:
+            self._connected.clear()
+            return
+
+        channel = self.guild.get_channel(int(channel_id))
+        if isinstance(channel, discord.VoiceChannel):
+            self.channel = channel
+
+        self._session_id = data["session_id"]
+        self._forward()
+
+    @override
+    async def on_voice_server_update(self, data: VoiceServerUpdatePayload, /) -> None:
+        self._server = data
+        self._forward()
+
+    @override
+    async def connect(
+        self,
+        *,
+        timeout: float,
+        reconnect: bool,
+        self_deaf: bool = False,
+        self_mute: bool = False,
+    ) -> None:
+        await self.guild.change_voice_state(
+            channel=cast(discord.abc.Snowflake, self.channel),
+            self_deaf=self_deaf,
+            self_mute=self_mute,
+        )
+        await asyncio.wait_for(self._connected.wait(), timeout=timeout)
+
+    async def move_to(self, channel: discord.abc.Snowflake) -> None:
+        """Move to another voice channel."""
+
+        await self.guild.change_voice_state(channel=channel)
+
+    @override
+    async def disconnect(self, *, force: bool = False) -> None:
+        try:
+            self.audio_node.send({"op": "destroy", "guild_id": self.guild.id})
+        except AudioError:
+            pass
+
+        await self.guild.change_voice_state(channel=None)
+        self.cleanup()
+
+    @override
+    def cleanup(self) -> None:
+        self._connected.clear()
+        self.audio_node.unregister(self.guild.id)
+        super().cleanup()
+
+    def is_connected(self) -> bool:
+        """Check if the voice session has been handed to the node."""
+
+        return self._connected.is_set()
+
+    def _forward(self) -> None:
+        """Send the voice credentials to the node once both halves arrived."""
+
+        server = self._server
+        if self._session_id is None or server is None or not server["endpoint"]:
+            return
+
+        try:
+            self.audio_node.send(
+                {
+                    "op": "voice",
+                    "guild_id": self.guild.id,
+                    "user_id": self.client.user.id if self.client.user else None,
+                    "channel_id": getattr(self.channel, "id", None),
+                    "session_id": self._session_id,
+                    "token": server["token"],
+                    "endpoint": server["endpoint"],
+                }
+            )
+        except AudioError as error:
+            logger.warning(f"Could not hand voice session to node: {error}")
+            return
+
+        self._connected.set()
+
+
+class RemoteAudioPlayer:
+    """
+    Plays audio through an audio node.
+
+    Mirrors the interface of AudioPlayer, so guild state and commands do not
+    need to know where audio is produced. Positions come from the node's
+    ``state`` events and are interpolated between them.
+    """
+
+    def __init__(self, voice_client: NodeVoiceProtocol):
+        self.voice_client: NodeVoiceProtocol = voice_client
+        self.node: AudioNode = voice_client.audio_node
+        self._volume: float = 0.5
+        self.current_track: Track | None = None
+
+        self._after: Callable[[Exception | None], Any] | None = None
+        self._playing: bool = False
+        self._paused: bool = False
+        self._stopped: bool = False  # stopped on purpose rather than ended
+        self._position: float = 0.0
+        self._position_at: float = time.monotonic()
+
+        # Events about earlier plays (e.g. a track ending just as the next
+        # one was requested) carry an older ID and are ignored
+        self._play_id: int = 0
+
+        self.node.register(voice_client.guild.id, self)
+
+    @property
+    def volume(self) -> int:
+        """Get current volume (0-100)."""
+
+        return int(self._volume * 100)
+
+    @volume.setter
+    def volume(self, value: int) -> None:
+        """Set volume (0-100)."""
+
+        self._volume = max(0, min(100, value)) / 100
+
+        if self._playing:
+            try:
+                self._send("volume", volume=self._volume)
+            except AudioError:
+                pass
+
+    @property
+    def is_passthrough(self) -> bool:
+        """Volume is always applied by the node."""
+
+        return False
+
+    @property
+    def position(self) -> float:
+        """Position in the current track, in seconds."""
+
+        if self._playing and not self._paused:
+            return self._position + time.monotonic() - self._position_at
+
+        return self._position
+
+    def is_playing(self) -> bool:
+        """Check if audio is currently playing."""
+
+        return self._playing and not self._paused
+
+    def is_paused(self) -> bool:
+        """Check if audio is paused."""
+
+        return self._playing and self._paused
+
+    async def play(
+        self,
+        track: Track,
+        after: Callable[[Exception | None], Any] | None = None,
+        start: float = 0.0,
+        refresh_stream: bool = False,
+    ) -> None:
+        """
+        Play a track on the node.
+
+        Args:
+            track: Track to play
+            after: Callback function to call when track finishes
+            start: Position to start from, in seconds
+            refresh_stream: Re-resolve the stream URL even if it looks valid
+
+        Raises:
+            DownloadError: If the stream URL cannot be resolved
+            AudioNodeError: If the node is unavailable
+        """
+
+        with span("resolve_stream"):
+            await YTDLSource.resolve_stream(
+                track, guild_id=self.voice_client.guild.id, force=refresh_stream
+            )
+
+        self._play_id += 1
+        self._send(
+            "play",
+            play_id=self._play_id,
+            url=track.stream_url,
+            start=start,
+            volume=self._volume,
+            before_options=FFMPEG_OPTIONS.get("before_options", ""),
+        )
+
+        self.current_track = track
+        self._after = after
+        self._playing = True
+        self._paused = False
+        self._stopped = False
+        self._set_position(start)
+
+    async def seek(self, position: float) -> None:
+        """
+        Continue the current track from another position.
+
+        Args:
+            position: Position to continue from, in seconds
+
+        Raises:
+            AudioError: If nothing is playing or the node is unavailable
+            DownloadError: If the stream URL cannot be refreshed
+        """
+
+        track = self.current_track
+        if track is None or not self._playing:
+            raise AudioError("Nothing is playing")
+
+        if track.duration:
+            position = min(position, track.duration)
+        position = max(0.0, position)
+
+        await YTDLSource.resolve_stream(track, guild_id=self.voice_client.guild.id)
+        self._send("seek", url=track.stream_url, position=position)
+        self._set_position(position)
+
+    def ended_early(self, tolerance: float) -> float | None:
+        """
+        Check if the current track's stream ended before the track did.
+
+        Args:
+            tolerance: Seconds before the end that still count as finished
+
+        Returns:
+            Position where the stream ended, or None
+        """
+
+        track = self.current_track
+        if self._stopped or track is None or not track.duration:
+            return None
+
+        return self._position if self._position < track.duration - tolerance else None
+
+    def pause(self) -> None:
+        """Pause current playback."""
+
+        if self.is_playing():
+            self._send("pause")
+            self._set_position(self.position)
+            self._paused = True
+
+    def resume(self) -> None:
+        """Resume paused playback."""
+
+        if self.is_paused():
+            self._send("resume")
+            self._paused = False
+            self._set_position(self._position)
+
+    def stop(self) -> None:
+        """Stop current playback."""
+
+        self._stopped = True
+        self.current_track = None
+
+        if self._playing:
+            try:
+                self._send("stop")
+            except AudioError:
+                pass
+
+    def handle_event(self, message: Message) -> None:
+        """
+        Apply an event sent by the node.
+
+        Args:
+            message: ``state`` or ``end`` event for this guild
+        """
+
+        if message.get("play_id", self._play_id) != self._play_id:
+            return
+
+        if message["op"] == "state":
+            self._paused = bool(message.get("paused", False))
+            self._set_position(float(message["position"]))
+        elif message["op"] == "end" and self._playing:
+            self._playing = False
+            self._paused = False
+            self._set_position(float(message.get("position", self._position)))
+
+            after, self._after = self._after, None
+            error = message.get("error")
+            if after:
+                after(AudioError(error) if error else None)
+
+    def _send(self, op: str, **fields: Any) -> None:
+        self.node.send({"op": op, "guild_id": self.voice_client.guild.id, **fields})
+
+    def _set_position(self, position: float) -> None:
+        self._position = position
+        self._position_at = time.monotonic()
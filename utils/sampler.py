@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+import discord
+import psutil
+from utils.metrics import FFMPEG_CPU, FFMPEG_PROCESSES, PROCESS_CPU, PROCESS_MEMORY
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Sample:
+    """Resource usage and load of the bot at one point in time."""
+
+    timestamp: float  # Unix time
+    cpu_percent: float
+    memory: int  # RSS in bytes
+    threads: int
+    ffmpeg_processes: int
+    ffmpeg_cpu_percent: float
+    ffmpeg_memory: int  # RSS in bytes, summed over ffmpeg processes
+    loop_lag: float  # seconds the sampler woke up late
+    guilds: int
+    members: int
+    voice_clients: int
+
+
+class MetricsSampler:
+    """
+    Samples process and bot metrics in the background into a ring buffer.
+
+    psutil calls run in a worker thread, so the event loop is never blocked
+    on /proc reads. CPU percentages are measured over the interval between
+    samples. Readers get the latest sample or a short history without doing
+    any work themselves.
+    """
+
+    def __init__(self, client: discord.Client, interval: float, history: int):
+        self.client: discord.Client = client
+        self.interval: float = interval
+        self.samples: deque[Sample] = deque(maxlen=history)
+
+        self._process: psutil.Process = psutil.Process(os.getpid())
+        # Kept between samples, since psutil measures CPU since the last call
+        self._children: dict[int, psutil.Process] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def latest(self) -> Sample | None:
+        """Most recent sample, if any was taken yet."""
+
+        return self.samples[-1] if self.samples else None
+
+    def history(self, count: int) -> list[Sample]:
+        """
+        Get the most recent samples.
+
+        Args:
+            count: Maximum number of samples
+
+        Returns:
+            Samples, oldest first
+        """
+
+        count = min(count, len(self.samples))
+        return [self.samples[index] for index in range(-count, 0)]
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+
+        # Prime CPU measurement so the first sample covers one interval
+        self._process.cpu_percent(None)
+        self._task = asyncio.create_task(self._sample_loop())
+
+    def stop(self) -> None:
+        """Stop sampling."""
+
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+
+            try:
+                await self._take_sample(lag)
+            except Exception:
+                logger.exception("Failed to sample metrics")
+
+    async def _take_sample(self, lag: float) -> None:
+        (
+            cpu_percent,
+            memory,
+            threads,
+            ffmpeg_processes,
+            ffmpeg_cpu_percent,
+            ffmpeg_memory,
+        ) = await asyncio.to_thread(self._sample_process)
+
+        guilds = self.client.guilds
+        sample = Sample(
+            timestamp=time.time(),
+            cpu_percent=cpu_percent,
+            memory=memory,
+            threads=threads,
+            ffmpeg_processes=ffmpeg_processes,
+            ffmpeg_cpu_percent=ffmpeg_cpu_percent,
+            ffmpeg_memory=ffmpeg_memory,
+            loop_lag=lag,
+            guilds=len(guilds),
+            members=sum(guild.member_count or 0 for guild in guilds),
+            voice_clients=len(self.client.voice_clients),
+        )
+        self.samples.append(sample)
+
+        PROCESS_CPU.set(cpu_percent)
+        PROCESS_MEMORY.set(memory)
+        FFMPEG_PROCESSES.set(ffmpeg_processes)
+        FFMPEG_CPU.set(ffmpeg_cpu_percent)
+
+    def _sample_process(self) -> tuple[float, int, int, int, float, int]:
+        """Read process and ffmpeg child stats; runs in a worker thread."""
+
+        with self._process.oneshot():
+            cpu_percent = self._process.cpu_percent(None)
+            memory = self._process.memory_info().rss
+            threads = self._process.num_threads()
+
+        children: dict[int, psutil.Process] = {}
+        ffmpeg_cpu_percent = 0.0
+        ffmpeg_memory = 0
+
+        for child in self._process.children(recursive=True):
+            try:
+                if "ffmpeg" not in child.name():
+                    continue
+
+                # Reuse the known process so its CPU time delta is kept
+                # (equality also compares creation time, in case of PID reuse)
+                known = self._children.get(child.pid)
+                if known is not None and known == child:
+                    child = known
+                ffmpeg_cpu_percent += child.cpu_percent(None)
+                ffmpeg_memory += child.memory_info().rss
+                children[child.pid] = child
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        self._children = children
+
+        return (
+            cpu_percent,
+            memory,
+            threads,
+            len(children),
+            ffmpeg_cpu_percent,
+            ffmpeg_memory,
+        )
@@ -1,37 +1,75 @@
 import asyncio
+import time
+from itertools import chain
+from typing import Any, Iterator
 import discord
-from data.constants import VOICE_TIMEOUT
+from discord.channel import VocalGuildChannel
+from data.constants import (
+    RESTORE_CONCURRENCY,
+    SKIP_VOTE_TIMEOUT,
+    STREAM_END_TOLERANCE,
+    STREAM_RECOVERY_ATTEMPTS,
+    VOICE_TIMEOUT,
+)
 from data.track import Track
 from data.queue import MusicQueue
-from data.exceptions import VoiceError
+from data.exceptions import AudioNodeError, VoiceError
 from utils.audio import AudioPlayer
+from utils.persistence import Snapshot, SnapshotStore
+from utils.metrics import TRACK_GAP
+from utils.prefetch import Prefetcher
+from utils.remote_audio import NodeVoiceProtocol, RemoteAudioPlayer
+from utils.timers import Timer, TimerWheel
+from utils.tracing import span
 
 
 class GuildState:
     """Manages music playback state for a single guild."""
 
-    def __init__(self, guild: discord.Guild):
+    def __init__(self, guild: discord.Guild, timers: TimerWheel):
         self.guild: discord.Guild = guild
+        self.timers: TimerWheel = timers
         self.queue: MusicQueue = MusicQueue()
-        self.voice_client: discord.VoiceClient | None = None
-        self.player: AudioPlayer | None = None
+        self.voice_client: discord.VoiceClient | NodeVoiceProtocol | None = None
+        self.player: AudioPlayer | RemoteAudioPlayer | None = None
         self.current_track: Track | None = None
         self.text_channel: discord.TextChannel | None = None
 
+        # Resolve upcoming tracks while the current one plays
+        self.prefetcher: Prefetcher = Prefetcher(self.queue, guild.id)
+        self.queue.on_change = self.prefetcher.refresh
+
         # Playback control
         self._is_playing: bool = False
-        self._skip_votes: set[int] = set()
+        self._skip_votes: dict[int, Timer] = {}  # user ID -> vote expiry
+        self._recoveries: int = 0  # stream restarts for the current track
+        self._track_ended_at: float | None = None  # for measuring gaps
 
         # Auto-disconnect timer
-        self._disconnect_timer: asyncio.Task[None] | None = None
+        self._disconnect_timer: Timer | None = None
         self._timeout: int = VOICE_TIMEOUT
 
+        # Serialized queue, reused by snapshots until the queue changes
+        self._queue_snapshot: tuple[int, list[tuple[Any, ...]]] | None = None
+
+        # Last time a command asked for this state, used to evict idle ones
+        self.last_active: float = time.monotonic()
+
     @property
     def is_connected(self) -> bool:
         """Check if bot is connected to voice."""
 
         return self.voice_client is not None and self.voice_client.is_connected()
 
+    @property
+    def voice_channel(self) -> VocalGuildChannel | None:
+        """Get the voice channel of the voice client, local or audio node."""
+
+        # NodeVoiceProtocol only knows its channel as a Connectable
+        channel = self.voice_client.channel if self.voice_client else None
+
+        return channel if isinstance(channel, VocalGuildChannel) else None
+
     @property
     def is_playing(self) -> bool:
         """Check if audio is currently playing."""
@@ -44,7 +82,15 @@ class GuildState:
 
         return self.player is not None and self.player.is_paused()
 
-    async def connect(self, channel: discord.VoiceChannel) -> discord.VoiceClient:
+    @property
+    def is_idle(self) -> bool:
+        """Check if the state holds nothing worth keeping."""
+
+        return not self.is_connected and not self.queue and self.current_track is None
+
+    async def connect(
+        self, channel: discord.VoiceChannel
+    ) -> discord.VoiceClient | NodeVoiceProtocol:
         """
         Connect to a voice channel.
 
@@ -59,29 +105,34 @@ class GuildState:
         """
 
         if self.is_connected and self.voice_client:
-            if self.voice_client.channel.id == channel.id:
+            if self.voice_channel and self.voice_channel.id == channel.id:
                 return self.voice_client
             await self.voice_client.move_to(channel)
         else:
             try:
-                self.voice_client = await channel.connect()
-                self.player = AudioPlayer(self.voice_client)
+                if NodeVoiceProtocol.node:
+                    # Audio is produced by the node, not in this process
+                    voice_client = await channel.connect(cls=NodeVoiceProtocol)
+                    self.voice_client = voice_client
+                    self.player = RemoteAudioPlayer(voice_client)
+                else:
+                    self.voice_client = await channel.connect()
+                    self.player = AudioPlayer(self.voice_client)
             except asyncio.TimeoutError as exc:
                 raise VoiceError(f"Could not connect to {channel.name}") from exc
             except discord.ClientException as exception:
                 raise VoiceError(f"Failed to connect: {str(exception)}") from exception
 
         # Cancel disconnect timer if exists
-        if self._disconnect_timer and not self._disconnect_timer.done():
-            self._disconnect_timer.cancel()
+        self._cancel_disconnect_timer()
 
         return self.voice_client
 
     async def disconnect(self) -> None:
         """Disconnect from voice channel and cleanup."""
 
-        if self._disconnect_timer and not self._disconnect_timer.done():
-            self._disconnect_timer.cancel()
+        self._cancel_disconnect_timer()
+        self.prefetcher.cancel()
 
         if self.voice_client:
             await self.voice_client.disconnect()
@@ -90,42 +141,165 @@ class GuildState:
 
         self.current_track = None
         self._is_playing = False
-        self._skip_votes.clear()
+        self.clear_skip_votes()
 
     async def play_next(self) -> None:
-        """Play the next track in queue."""
+        """Play the next track in queue, skipping tracks that fail to play."""
 
-        if self.queue.loop and self.current_track:
-            next_track = self.current_track
-        else:
-            next_track = self.queue.get_next()
+        failures = 0
 
-        if next_track is None:
-            self._is_playing = False
-            await self._start_disconnect_timer()
-            return
+        while True:
+            if self.queue.loop and self.current_track:
+                next_track = self.current_track
+            else:
+                next_track = self.queue.get_next()
 
-        self.current_track = next_track
-        self._skip_votes.clear()
+            # In queue loop mode failed tracks come around again, so stop
+            # once every track has failed in a row
+            if next_track is None or (
+                self.queue.loop_queue and failures >= len(self.queue)
+            ):
+                self._is_playing = False
+                self._track_ended_at = None
+                self._start_disconnect_timer()
+                return
+
+            if await self._play(next_track):
+                return
+
+            failures += 1
+
+    async def _play(self, track: Track, start: float = 0.0) -> bool:
+        """
+        Make a track current and start playing it.
+
+        Args:
+            track: Track to play
+            start: Position to start from, in seconds
+
+        Returns:
+            False if the track failed and the next one should be tried
+        """
+
+        self.current_track = track
+        self.clear_skip_votes()
+        self._recoveries = 0
 
         try:
             # Play track with callback to play next when done
             if self.player:
+                with span("prefetch.wait"):
+                    await self.prefetcher.wait(track)
                 await self.player.play(
-                    next_track, after=lambda error: self._after_track(error)
+                    track, after=lambda error: self._after_track(error), start=start
                 )
                 self._is_playing = True
 
+                if self._track_ended_at is not None:
+                    TRACK_GAP.observe(time.monotonic() - self._track_ended_at)
+                    self._track_ended_at = None
+
+            self.prefetcher.refresh()
+
             if self.text_channel:
-                await self._send_now_playing()
+                with span("now_playing"):
+                    await self._send_now_playing()
 
+        except AudioNodeError as exception:
+            # Every other track would fail the same way
+            await self._stop_without_node(track, exception)
         except Exception as exception:
-            # If playback fails, try next track
+            # Not current anymore, so loop mode does not retry it forever
+            self.current_track = None
+            self._is_playing = False
+
             if self.text_channel:
                 await self.text_channel.send(
-                    f"❌ Error playing `{next_track.title}`: {str(exception)}"
+                    f"❌ Error playing `{track.title}`: {str(exception)}"
                 )
+            return False
+
+        return True
+
+    def snapshot(self) -> Snapshot | None:
+        """
+        Capture what is needed to resume playback after a restart.
+
+        Returns:
+            JSON-serializable snapshot, or None if there is nothing to resume
+        """
+
+        if not self.is_connected and not self.queue and not self.current_track:
+            return None
+
+        revision = self.queue.revision
+        if self._queue_snapshot is None or self._queue_snapshot[0] != revision:
+            self._queue_snapshot = (
+                revision,
+                [track.to_tuple() for track in self.queue],
+            )
+
+        # A guild that is mid-disconnect may have lost its voice client
+        voice_channel = self.voice_channel if self.is_connected else None
+        current = self.current_track if self._is_playing else None
+
+        return {
+            "guild_id": self.guild.id,
+            "voice_channel_id": voice_channel.id if voice_channel else None,
+            "text_channel_id": self.text_channel.id if self.text_channel else None,
+            "volume": self.player.volume if self.player else None,
+            "loop": self.queue.loop,
+            "loop_queue": self.queue.loop_queue,
+            "current": current.to_tuple() if current else None,
+            "position": int(self.player.position) if self.player and current else 0,
+            "paused": self.is_paused,
+            "revision": revision,
+            "queue": self._queue_snapshot[1],
+        }
+
+    async def restore(self, snapshot: Snapshot) -> None:
+        """
+        Resume from a snapshot taken before a restart.
+
+        The queue and loop modes are always restored. If a track was playing,
+        the voice channel is rejoined and the track resumes near where it
+        stopped.
+
+        Args:
+            snapshot: Snapshot produced by ``snapshot``
+
+        Raises:
+            VoiceError: If the voice channel cannot be rejoined
+        """
+
+        self.queue.loop = snapshot["loop"]
+        self.queue.loop_queue = snapshot["loop_queue"]
+        self.queue.add_many([Track.from_tuple(data) for data in snapshot["queue"]])
+
+        text_channel = self.guild.get_channel(snapshot["text_channel_id"] or 0)
+        if isinstance(text_channel, discord.TextChannel):
+            self.text_channel = text_channel
+
+        voice_channel = self.guild.get_channel(snapshot["voice_channel_id"] or 0)
+        if not isinstance(voice_channel, discord.VoiceChannel):
+            return
+
+        await self.connect(voice_channel)
+        if self.player and snapshot["volume"] is not None:
+            self.player.volume = snapshot["volume"]
+
+        if snapshot["current"] is None:
+            self._start_disconnect_timer()
+            return
+
+        if not await self._play(
+            Track.from_tuple(snapshot["current"]), snapshot["position"]
+        ):
             await self.play_next()
+            return
+
+        if snapshot["paused"] and self.player:
+            self.player.pause()
 
     def _after_track(self, error: Exception | None) -> None:
         """Callback after track finishes playing."""
@@ -135,7 +309,77 @@ class GuildState:
 
         # Schedule next track in event loop
         if self.voice_client:
-            asyncio.run_coroutine_threadsafe(self.play_next(), self.voice_client.loop)
+            asyncio.run_coroutine_threadsafe(
+                self._on_track_end(), self.voice_client.loop
+            )
+
+    async def _on_track_end(self) -> None:
+        """Resume a track whose stream broke off, or play the next one."""
+
+        self._track_ended_at = time.monotonic()
+
+        track = self.current_track
+        position = None
+        if self.player and self._recoveries < STREAM_RECOVERY_ATTEMPTS:
+            position = self.player.ended_early(STREAM_END_TOLERANCE)
+
+        if track and position is not None:
+            self._recoveries += 1
+            print(
+                f"Stream of {track.title} ended at {position:.0f}s of "
+                f"{track.duration}s, resuming (attempt {self._recoveries})"
+            )
+
+            await asyncio.sleep(self._recoveries)
+            if not self.player:
+                return
+
+            # Skipped or stopped while waiting: move on instead
+            if self.player.current_track is track:
+                # The URL may have expired, so resolve a fresh one
+                try:
+                    await self.player.play(
+                        track,
+                        after=lambda error: self._after_track(error),
+                        start=position,
+                        refresh_stream=True,
+                    )
+                    self._track_ended_at = None
+                    return
+                except AudioNodeError as exception:
+                    await self._stop_without_node(track, exception)
+                    return
+                except Exception as exception:
+                    print(f"Failed to resume {track.title}: {exception}")
+
+        await self.play_next()
+
+    async def _stop_without_node(self, track: Track, error: AudioNodeError) -> None:
+        """
+        Stop playing after the audio node became unavailable.
+
+        The track is put back at the front of the queue and a single message
+        is sent, instead of failing every queued track in turn.
+
+        Args:
+            track: Track that could not be played
+            error: Why the node could not play it
+        """
+
+        if not self.queue.loop_queue:
+            # Queue loop mode already moved the track to the end of the queue
+            self.queue.add_next(track)
+
+        self.current_track = None
+        self._is_playing = False
+        self._track_ended_at = None
+        self._start_disconnect_timer()
+
+        if self.text_channel:
+            await self.text_channel.send(
+                f"❌ Playback stopped ({error}). The queue was kept, "
+                "play a song to continue once the audio node is back."
+            )
 
     async def _send_now_playing(self) -> None:
         """Send now playing embed to text channel."""
@@ -156,10 +400,10 @@ class GuildState:
             name="Duration", value=self.current_track.duration_formatted, inline=True
         )
 
-        if self.current_track.requester:
+        if self.current_track.requester_name:
             embed.add_field(
                 name="Requested by",
-                value=self.current_track.requester.name,
+                value=self.current_track.requester_name,
                 inline=True,
             )
 
@@ -177,18 +421,25 @@ class GuildState:
 
         await self.text_channel.send(embed=embed)
 
-    async def _start_disconnect_timer(self) -> None:
+    def _start_disconnect_timer(self) -> None:
         """Start auto-disconnect timer."""
 
-        if self._disconnect_timer and not self._disconnect_timer.done():
-            self._disconnect_timer.cancel()
+        self._cancel_disconnect_timer()
+        self._disconnect_timer = self.timers.schedule(
+            self._timeout, self._auto_disconnect
+        )
+
+    def _cancel_disconnect_timer(self) -> None:
+        """Cancel the auto-disconnect timer if it is running."""
 
-        self._disconnect_timer = asyncio.create_task(self._auto_disconnect())
+        if self._disconnect_timer:
+            self._disconnect_timer.cancel()
+            self._disconnect_timer = None
 
     async def _auto_disconnect(self) -> None:
         """Auto-disconnect after timeout of inactivity."""
 
-        await asyncio.sleep(self._timeout)
+        self._disconnect_timer = None
 
         if not self.is_playing and self.is_connected:
             if self.text_channel:
@@ -201,6 +452,9 @@ class GuildState:
         """
         Add a skip vote.
 
+        Votes expire after SKIP_VOTE_TIMEOUT seconds, so a vote cast long
+        ago does not count towards skipping whatever plays now.
+
         Args:
             user_id: ID of user voting to skip
 
@@ -208,13 +462,19 @@ class GuildState:
             Tuple of (current votes, required votes)
         """
 
-        self._skip_votes.add(user_id)
+        previous = self._skip_votes.get(user_id)
+        if previous:
+            previous.cancel()
+
+        self._skip_votes[user_id] = self.timers.schedule(
+            SKIP_VOTE_TIMEOUT, lambda: self._skip_votes.pop(user_id, None)
+        )
 
         # Calculate required votes (50% of listeners)
-        if self.voice_client and self.voice_client.channel:
+        if self.voice_channel:
             # Don't count bots
             listeners = [
-                member for member in self.voice_client.channel.members if not member.bot
+                member for member in self.voice_channel.members if not member.bot
             ]
             required = len(listeners) // 2
         else:
@@ -225,14 +485,34 @@ class GuildState:
     def clear_skip_votes(self) -> None:
         """Clear all skip votes."""
 
+        for timer in self._skip_votes.values():
+            timer.cancel()
         self._skip_votes.clear()
 
 
 class StateManager:
-    """Manages guild states across the bot."""
+    """
+    Manages guild states across the bot.
+
+    States are partitioned by the shard their guild belongs to, so each
+    shard's load can be reported and handled on its own.
+    """
 
     def __init__(self):
-        self._states: dict[int, GuildState] = {}
+        # Shared by every guild's auto-disconnect and skip vote timers
+        self.timers: TimerWheel = TimerWheel()
+
+        self._shards: dict[int, dict[int, GuildState]] = {}
+        self._shard_of: dict[int, int] = {}  # guild ID -> shard ID
+
+        # Optional crash-safe snapshots of every guild's playback
+        self._store: SnapshotStore | None = None
+        self._saved: dict[int, Snapshot] = {}
+        self._persist_task: asyncio.Task[None] | None = None
+
+        # Periodic eviction of idle states
+        self.evicted: int = 0
+        self._sweep_task: asyncio.Task[None] | None = None
 
     def get_state(self, guild: discord.Guild) -> GuildState:
         """
@@ -245,10 +525,57 @@ class StateManager:
             GuildState for the guild
         """
 
-        if guild.id not in self._states:
-            self._states[guild.id] = GuildState(guild)
+        states = self._shards.setdefault(guild.shard_id, {})
+
+        state = states.get(guild.id)
+        if state is None:
+            state = states[guild.id] = GuildState(guild, self.timers)
+            self._shard_of[guild.id] = guild.shard_id
+
+        state.last_active = time.monotonic()
+        return state
+
+    def peek_state(self, guild_id: int) -> GuildState | None:
+        """
+        Get a guild state without creating one.
+
+        Args:
+            guild_id: Discord guild ID
+
+        Returns:
+            GuildState for the guild, or None if it has none
+        """
+
+        shard_id = self._shard_of.get(guild_id)
+        if shard_id is None:
+            return None
+
+        return self._shards[shard_id].get(guild_id)
+
+    def __len__(self) -> int:
+        """Return the number of guild states."""
+
+        return len(self._shard_of)
+
+    def __iter__(self) -> Iterator[GuildState]:
+        """Iterate over the states of every shard."""
+
+        return chain.from_iterable(
+            list(states.values()) for states in self._shards.values()
+        )
+
+    def shard_states(self, shard_id: int) -> list[GuildState]:
+        """
+        Get the states of one shard's guilds.
+
+        Args:
+            shard_id: Shard ID
+
+        Returns:
+            States of guilds on the shard
+        """
 
-        return self._states[guild.id]
+        return list(self._shards.get(shard_id, {}).values())
 
     async def cleanup_state(self, guild_id: int) -> None:
         """
@@ -258,13 +585,181 @@ class StateManager:
             guild_id: ID of guild to cleanup
         """
 
-        if guild_id in self._states:
-            state = self._states[guild_id]
+        shard_id = self._shard_of.pop(guild_id, None)
+        if shard_id is not None:
+            states = self._shards[shard_id]
+            state = states.pop(guild_id)
+            if not states:
+                del self._shards[shard_id]
             await state.disconnect()
-            del self._states[guild_id]
+
+        if self._store and self._saved.pop(guild_id, None) is not None:
+            await self._store.save({guild_id: None})
 
     async def cleanup_all(self) -> None:
         """Cleanup all guild states."""
 
-        for guild_id in list(self._states.keys()):
+        for guild_id in list(self._shard_of):
             await self.cleanup_state(guild_id)
+
+    def start_sweeper(
+        self, interval: float, idle_after: float, max_states: int
+    ) -> None:
+        """
+        Evict idle guild states in the background.
+
+        Args:
+            interval: Seconds between sweeps
+            idle_after: Seconds of inactivity after which an idle state is evicted
+            max_states: States above this count are evicted even if recently
+                idle, least recently used first (0 for no cap)
+        """
+
+        self._sweep_task = asyncio.create_task(
+            self._sweep_loop(interval, idle_after, max_states)
+        )
+
+    def stop_sweeper(self) -> None:
+        """Stop evicting idle states."""
+
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+
+    async def sweep(self, idle_after: float, max_states: int, grace: float) -> int:
+        """
+        Evict idle guild states.
+
+        States that are connected or still hold tracks are never evicted.
+
+        Args:
+            idle_after: Seconds of inactivity after which an idle state is evicted
+            max_states: States above this count are evicted even if recently
+                idle, least recently used first (0 for no cap)
+            grace: Seconds a state is kept after its last use regardless of
+                the cap, so commands in progress keep their state
+
+        Returns:
+            Number of states evicted
+        """
+
+        now = time.monotonic()
+        idle = sorted(
+            (state for state in self if state.is_idle),
+            key=lambda state: state.last_active,
+        )
+        excess = len(self) - max_states if max_states else 0
+
+        evicted = 0
+        for state in idle:
+            unused = now - state.last_active
+            if unused < grace or (unused < idle_after and evicted >= excess):
+                continue
+
+            await self.cleanup_state(state.guild.id)
+            evicted += 1
+
+        self.evicted += evicted
+        return evicted
+
+    def attach_store(self, store: SnapshotStore, interval: float) -> None:
+        """
+        Persist guild snapshots to a store in the background.
+
+        Args:
+            store: Store to write snapshots to
+            interval: Seconds between snapshots
+        """
+
+        self._store = store
+        self._persist_task = asyncio.create_task(self._persist_loop(interval))
+
+    async def restore_all(self, client: discord.Client) -> int:
+        """
+        Resume every guild found in the attached store.
+
+        Args:
+            client: Client used to look up guilds
+
+        Returns:
+            Number of guilds resumed
+        """
+
+        if not self._store:
+            return 0
+
+        semaphore = asyncio.Semaphore(RESTORE_CONCURRENCY)
+
+        async def restore(snapshot: Snapshot) -> bool:
+            guild = client.get_guild(snapshot["guild_id"])
+            if guild is None:
+                return False
+
+            state = self.get_state(guild)
+            self._saved[guild.id] = snapshot
+
+            async with semaphore:
+                try:
+                    await state.restore(snapshot)
+                except Exception as exception:
+                    print(f"✗ Failed to resume playback in {guild.name}: {exception}")
+                    return False
+
+            return True
+
+        snapshots = await self._store.load()
+        results = await asyncio.gather(*(restore(snapshot) for snapshot in snapshots))
+
+        return sum(results)
+
+    async def save_snapshots(self) -> None:
+        """Write the snapshots of guilds whose playback changed."""
+
+        if not self._store:
+            return
+
+        changed: dict[int, Snapshot | None] = {}
+        for state in self:
+            guild_id = state.guild.id
+            snapshot = state.snapshot()
+            saved = self._saved.get(guild_id)
+
+            if snapshot is None:
+                if saved is not None:
+                    changed[guild_id] = None
+                    del self._saved[guild_id]
+            elif saved is None or _header(snapshot) != _header(saved):
+                changed[guild_id] = snapshot
+                self._saved[guild_id] = snapshot
+
+        await self._store.save(changed)
+
+    async def detach_store(self) -> None:
+        """Write final snapshots and stop persisting."""
+
+        if self._persist_task:
+            self._persist_task.cancel()
+            self._persist_task = None
+
+        if self._store:
+            await self.save_snapshots()
+            self._store.close()
+            self._store = None
+
+    async def _persist_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.save_snapshots()
+
+    async def _sweep_loop(
+        self, interval: float, idle_after: float, max_states: int
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.sweep(idle_after, max_states, grace=interval)
+
+
+def _header(snapshot: Snapshot) -> Snapshot:
+    """Everything in a snapshot except the queue, which ``revision`` tracks."""
+
+    return {key: value for key, value in snapshot.items() if key != "queue"}
@@ -0,0 +1,189 @@
+import asyncio
+import inspect
+import logging
+import math
+from typing import Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """Handle of a callback scheduled on a TimerWheel."""
+
+    __slots__ = ("deadline", "callback", "_slot")
+
+    def __init__(self, deadline: int, callback: Callable[[], Any]):
+        self.deadline: int = deadline  # in wheel ticks
+        self.callback: Callable[[], Any] = callback
+        self._slot: dict[Timer, None] | None = None
+
+    @property
+    def active(self) -> bool:
+        """Check if the timer is still waiting to fire."""
+
+        return self._slot is not None
+
+    def cancel(self) -> None:
+        """Cancel the timer; does nothing if it already fired."""
+
+        if self._slot is not None:
+            del self._slot[self]
+            self._slot = None
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel shared by many coarse timers.
+
+    Timers land in one of ``levels`` wheels of ``slots`` slots each, the
+    first wheel advancing every ``resolution`` seconds and each further one
+    ``slots`` times slower. Scheduling and cancelling are O(1); when a slower
+    wheel's slot comes up, its timers cascade into the faster wheels. A single
+    task drives the wheels and only runs while timers are pending.
+
+    Callbacks may be plain functions or coroutine functions, whose coroutines
+    are run as tasks.
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 64, levels: int = 4):
+        if slots & (slots - 1):
+            raise ValueError("The number of slots must be a power of two")
+
+        self.resolution: float = resolution
+        self._bits: int = slots.bit_length() - 1
+        self._mask: int = slots - 1
+        self._wheels: list[list[dict[Timer, None]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+
+        self._origin: float | None = None  # loop time of tick 0
+        self._now: int = 0  # last processed tick
+        self._driver: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[Any]] = set()
+
+    def __len__(self) -> int:
+        """Return the number of pending timers."""
+
+        return sum(len(slot) for wheel in self._wheels for slot in wheel)
+
+    def schedule(self, delay: float, callback: Callable[[], Any]) -> Timer:
+        """
+        Call a function after a delay.
+
+        Timers fire on the first tick at or after the delay, so up to one
+        ``resolution`` late.
+
+        Args:
+            delay: Seconds to wait
+            callback: Function or coroutine function to call
+
+        Returns:
+            Handle to cancel the timer with
+        """
+
+        loop = asyncio.get_running_loop()
+        if self._driver is None or self._driver.done():
+            # Nothing was pending, so the wheels can jump straight to now
+            if self._origin is None:
+                self._origin = loop.time()
+            self._now = self._clock_tick(loop)
+            self._driver = loop.create_task(self._drive())
+
+        # Round the deadline itself up: counting whole ticks from the current
+        # (rounded down) tick would fire up to a tick early
+        assert self._origin is not None
+        deadline = math.ceil((loop.time() - self._origin + delay) / self.resolution)
+        timer = Timer(max(deadline, self._now + 1), callback)
+        self._insert(timer)
+
+        return timer
+
+    def close(self) -> None:
+        """Drop every pending timer and stop the driver."""
+
+        if self._driver:
+            self._driver.cancel()
+            self._driver = None
+
+        for wheel in self._wheels:
+            for slot in wheel:
+                for timer in slot:
+                    timer._slot = None
+                slot.clear()
+
+    def _clock_tick(self, loop: asyncio.AbstractEventLoop) -> int:
+        assert self._origin is not None
+        return int((loop.time() - self._origin) / self.resolution)
+
+    def _insert(self, timer: Timer) -> None:
+        deadline = max(timer.deadline, self._now)
+
+        for level, wheel in enumerate(self._wheels):
+            shift = level * self._bits
+            if (deadline >> shift) - (self._now >> shift) <= self._mask:
+                slot = wheel[(deadline >> shift) & self._mask]
+                break
+        else:
+            # Beyond the slowest wheel: park in its farthest slot and
+            # re-insert when it comes up
+            shift = (len(self._wheels) - 1) * self._bits
+            slot = self._wheels[-1][((self._now >> shift) - 1) & self._mask]
+
+        slot[timer] = None
+        timer._slot = slot
+
+    def _advance(self) -> None:
+        """Process the next tick."""
+
+        self._now += 1
+
+        # Cascade slower wheels whose slot just came up, slowest first
+        for level in range(len(self._wheels) - 1, 0, -1):
+            shift = level * self._bits
+            if self._now & ((1 << shift) - 1):
+                continue
+
+            slot = self._wheels[level][(self._now >> shift) & self._mask]
+            timers = list(slot)
+            slot.clear()
+            for timer in timers:
+                self._insert(timer)
+
+        slot = self._wheels[0][self._now & self._mask]
+        due = list(slot)
+        slot.clear()
+
+        for timer in due:
+            timer._slot = None
+            self._fire(timer)
+
+    def _fire(self, timer: Timer) -> None:
+        try:
+            result = timer.callback()
+        except Exception:
+            logger.exception("Timer callback failed")
+            return
+
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task[Any]) -> None:
+        self._running.discard(task)
+
+        if not task.cancelled() and task.exception():
+            logger.error("Timer callback failed", exc_info=task.exception())
+
+    async def _drive(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while len(self):
+            assert self._origin is not None
+            next_tick = self._origin + (self._now + 1) * self.resolution
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+            # Catch up on ticks missed while the loop was busy
+            while self._now < self._clock_tick(loop):
+                self._advance()
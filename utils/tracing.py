@@ -0,0 +1,362 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+import aiohttp
+from data.constants import TRACE_HISTORY
+
+
+logger = logging.getLogger(__name__)
+
+Attribute = str | int | float | bool
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed stage of a traced request."""
+
+    name: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int  # Unix time in nanoseconds
+    attributes: dict[str, Attribute] = field(default_factory=dict)
+    duration_ns: int | None = None  # None while the span is running
+    error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds, so far if still running."""
+
+        if self.duration_ns is None:
+            return (time.time_ns() - self.start_ns) / 1e9
+
+        return self.duration_ns / 1e9
+
+
+@dataclass(slots=True)
+class Trace:
+    """A request and the spans of its stages, the first one being the request."""
+
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+    finished: bool = False
+
+    @property
+    def root(self) -> Span:
+        """Span covering the whole request."""
+
+        return self.spans[0]
+
+    @property
+    def duration(self) -> float:
+        """Duration of the whole request in seconds."""
+
+        return self.root.duration
+
+    def depth(self, span: Span) -> int:
+        """Number of ancestors of a span."""
+
+        parents = {span.span_id: span.parent_id for span in self.spans}
+        depth = 0
+        parent_id = span.parent_id
+        while parent_id is not None:
+            depth += 1
+            parent_id = parents.get(parent_id)
+
+        return depth
+
+
+# Innermost running span of the current task, with the trace it belongs to
+_current: ContextVar[tuple[Trace, Span] | None] = ContextVar(
+    "current_span", default=None
+)
+
+
+class Tracer:
+    """
+    Records how long each stage of a request takes.
+
+    ``trace()`` starts a request and ``span()`` times one of its stages;
+    spans nest, and follow the request through awaits since the current span
+    lives in a context variable. Code that runs outside of a trace pays only
+    for a context variable lookup. Finished traces are kept in a ring buffer
+    and handed to the exporter, if one is set.
+    """
+
+    def __init__(self, history: int):
+        self.traces: deque[Trace] = deque(maxlen=history)
+        self.exporter: "OTLPExporter | None" = None
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Attribute) -> Iterator[Trace]:
+        """
+        Trace a request.
+
+        Args:
+            name: Name of the request, e.g. "play"
+            **attributes: Details of the request
+
+        Yields:
+            The trace being recorded
+        """
+
+        trace = Trace(trace_id=os.urandom(16).hex())
+        root = Span(
+            name=name,
+            span_id=os.urandom(8).hex(),
+            parent_id=None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        trace.spans.append(root)
+
+        started = time.perf_counter_ns()
+        token = _current.set((trace, root))
+        try:
+            yield trace
+        except BaseException as exception:
+            root.error = repr(exception)
+            raise
+        finally:
+            root.duration_ns = time.perf_counter_ns() - started
+            trace.finished = True
+            _current.reset(token)
+
+            self.traces.append(trace)
+            if self.exporter:
+                self.exporter.add(trace)
+
+    def slowest(self, count: int) -> list[Trace]:
+        """
+        Get the slowest of the recently finished traces.
+
+        Args:
+            count: Maximum number of traces
+
+        Returns:
+            Traces, slowest first
+        """
+
+        traces = sorted(self.traces, key=lambda trace: trace.duration, reverse=True)
+        return traces[:count]
+
+
+@contextmanager
+def span(name: str, **attributes: Attribute) -> Iterator[Span | None]:
+    """
+    Time a stage of the current trace.
+
+    Does nothing outside of a trace, or once its request has finished (e.g. in
+    a task that outlived it).
+
+    Args:
+        name: Name of the stage, e.g. "extract"
+        **attributes: Details of the stage
+
+    Yields:
+        The span being recorded, or None if nothing is traced
+    """
+
+    current = _current.get()
+    if current is None or current[0].finished:
+        yield None
+        return
+
+    trace, parent = current
+    child = Span(
+        name=name,
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    trace.spans.append(child)
+
+    started = time.perf_counter_ns()
+    token = _current.set((trace, child))
+    try:
+        yield child
+    except BaseException as exception:
+        child.error = repr(exception)
+        raise
+    finally:
+        child.duration_ns = time.perf_counter_ns() - started
+        _current.reset(token)
+
+
+class OTLPExporter:
+    """
+    Exports traces as OpenTelemetry (OTLP/JSON) to a collector or a file.
+
+    Traces are batched and written in the background, so requests never wait
+    on the export. An ``http(s)://`` target is POSTed to, e.g. a collector's
+    ``http://localhost:4318/v1/traces``; anything else is a file that gets one
+    OTLP JSON document appended per line.
+    """
+
+    def __init__(self, target: str, service: str, interval: float, batch_size: int):
+        self.target: str = target
+        self.service: str = service
+        self.interval: float = interval
+        self.batch_size: int = batch_size
+        self.exported: int = 0
+        self.dropped: int = 0
+
+        self._pending: deque[Trace] = deque()
+        self._task: asyncio.Task[None] | None = None
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def is_http(self) -> bool:
+        """Check if traces are sent to a collector rather than a file."""
+
+        return self.target.startswith(("http://", "https://"))
+
+    def add(self, trace: Trace) -> None:
+        """
+        Queue a finished trace for export.
+
+        Args:
+            trace: Trace to export
+        """
+
+        # Keep memory bounded if the target is down for a long time
+        if len(self._pending) >= self.batch_size * 10:
+            self._pending.popleft()
+            self.dropped += 1
+
+        self._pending.append(trace)
+
+    def start(self) -> None:
+        """Start exporting in the background."""
+
+        if self.is_http:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        else:
+            Path(self.target).parent.mkdir(parents=True, exist_ok=True)
+
+        self._task = asyncio.create_task(self._export_loop())
+
+    async def stop(self) -> None:
+        """Export what is left and stop."""
+
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        await self.flush()
+
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def flush(self) -> None:
+        """Export every queued trace."""
+
+        while self._pending:
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            document = json.dumps(self.encode(batch), separators=(",", ":"))
+
+            try:
+                if self._session:
+                    async with self._session.post(
+                        self.target,
+                        data=document,
+                        headers={"Content-Type": "application/json"},
+                    ) as response:
+                        response.raise_for_status()
+                else:
+                    await asyncio.to_thread(self._append, document)
+            except (OSError, aiohttp.ClientError, asyncio.TimeoutError) as error:
+                logger.warning(f"Failed to export {count} trace(s): {error}")
+                self.dropped += count
+                return
+
+            self.exported += count
+
+    def encode(self, traces: list[Trace]) -> dict[str, Any]:
+        """
+        Build an OTLP ExportTraceServiceRequest in its JSON encoding.
+
+        Args:
+            traces: Traces to include
+
+        Returns:
+            The request as a JSON-ready dictionary
+        """
+
+        spans: list[dict[str, Any]] = []
+        for trace in traces:
+            for span in trace.spans:
+                end_ns = span.start_ns + (span.duration_ns or 0)
+                spans.append(
+                    {
+                        "traceId": trace.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        # SERVER for the request itself, INTERNAL for its stages
+                        "kind": 2 if span.parent_id is None else 1,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(end_ns),
+                        "attributes": _encode_attributes(span.attributes),
+                        "status": (
+                            {"code": 2, "message": span.error}
+                            if span.error
+                            else {"code": 0}
+                        ),
+                    }
+                )
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _encode_attributes(
+                            {"service.name": self.service}
+                        )
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+    def _append(self, document: str) -> None:
+        with open(self.target, "a", encoding="utf-8") as file:
+            file.write(document + "\n")
+
+    async def _export_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+
+def _encode_attributes(attributes: dict[str, Attribute]) -> list[dict[str, Any]]:
+    encoded: list[dict[str, Any]] = []
+    for key, value in attributes.items():
+        # bool first, since it is a subclass of int
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+
+        encoded.append({"key": key, "value": typed})
+
+    return encoded
+
+
+TRACER = Tracer(history=TRACE_HISTORY)
@@ -15,21 +15,25 @@ class Validators:
     SOUNDCLOUD_REGEX: re.Pattern[str] = re.compile(
         r"(https?://)?(www\.)?soundcloud\.com/.+"
     )
+    PLAYLIST_ID_REGEX: re.Pattern[str] = re.compile(r"[?&]list=[A-Za-z0-9_-]+")
+    YOUTUBE_ID_REGEX: re.Pattern[str] = re.compile(
+        r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})"
+    )
+    URL_REGEX: re.Pattern[str] = re.compile(
+        r"^https?://" +
+        r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|" +
+        r"localhost|" +
+        r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})" +
+        r"(?::\d+)?" +
+        r"(?:/?|[/?]\S+)$",
+        re.IGNORECASE,
+    )
 
     @staticmethod
     def is_url(text: str) -> bool:
         """Check if text is a URL."""
-        url_pattern = re.compile(
-            r"^https?://" +
-            r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|" +
-            r"localhost|" +
-            r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})" +
-            r"(?::\d+)?" +
-            r"(?:/?|[/?]\S+)$",
-            re.IGNORECASE,
-        )
-
-        return url_pattern.match(text) is not None
+
+        return Validators.URL_REGEX.match(text) is not None
 
     @staticmethod
     def is_youtube_url(text: str) -> bool:
@@ -49,6 +53,42 @@ class Validators:
 
         return Validators.SOUNDCLOUD_REGEX.match(text) is not None
 
+    @staticmethod
+    def extract_youtube_id(text: str) -> str | None:
+        """
+        Extract the video ID from a YouTube URL.
+
+        Args:
+            text: URL to inspect
+
+        Returns:
+            Video ID, or None if the text is not a YouTube video link
+        """
+
+        if not Validators.is_youtube_url(text):
+            return None
+
+        match = Validators.YOUTUBE_ID_REGEX.search(text)
+
+        return match.group(1) if match else None
+
+    @staticmethod
+    def is_playlist_url(text: str) -> bool:
+        """
+        Check if URL points to a playlist rather than a single track.
+
+        Links to a video inside a playlist (``watch?v=...&list=...``) count as
+        single tracks.
+        """
+
+        if Validators.is_youtube_url(text):
+            return (
+                Validators.PLAYLIST_ID_REGEX.search(text) is not None
+                and Validators.extract_youtube_id(text) is None
+            )
+
+        return Validators.is_soundcloud_url(text) and "/sets/" in text
+
     @staticmethod
     def validate_duration(duration: int) -> bool:
         """
@@ -91,6 +131,28 @@ class Validators:
 
         return 0 <= volume <= 100
 
+    @staticmethod
+    def parse_timestamp(text: str) -> int | None:
+        """
+        Parse a position such as ``90``, ``1:30`` or ``1:02:03``.
+
+        Args:
+            text: Seconds, or colon-separated hours, minutes and seconds
+
+        Returns:
+            Position in seconds, or None if the text is not a valid timestamp
+        """
+
+        parts = text.strip().split(":")
+        if len(parts) > 3 or not all(part.isdecimal() for part in parts):
+            return None
+
+        seconds = 0
+        for part in parts:
+            seconds = seconds * 60 + int(part)
+
+        return seconds
+
     @staticmethod
     def sanitize_search_query(query: str) -> str:
         """